@@ -1,8 +1,22 @@
-from fastapi import FastAPI
-from app.routers import jobs, applicants, companies, job_assessments, applications, interviews, organizer, webhooks
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.routers import jobs, applicants, companies, job_assessments, applications, interviews, organizer, webhooks, metrics, search
 from fastapi.middleware.cors import CORSMiddleware
+from app.services.deadline import QueryCancelled, QueryDeadlineExceeded
+from app.services.search_index import SEARCH_INDEX_WARMUP, search_index
+from app.services.tracing import TracingMiddleware, instrument_engine
+from app.db import engine
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 搜索建议索引在后台线程里构建，第一次查询不用在请求里等
+    if SEARCH_INDEX_WARMUP:
+        search_index.warm()
+    yield
 
-app = FastAPI(title="RECRUITMENT MVP")
+app = FastAPI(title="RECRUITMENT MVP", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,6 +25,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware)
+instrument_engine(engine)
+
+@app.exception_handler(QueryDeadlineExceeded)
+async def query_deadline_exceeded(request: Request, exc: QueryDeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": str(exc), "timeout_seconds": exc.seconds})
+
+@app.exception_handler(QueryCancelled)
+async def query_cancelled(request: Request, exc: QueryCancelled):
+    # 客户端已经断开，这个响应只会出现在访问日志里
+    return JSONResponse(status_code=499, content={"detail": str(exc)})
+
 app.include_router(webhooks.router)
 app.include_router(jobs.router)
 app.include_router(applicants.router)
@@ -19,3 +45,5 @@ app.include_router(job_assessments.router)
 app.include_router(applications.router)
 app.include_router(interviews.router)
 app.include_router(organizer.router)
+app.include_router(metrics.router)
+app.include_router(search.router)
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, Enum
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, Enum, UniqueConstraint, Index
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.mysql import JSON as MySQLJSON
+from sqlalchemy.dialects.mysql import JSON as MySQLJSON, MEDIUMTEXT
 from .db import Base
 
 class Company(Base):
@@ -16,6 +16,10 @@ class Company(Base):
 
 class Job(Base):
     __tablename__ = "job"
+    __table_args__ = (
+        Index("ix_job_status_role", "status", "role"),
+        Index("ix_job_status_location", "status", "location"),
+    )
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     title = Column(String(120), nullable=False)
     description = Column(Text)
@@ -41,7 +45,7 @@ class Applicant(Base):
     university = Column(String(100))
     major = Column(String(100))
     year = Column(String(10))
-created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now())
 
 class ApplicationAssessment(Base):
     __tablename__ = "application_assessment"
@@ -63,8 +67,55 @@ class JobAssessment(Base):
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+class JobAssessmentLatest(Base):
+    """每个 (applicant, job) 最新一条 job_assessment 的指针，写入 job_assessment 时同步维护。"""
+    __tablename__ = "job_assessment_latest"
+
+    applicant_id = Column(BigInteger, primary_key=True)
+    job_id = Column(BigInteger, primary_key=True)
+    job_assessment_id = Column(BigInteger, nullable=False)
+    version = Column(String(40), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class JobAssessmentArchive(Base):
+    """压缩任务从 job_assessment 移出的旧版本。"""
+    __tablename__ = "job_assessment_archive"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
+    applicant_id = Column(BigInteger, nullable=False)
+    job_id = Column(BigInteger, nullable=False)
+    version = Column(String(40), nullable=False)
+    data_json = Column(MySQLJSON, nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, server_default=func.now())
+
+class ApplicantResume(Base):
+    """申请人最近一次上传的简历文本，供批量重新评估使用。"""
+    __tablename__ = "applicant_resume"
+
+    applicant_id = Column(BigInteger, primary_key=True)
+    file_name = Column(String(255))
+    resume_text = Column(Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class BulkAssessmentRun(Base):
+    __tablename__ = "bulk_assessment_run"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    job_id = Column(BigInteger, nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="running")  # running / completed / failed
+    total = Column(Integer, nullable=False, default=0)
+    done = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, server_default=func.now())
+    finished_at = Column(DateTime, nullable=True)
+
 class Application(Base):
     __tablename__ = "application"
+    __table_args__ = (
+        UniqueConstraint("applicant_id", "job_id", name="uq_application_applicant_job"),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     applicant_id = Column(BigInteger, nullable=False)
@@ -77,6 +128,12 @@ class Application(Base):
 
 class Interview(Base):
     __tablename__ = "interviews"
+    __table_args__ = (
+        Index("ix_interviews_interviewer_time", "interviewer_id", "scheduled_time"),
+        Index("ix_interviews_applicant_time", "applicant_id", "scheduled_time"),
+        Index("ix_interviews_company_time", "company_id", "scheduled_time"),
+        Index("ix_interviews_scheduled_time", "scheduled_time"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -97,4 +154,48 @@ class Interview(Base):
 
     notes = Column(Text, nullable=True)
 
-    created_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class Skill(Base):
+    __tablename__ = "skill"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    name = Column(String(80), nullable=False, unique=True)  # 规范名，小写
+    created_at = Column(DateTime, server_default=func.now())
+
+class SkillSynonym(Base):
+    __tablename__ = "skill_synonym"
+
+    alias = Column(String(80), primary_key=True)  # skill_key() 归一化后的写法
+    skill_id = Column(BigInteger, nullable=False, index=True)
+
+class JobSkill(Base):
+    __tablename__ = "job_skill"
+    __table_args__ = (
+        Index("ix_job_skill_skill", "skill_id", "job_id"),
+    )
+
+    job_id = Column(BigInteger, primary_key=True)
+    skill_id = Column(BigInteger, primary_key=True)
+
+class ApplicantSkill(Base):
+    __tablename__ = "applicant_skill"
+    __table_args__ = (
+        Index("ix_applicant_skill_skill", "skill_id", "applicant_id"),
+    )
+
+    applicant_id = Column(BigInteger, primary_key=True)
+    skill_id = Column(BigInteger, primary_key=True)
+
+
+class ApplicantRecommendation(Base):
+    __tablename__ = "applicant_recommendation"
+    __table_args__ = (
+        Index("ix_applicant_recommendation_score", "applicant_id", "score"),
+    )
+
+    applicant_id = Column(BigInteger, primary_key=True)
+    job_id = Column(BigInteger, primary_key=True)
+    score = Column(Integer, nullable=False)
+    computed_at = Column(DateTime, nullable=False)
@@ -2,6 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from .. import models, schemas
+from app.services.multiget import fetch_by_ids
+from app.services.cache import applicant_cache
+from app.services.projection import projected_response, select_fields
+from app.services.deadline import SEARCH_QUERY_TIMEOUT, query_deadline
+from app.services.overview import OVERVIEW_SECTIONS, load_applicant_overview, parse_overview_fields, project_overview
+from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/applicants", tags=["applicants"])
 
@@ -12,15 +18,17 @@ def get_db():
     finally:
         db.close()
 
-@router.get("", response_model=list[schemas.ApplicantOut])
+@router.get("", response_model=list[schemas.ApplicantOut], dependencies=[Depends(query_deadline(SEARCH_QUERY_TIMEOUT))])
 def list_applicants(
     q: str | None = Query(None, description="模糊搜索 name/email/skill_tags"),
     desired_role: str | None = Query(None),
     desired_location: str | None = Query(None),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    fields: str | None = Query(None, description="Comma separated subset of ApplicantOut fields"),
     db: Session = Depends(get_db),
 ):
+    columns = select_fields(fields, schemas.ApplicantOut)
     stmt = db.query(models.Applicant)
     if desired_role:
         stmt = stmt.filter(models.Applicant.desired_role == desired_role)
@@ -35,9 +43,9 @@ def list_applicants(
         )
     items = (
         stmt.order_by(models.Applicant.created_at.desc())
-        .offset(offset).limit(limit).all()
+        .offset(offset).limit(limit)
     )
-    return items
+    return projected_response(items, models.Applicant, columns)
 
 @router.get("/by_ids", response_model=list[schemas.ApplicantOut])
 def get_applicants_by_ids(
@@ -56,9 +64,44 @@ def get_applicants_by_ids(
 
     return applicants
 
+@router.post("/by_ids", response_model=schemas.ApplicantMultiGetOut)
+def multi_get_applicants(payload: schemas.MultiGetIn):
+    items, missing_ids = fetch_by_ids(models.Applicant, payload.ids)
+    return {"items": items, "missing_ids": missing_ids}
+
 @router.get("/{applicant_id}", response_model=schemas.ApplicantOut)
 def get_applicant(applicant_id: int, db: Session = Depends(get_db)):
-    item = db.get(models.Applicant, applicant_id)
+    item = applicant_cache.get(db, applicant_id)
     if not item:
         raise HTTPException(status_code=404, detail="Applicant not found")
     return item
+
+@router.get("/{applicant_id}/overview", response_model=schemas.ApplicantOverviewOut, response_model_exclude_none=True)
+def get_applicant_overview(
+    applicant_id: int,
+    sections: str | None = Query(None, description="Comma separated subset of applications,jobs,companies,assessments,interviews"),
+    fields: str | None = Query(None, description="Comma separated section.field list, e.g. jobs.title,applications.status,applicant.name"),
+    db: Session = Depends(get_db),
+):
+    applicant = applicant_cache.get(db, applicant_id)
+    if not applicant:
+        raise HTTPException(status_code=404, detail="Applicant not found")
+
+    selected_fields = parse_overview_fields(fields)
+    selected = set(OVERVIEW_SECTIONS)
+    if sections:
+        selected = {s.strip() for s in sections.split(",") if s.strip()}
+        unknown = selected - set(OVERVIEW_SECTIONS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(sorted(unknown))}")
+    if fields and not sections:
+        # 只给了 fields 时，只加载 fields 里出现的 section
+        selected = set(selected_fields) - {"applicant"}
+    else:
+        selected |= set(selected_fields) - {"applicant"}
+
+    overview = {"applicant": applicant, **load_applicant_overview(db, applicant_id, selected)}
+    if not selected_fields:
+        return overview
+    payload = schemas.ApplicantOverviewOut.model_validate(overview).model_dump(mode="json", exclude_none=True)
+    return JSONResponse(project_overview(payload, selected_fields))
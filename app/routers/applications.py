@@ -1,7 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from .. import models, schemas
+from app.services.multiget import fetch_by_ids
+from app.services.projection import orjson_response, projected_rows, select_fields
+from app.services.deadline import SEARCH_QUERY_TIMEOUT, query_deadline
+from app.services.status import APPLICATION_TRANSITIONS, batch_transition
 
 router = APIRouter(prefix="/applications", tags=["Application"])
 
@@ -12,13 +18,15 @@ def get_db():
     finally:
         db.close()
 
-@router.get("", response_model=list[schemas.ApplicationOut])
+@router.get("", response_model=list[schemas.ApplicationOut], dependencies=[Depends(query_deadline(SEARCH_QUERY_TIMEOUT))])
 def list_applications(
     applicant_id: int = Query(..., description="Applicant ID"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    fields: str | None = Query(None, description="Comma separated subset of ApplicationOut fields"),
     db: Session = Depends(get_db),
 ):
+    columns = select_fields(fields, schemas.ApplicationOut)
     stmt = (
         db.query(models.Application)
         .filter(models.Application.applicant_id == applicant_id)
@@ -26,60 +34,127 @@ def list_applications(
         .offset(offset)
         .limit(limit)
     )
-    results = stmt.all()
+    results = projected_rows(stmt, models.Application, columns)
     if not results:
         raise HTTPException(status_code=404, detail="No applications found for this applicant.")
-    return results
+    return orjson_response(results)
+
+def _resolve_jobs(db: Session, applicant_id: int, job_ids: list[int]) -> dict[int, tuple]:
+    """
+    一次查询拿到 job 的 company_id 以及该申请人对该 job 最新的 assessment id。
+    返回 {job_id: (company_id, job_assessment_id)}，不存在的 job 不在结果里。
+    """
+    rows = db.execute(
+        select(models.Job.id, models.Job.company_id, models.JobAssessmentLatest.job_assessment_id)
+        .outerjoin(
+            models.JobAssessmentLatest,
+            and_(
+                models.JobAssessmentLatest.applicant_id == applicant_id,
+                models.JobAssessmentLatest.job_id == models.Job.id,
+            ),
+        )
+        .where(models.Job.id.in_(job_ids))
+    ).all()
+    return {job_id: (company_id, assessment_id) for job_id, company_id, assessment_id in rows}
 
 @router.post("", response_model=schemas.ApplicationOut)
 def create_application(
     application_in: schemas.ApplicationCreate,
     db: Session = Depends(get_db),
 ):
-    # 1. 检查是否已申请过该岗位
-    existing = (
-        db.query(models.Application)
-        .filter(
-            models.Application.applicant_id == application_in.applicant_id,
-            models.Application.job_id == application_in.job_id
-        )
-        .first()
-    )
-    if existing:
-        raise HTTPException(status_code=400, detail="You have already applied for this job.")
-
-    # 2. 查找最新的 job assessment（可选）
-    latest_assessment = (
-        db.query(models.JobAssessment)
-        .filter(
-            models.JobAssessment.applicant_id == application_in.applicant_id,
-            models.JobAssessment.job_id == application_in.job_id
-        )
-        .order_by(models.JobAssessment.version.desc())
-        .first()
-    )
-
-    job_assessment_id = latest_assessment.id if latest_assessment else None
-
-    job = db.query(models.Job).filter(models.Job.id == application_in.job_id).first()
-    if not job:
+    """
+    Round trips: 1 joined SELECT + INSERT + COMMIT + refresh (was 3 SELECTs + INSERT + COMMIT + refresh).
+    重复申请由 (applicant_id, job_id) 唯一约束拦截，并发点击不会插入两条。
+    """
+    # 1. 一次查询拿到 job 和最新的 job assessment（可选）
+    target = _resolve_jobs(db, application_in.applicant_id, [application_in.job_id]).get(application_in.job_id)
+    if target is None:
         raise HTTPException(status_code=404, detail="Job not found.")
+    company_id, job_assessment_id = target
 
-    # 3. 创建新的申请
+    # 2. 直接插入，重复申请会触发唯一约束
     application = models.Application(
         applicant_id=application_in.applicant_id,
         job_id=application_in.job_id,
-        company_id=job.company_id,
+        company_id=company_id,
         job_assessment_id=job_assessment_id,
         status="pending"
     )
 
     db.add(application)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="You have already applied for this job.")
     db.refresh(application)
 
     return application
 
+@router.post("/bulk", response_model=schemas.ApplicationBulkOut)
+def create_applications_bulk(
+    payload: schemas.ApplicationBulkCreate,
+    db: Session = Depends(get_db),
+):
+    """
+    同一申请人一次申请多个岗位，在一个事务里完成。
+    Round trips: 2 SELECTs + 1 multi-row INSERT + COMMIT + 1 SELECT, independent of len(job_ids).
+    已申请过的岗位跳过，不存在的岗位在 missing_job_ids 里返回。
+    """
+    job_ids = list(dict.fromkeys(payload.job_ids))
+    targets = _resolve_jobs(db, payload.applicant_id, job_ids)
+
+    already_applied = set(
+        db.execute(
+            select(models.Application.job_id).where(
+                models.Application.applicant_id == payload.applicant_id,
+                models.Application.job_id.in_(list(targets)),
+            )
+        ).scalars()
+    )
+
+    rows = [
+        {
+            "applicant_id": payload.applicant_id,
+            "job_id": job_id,
+            "company_id": targets[job_id][0],
+            "job_assessment_id": targets[job_id][1],
+            "status": "pending",
+        }
+        for job_id in job_ids
+        if job_id in targets and job_id not in already_applied
+    ]
+
+    created = []
+    if rows:
+        try:
+            db.execute(insert(models.Application), rows)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Applications changed concurrently, please retry.")
+        created = (
+            db.query(models.Application)
+            .filter(
+                models.Application.applicant_id == payload.applicant_id,
+                models.Application.job_id.in_([r["job_id"] for r in rows]),
+            )
+            .all()
+        )
+        by_job = {a.job_id: a for a in created}
+        created = [by_job[r["job_id"]] for r in rows if r["job_id"] in by_job]
+
+    return {
+        "created": created,
+        "already_applied": [j for j in job_ids if j in already_applied],
+        "missing_job_ids": [j for j in job_ids if j not in targets],
+    }
+
+@router.post("/by_ids", response_model=schemas.ApplicationMultiGetOut)
+def get_applications_by_ids(payload: schemas.MultiGetIn):
+    items, missing_ids = fetch_by_ids(models.Application, payload.ids)
+    return {"items": items, "missing_ids": missing_ids}
+
 @router.get("/one", response_model=schemas.ApplicationOut | None)
 def get_single_application(
     applicant_id: int = Query(..., description="Applicant ID"),
@@ -119,3 +194,16 @@ def list_applications_by_job_and_company(
         raise HTTPException(status_code=404, detail="No applications found for this job and company.")
     return results
 
+
+@router.patch("/status", response_model=schemas.ApplicationStatusBatchOut)
+def update_application_statuses(payload: schemas.StatusBatchUpdate, db: Session = Depends(get_db)):
+    """批量修改申请状态（pending → reviewing → interviewing → accepted / rejected，任意阶段可 withdrawn）。"""
+    try:
+        result = batch_transition(db, models.Application, APPLICATION_TRANSITIONS, payload.ids, payload.status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "updated": result["updated"],
+        "rejected": result["rejected"],
+        "missing_ids": result["missing_ids"],
+    }
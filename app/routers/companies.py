@@ -2,6 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from .. import models, schemas
+from app.services.multiget import fetch_by_ids
+from app.services.cache import company_cache
+from app.services.projection import projected_response, select_fields
+from app.services.deadline import SEARCH_QUERY_TIMEOUT, query_deadline
 
 router = APIRouter(prefix="/companies", tags=["companies"])
 
@@ -12,14 +16,16 @@ def get_db():
     finally:
         db.close()
 
-@router.get("", response_model=list[schemas.CompanyOut])
+@router.get("", response_model=list[schemas.CompanyOut], dependencies=[Depends(query_deadline(SEARCH_QUERY_TIMEOUT))])
 def list_companies(
     q: str | None = Query(None, description="模糊搜索 name/industry/location"),
     location: str | None = Query(None),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    fields: str | None = Query(None, description="Comma separated subset of CompanyOut fields"),
     db: Session = Depends(get_db),
 ):
+    columns = select_fields(fields, schemas.CompanyOut)
     stmt = db.query(models.Company)
     if location:
         stmt = stmt.filter(models.Company.location == location)
@@ -32,13 +38,18 @@ def list_companies(
         )
     items = (
         stmt.order_by(models.Company.created_at.desc())
-        .offset(offset).limit(limit).all()
+        .offset(offset).limit(limit)
     )
-    return items
+    return projected_response(items, models.Company, columns)
+
+@router.post("/by_ids", response_model=schemas.CompanyMultiGetOut)
+def get_companies_by_ids(payload: schemas.MultiGetIn):
+    items, missing_ids = fetch_by_ids(models.Company, payload.ids)
+    return {"items": items, "missing_ids": missing_ids}
 
 @router.get("/{company_id}", response_model=schemas.CompanyOut)
 def get_company(company_id: int, db: Session = Depends(get_db)):
-    item = db.get(models.Company, company_id)
+    item = company_cache.get(db, company_id)
     if not item:
         raise HTTPException(status_code=404, detail="Company not found")
     return item
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from .. import models, schemas
+from app.services.scheduling import schedule_index, to_naive_utc
+from app.services.status import INTERVIEW_LEGACY_TRANSITIONS, INTERVIEW_TRANSITIONS, batch_transition
+from app.services.calendar import feed_version, iter_ics
+from app.services.projection import projected_response, select_fields
+from app.services.deadline import SEARCH_QUERY_TIMEOUT, query_deadline
+from datetime import datetime, timedelta, timezone
 
 router = APIRouter(prefix="/interviews", tags=["Interviews"])
 
@@ -18,20 +26,69 @@ def create_interview(
     db: Session = Depends(get_db),
 ):
     interview = models.Interview(**interview_in.dict())
-    db.add(interview)
-    db.commit()
-    db.refresh(interview)
+    interview.scheduled_time = to_naive_utc(interview.scheduled_time)
+    if interview.status == "Cancelled":
+        db.add(interview)
+        db.commit()
+        db.refresh(interview)
+        return interview
+
+    with schedule_index.lock:
+        conflicts = schedule_index.find_conflicts(db, interview)
+        if conflicts:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Interview time conflicts with existing interviews", "conflicts": conflicts},
+            )
+        db.add(interview)
+        db.commit()
+        db.refresh(interview)
+        schedule_index.add(interview)
     return interview
 
-@router.get("", response_model=list[schemas.InterviewOut])
+@router.get("/availability")
+def get_availability(
+    date_from: datetime = Query(..., description="Range start"),
+    date_to: datetime = Query(..., description="Range end"),
+    interviewer_id: int | None = Query(None),
+    applicant_id: int | None = Query(None),
+    duration_minutes: int = Query(60, ge=5, le=480),
+    day_start_hour: int = Query(9, ge=0, le=23),
+    day_end_hour: int = Query(18, ge=1, le=24),
+    db: Session = Depends(get_db),
+):
+    if not interviewer_id and not applicant_id:
+        raise HTTPException(status_code=400, detail="interviewer_id or applicant_id is required")
+    if date_to <= date_from or date_to - date_from > timedelta(days=31):
+        raise HTTPException(status_code=400, detail="date range must be positive and at most 31 days")
+    if day_end_hour <= day_start_hour:
+        raise HTTPException(status_code=400, detail="day_end_hour must be after day_start_hour")
+
+    keys = []
+    if interviewer_id:
+        keys.append(("interviewer", interviewer_id))
+    if applicant_id:
+        keys.append(("applicant", applicant_id))
+
+    slots = schedule_index.free_slots(
+        db, keys, date_from, date_to, duration_minutes, day_start_hour, day_end_hour
+    )
+    return {"duration_minutes": duration_minutes, "slots": slots}
+
+@router.get("", response_model=list[schemas.InterviewOut], dependencies=[Depends(query_deadline(SEARCH_QUERY_TIMEOUT))])
 def list_interviews(
     applicant_id: int | None = Query(None),
     job_id: int | None = Query(None),
     company_id: int | None = Query(None),
+    interviewer_id: int | None = Query(None),
+    date_from: datetime | None = Query(None, alias="from", description="scheduled_time >= from"),
+    date_to: datetime | None = Query(None, alias="to", description="scheduled_time < to"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    fields: str | None = Query(None, description="Comma separated subset of InterviewOut fields"),
     db: Session = Depends(get_db),
 ):
+    columns = select_fields(fields, schemas.InterviewOut)
     stmt = db.query(models.Interview)
     if applicant_id:
         stmt = stmt.filter(models.Interview.applicant_id == applicant_id)
@@ -39,14 +96,102 @@ def list_interviews(
         stmt = stmt.filter(models.Interview.job_id == job_id)
     if company_id:
         stmt = stmt.filter(models.Interview.company_id == company_id)
+    if interviewer_id:
+        stmt = stmt.filter(models.Interview.interviewer_id == interviewer_id)
+
+    # 按时间范围查询时用 scheduled_time 排序（走索引），否则保持原来的 created_at 倒序
+    if date_from or date_to:
+        if date_from:
+            stmt = stmt.filter(models.Interview.scheduled_time >= to_naive_utc(date_from))
+        if date_to:
+            stmt = stmt.filter(models.Interview.scheduled_time < to_naive_utc(date_to))
+        stmt = stmt.order_by(models.Interview.scheduled_time)
+    else:
+        stmt = stmt.order_by(models.Interview.created_at.desc())
 
     items = (
-        stmt.order_by(models.Interview.created_at.desc())
+        stmt
         .offset(offset)
         .limit(limit)
-        .all()
     )
-    return items
+    return projected_response(items, models.Interview, columns)
+
+@router.get("/calendar.ics")
+def get_calendar_feed(
+    request: Request,
+    company_id: int | None = Query(None),
+    interviewer_id: int | None = Query(None),
+    db: Session = Depends(get_db),
+):
+    if bool(company_id) == bool(interviewer_id):
+        raise HTTPException(status_code=400, detail="Exactly one of company_id or interviewer_id is required")
+
+    if company_id:
+        filters = [models.Interview.company_id == company_id]
+        name = f"Company {company_id} interviews"
+    else:
+        filters = [models.Interview.interviewer_id == interviewer_id]
+        name = f"Interviewer {interviewer_id} interviews"
+
+    etag, last_modified = feed_version(db, filters)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=60"}
+    if last_modified:
+        last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        if etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+    elif last_modified and request.headers.get("if-modified-since"):
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+        except (TypeError, ValueError):
+            since = None
+        if since and since.tzinfo and last_modified <= since:
+            return Response(status_code=304, headers=headers)
+
+    return StreamingResponse(iter_ics(filters, name), media_type="text/calendar; charset=utf-8", headers=headers)
+
+def _reactivation_conflicts(db: Session, previous: dict[int, str]) -> dict[int, str]:
+    """Cancelled 改回其它状态的面试会重新占用时间段，和创建面试时一样做冲突检查。"""
+    reactivated = [interview_id for interview_id, status in previous.items() if status == "Cancelled"]
+    if not reactivated:
+        return {}
+    interviews = db.query(models.Interview).filter(models.Interview.id.in_(reactivated)).order_by(models.Interview.id).all()
+    conflicts = schedule_index.find_batch_conflicts(db, interviews)
+    return {
+        interview_id: "Time conflicts with interviews " + ", ".join(map(str, sorted({c["interview_id"] for c in found})))
+        for interview_id, found in conflicts.items()
+    }
+
+
+def _change_statuses(db: Session, ids: list[int], new_status: str, transitions: dict = INTERVIEW_TRANSITIONS) -> dict:
+    """两个 PATCH 路由共用：按 transitions 校验流转，恢复的面试做冲突检查，再同步日程索引。"""
+    try:
+        with schedule_index.lock:
+            result = batch_transition(
+                db, models.Interview, transitions, ids, new_status, check=_reactivation_conflicts,
+            )
+            if new_status == "Cancelled":
+                schedule_index.remove_many(result["updated"])
+            else:
+                for interview in result["updated"]:
+                    if result["previous"][interview.id] == "Cancelled":
+                        schedule_index.add(interview)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return result
+
+@router.patch("/status", response_model=schemas.InterviewStatusBatchOut)
+def update_interview_statuses(payload: schemas.StatusBatchUpdate, db: Session = Depends(get_db)):
+    """批量修改面试状态：非法的状态流转和时间冲突放进 rejected，其余一次 UPDATE 完成，日程索引按批次更新一次。"""
+    result = _change_statuses(db, payload.ids, payload.status)
+    return {
+        "updated": result["updated"],
+        "rejected": result["rejected"],
+        "missing_ids": result["missing_ids"],
+    }
 
 @router.patch("/{interview_id}/status", response_model=schemas.InterviewOut)
 def update_interview_status(
@@ -54,14 +199,20 @@ def update_interview_status(
     new_status: str = Query(..., description="New status (Pending / Confirmed / Cancelled / Completed)"),
     db: Session = Depends(get_db),
 ):
+    """
+    单条修改保留原来的规则：四种状态之间可以任意修改，改成当前状态直接返回原记录。
+    和批量接口一样，从 Cancelled 恢复时做时间冲突检查，冲突返回 409。
+    """
     interview = db.get(models.Interview, interview_id)
-    if not interview:
+    if interview is None:
         raise HTTPException(status_code=404, detail="Interview not found")
-
-    if new_status not in {"Pending", "Confirmed", "Cancelled", "Completed"}:
+    if new_status not in INTERVIEW_LEGACY_TRANSITIONS:
         raise HTTPException(status_code=400, detail="Invalid status value")
-
-    interview.status = new_status
-    db.commit()
-    db.refresh(interview)
-    return interview
+    if interview.status == new_status:
+        return interview
+    result = _change_statuses(db, [interview_id], new_status, INTERVIEW_LEGACY_TRANSITIONS)
+    if result["missing_ids"]:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    if result["rejected"]:
+        raise HTTPException(status_code=409, detail=result["rejected"][0]["reason"])
+    return result["updated"][0]
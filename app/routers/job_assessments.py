@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from .. import models, schemas
+from app.services.assessments import build_assessment_result, latest_assessment_query
 
 router = APIRouter(prefix="/job-assessments", tags=["JobAssessment"])
 
@@ -18,25 +19,17 @@ def get_latest_job_assessment(
     job_id: int = Query(...),
     db: Session = Depends(get_db),
 ):
+    # job_assessment_latest 主键查找 + job_assessment 主键 join
     record = (
-        db.query(models.JobAssessment)
+        latest_assessment_query(db)
         .filter(
-            models.JobAssessment.applicant_id == applicant_id,
-            models.JobAssessment.job_id == job_id
+            models.JobAssessmentLatest.applicant_id == applicant_id,
+            models.JobAssessmentLatest.job_id == job_id
         )
-        .order_by(models.JobAssessment.version.desc())
         .first()
     )
     if not record:
         raise HTTPException(status_code=404, detail="No assessment found")
 
-    data = record.data_json
-    return schemas.AssessmentResult(
-        jobId=record.job_id,
-        applicantId=record.applicant_id,
-        summary=data.get("summary", ""),
-        score=schemas.Score(**data.get("score", {})),
-        assessment_highlights=data.get("assessment_highlights", []),
-        recommendations_for_candidate=data.get("recommendations_for_candidate", []),
-        createdAt=record.created_at.isoformat() if record.created_at else ""
-    )
+    return build_assessment_result(record)
+
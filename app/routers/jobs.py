@@ -1,19 +1,28 @@
 from typing import List
 
-from fastapi import UploadFile, File, APIRouter, Depends, Query, HTTPException
+from fastapi import UploadFile, File, APIRouter, BackgroundTasks, Depends, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from .. import models, schemas
-from app.services.matching import calc_match_score
-import pdfplumber
-import docx
-import requests
-import datetime
+from app.services.multiget import fetch_by_ids
+from app.services.cache import job_cache
+from app.services.vector_index import job_vector_index, job_text
+from app.services.prescore import evaluate_resume
+from app.services.skills import ensure_synonyms, sync_job_skills
+from app.services.projection import projected_response, select_fields
+from app.services.deadline import SEARCH_QUERY_TIMEOUT, query_deadline
+from app.services.recommendations import on_job_created, read_feed, refresh_applicant
+from app.services.admission import AdmittedStreamingResponse, admission, assess_admission, client_key
+from app.services.assessments import record_assessment, save_resume
+from app.services.bulk_assessment import stream_bulk_assessment
+from app.services.assessment_stream import stream_assessment_events
+from app.services.extractors import ExtractionFailed, ExtractorUnavailable, UnsupportedFormat, extract_text
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
-AI_API_URL = "https://assess-cv.lhanddong.workers.dev/"
-
 def get_db():
     db = SessionLocal()
     try:
@@ -21,30 +30,41 @@ def get_db():
     finally:
         db.close()
 
-def extract_text_from_pdf(file: UploadFile) -> str:
-    with pdfplumber.open(file.file) as pdf:
-        return "\n".join(page.extract_text() or "" for page in pdf.pages)
-
-def extract_text_from_docx(file: UploadFile) -> str:
-    doc = docx.Document(file.file)
-    return "\n".join([p.text for p in doc.paragraphs])
+async def extract_resume_text(file: UploadFile) -> str:
+    # 按扩展名 / MIME 类型找提取器，后端第一次用到时才 import；解析是同步的，放到线程池里
+    try:
+        return await run_in_threadpool(extract_text, file.file, file.filename, file.content_type)
+    except UnsupportedFormat as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExtractorUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except ExtractionFailed as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 @router.post("", response_model=schemas.JobOut)
-def create_job(payload: schemas.JobCreate, db: Session = Depends(get_db)):
+def create_job(payload: schemas.JobCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     job = models.Job(**payload.dict())
     db.add(job)
+    db.flush()
+    sync_job_skills(db, job.id, job.skill_tags)
     db.commit()
     db.refresh(job)
+    job_cache.put(job)
+    if job_vector_index.loaded and job.status == "active":
+        job_vector_index.add(job.id, job_text(job))
+    background_tasks.add_task(on_job_created, job.id)
     return job
 
-@router.get("", response_model=list[schemas.JobOut])
+@router.get("", response_model=list[schemas.JobOut], dependencies=[Depends(query_deadline(SEARCH_QUERY_TIMEOUT))])
 def list_jobs(
     q: str | None = Query(None),
     role: str | None = Query(None),
     location: str | None = Query(None),
     limit: int = 50,
+    fields: str | None = Query(None, description="Comma separated subset of JobOut fields"),
     db: Session = Depends(get_db),
 ):
+    columns = select_fields(fields, schemas.JobOut)
     stmt = db.query(models.Job)
     if role:
         stmt = stmt.filter(models.Job.role == role)
@@ -55,16 +75,17 @@ def list_jobs(
         stmt = stmt.filter(
             (models.Job.title.like(like)) | (models.Job.description.like(like)) | (models.Job.skill_tags.like(like))
         )
-    return stmt.order_by(models.Job.created_at.desc()).limit(limit).all()
+    return projected_response(stmt.order_by(models.Job.created_at.desc()).limit(limit), models.Job, columns)
 
-@router.get("/by_company", response_model=list[schemas.JobOut])
+@router.get("/by_company", response_model=list[schemas.JobOut], dependencies=[Depends(query_deadline(SEARCH_QUERY_TIMEOUT))])
 def list_jobs_by_company_id(
         company_id: int = Query(..., description="The ID of the company whose jobs to retrieve."),
         q: str | None = Query(None),
         limit: int = 50,
+        fields: str | None = Query(None, description="Comma separated subset of JobOut fields"),
         db: Session = Depends(get_db),
 ):
-
+    columns = select_fields(fields, schemas.JobOut)
     stmt = db.query(models.Job).filter(models.Job.company_id == company_id)
 
     if q:
@@ -75,7 +96,7 @@ def list_jobs_by_company_id(
             | (models.Job.skill_tags.like(like))
         )
 
-    return stmt.order_by(models.Job.created_at.desc()).limit(limit).all()
+    return projected_response(stmt.order_by(models.Job.created_at.desc()).limit(limit), models.Job, columns)
 @router.get("/list_by_job_ids", response_model=list[schemas.JobOut])
 def list_jobs_by_job_ids(
     job_ids: str = Query(...),
@@ -94,35 +115,63 @@ def list_jobs_by_job_ids(
 
     return jobs[:limit]
 
-@router.get("/{job_id}", response_model=schemas.JobOut)
-def get_job(job_id: int, db: Session = Depends(get_db)):
-    job = db.query(models.Job).filter(models.Job.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-    return job
+@router.post("/by_ids", response_model=schemas.JobMultiGetOut)
+def get_jobs_by_ids(payload: schemas.MultiGetIn):
+    items, missing_ids = fetch_by_ids(models.Job, payload.ids)
+    return {"items": items, "missing_ids": missing_ids}
 
-@router.get("/recommend/{applicant_id}")
-def recommend_jobs(applicant_id: int, db: Session = Depends(get_db)):
-    a = db.get(models.Applicant, applicant_id)
-    if not a:
-        return []
+@router.get("/facets")
+def job_facets(
+    status: str = Query("active"),
+    role: str | None = Query(None),
+    location: str | None = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """按技能 / 岗位 / 地点统计职位数，走 job_skill 和 (status, role|location) 索引上的聚合。"""
+    filters = [models.Job.status == status]
+    if role:
+        filters.append(models.Job.role == role)
+    if location:
+        filters.append(models.Job.location == location)
 
-    jobs = (
-        db.query(models.Job)
-        .filter(models.Job.role == a.desired_role)
-        .filter((models.Job.location == a.desired_location) | (models.Job.location == "Remote") | (a.desired_location == None))
-        .order_by(models.Job.created_at.desc())
-        .limit(200)
+    skills = (
+        db.query(models.Skill.name, func.count(models.JobSkill.job_id).label("count"))
+        .join(models.JobSkill, models.JobSkill.skill_id == models.Skill.id)
+        .join(models.Job, models.Job.id == models.JobSkill.job_id)
+        .filter(*filters)
+        .group_by(models.Skill.name)
+        .order_by(func.count(models.JobSkill.job_id).desc())
+        .limit(limit)
         .all()
     )
 
-    def same_loc(job_loc: str | None) -> bool:
-        return bool(a.desired_location and (job_loc == a.desired_location or job_loc == "Remote"))
+    def count_by(column):
+        return (
+            db.query(column, func.count(models.Job.id))
+            .filter(*filters)
+            .group_by(column)
+            .order_by(func.count(models.Job.id).desc())
+            .limit(limit)
+            .all()
+        )
+
+    return {
+        "skills": [{"name": name, "count": count} for name, count in skills],
+        "roles": [{"name": name, "count": count} for name, count in count_by(models.Job.role)],
+        "locations": [{"name": name, "count": count} for name, count in count_by(models.Job.location) if name],
+    }
 
-    result = []
-    for j in jobs:
-        score = calc_match_score(a.skill_tags, j.skill_tags, same_loc(j.location))
-        result.append({
+def _similar(db: Session, resume_text: str, k: int) -> list[dict]:
+    job_vector_index.ensure_fresh(db)
+    hits = job_vector_index.query(resume_text, k)
+    jobs, missing_ids = fetch_by_ids(models.Job, [job_id for job_id, _ in hits])
+    by_id = {j.id: j for j in jobs if j.status == "active"}
+    # 已删除 / 下线的职位从索引里移除，不必等下一次整体重建
+    for job_id in [*missing_ids, *(j.id for j in jobs if j.status != "active")]:
+        job_vector_index.remove(job_id)
+    return [
+        {
             "id": j.id,
             "title": j.title,
             "company_name": j.company_name,
@@ -131,46 +180,66 @@ def recommend_jobs(applicant_id: int, db: Session = Depends(get_db)):
             "employment_type": j.employment_type,
             "skill_tags": j.skill_tags,
             "salary": j.salary,
-            "matchScore": score,
+            "similarity": similarity,
             "created_at": j.created_at,
-        })
-    result.sort(key=lambda x: (-x["matchScore"], x["created_at"]))
-    return result[:50]
+        }
+        for job_id, similarity in hits
+        if (j := by_id.get(job_id)) is not None
+    ]
+
+@router.post("/similar")
+async def similar_jobs(
+    file: UploadFile = File(...),
+    k: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    """本地 TF-IDF 相似度匹配简历和职位描述，不调用 LLM。"""
+    resume_text = await extract_resume_text(file)
+    # 索引刷新 / 重建和数据库读取都是同步的，放到线程池里，不阻塞事件循环
+    return await run_in_threadpool(_similar, db, resume_text, k)
+
+@router.get("/{job_id}", response_model=schemas.JobOut)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = job_cache.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
-@router.post("/{job_id}/assess")
+@router.get("/recommend/{applicant_id}")
+def recommend_jobs(applicant_id: int, db: Session = Depends(get_db)):
+    # 优先读预计算的 feed，没有或过期时实时计算并写回
+    feed = read_feed(db, applicant_id)
+    if feed is not None:
+        return feed
+
+    a = db.get(models.Applicant, applicant_id)
+    if not a:
+        return []
+    return refresh_applicant(db, a)
+
+@router.post("/{job_id}/assess", dependencies=[Depends(admission(assess_admission))])
 async def assess_cv(
     job_id: int,
     file: UploadFile = File(...),
+    force_llm: bool = Query(False, description="Always call the LLM, even below the pre-score threshold"),
+    applicant_id: int | None = Query(None, description="Applicant the CV belongs to; the resume text is stored for later re-assessment"),
     db: Session = Depends(get_db),
 ):
     # 获取 Job 数据
-    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    job = job_cache.get(db, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
     # 解析简历文字
-    ext = file.filename.lower()
-    if ext.endswith(".pdf"):
-        resume_text = extract_text_from_pdf(file)
-    elif ext.endswith(".docx"):
-        resume_text = extract_text_from_docx(file)
-    elif ext.endswith(".txt"):
-        resume_text = await file.read()
-        resume_text = resume_text.decode("utf-8")
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file format")
-
-    # 构建请求体
-    payload = {
-        "jd_text": job.description,
-        "resume_text": resume_text
-    }
+    resume_text = await extract_resume_text(file)
+
+    if applicant_id is not None:
+        save_resume(db, applicant_id, file.filename, resume_text)
 
-    # 发送到 AI 服务
+    # 本地预评分，分数太低时不调用 LLM；否则发送到 AI 服务
+    ensure_synonyms(db)
     try:
-        response = requests.post(AI_API_URL, json=payload, timeout=300)
-        response.raise_for_status()
-        data = response.json()
+        data, provisional = await run_in_threadpool(evaluate_resume, job, resume_text, force_llm)
         # mock data
         # data = {
         #     "summary": "候选人Mingle Zhang的简历与Generative AI Engineer职位描述有一定匹配，但需要进一步强化相关技能和经验",
@@ -193,19 +262,67 @@ async def assess_cv(
         #     ]
         # };
 
-        version = datetime.datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        # 存到 job_assessment 表，同时更新 latest 指针
+        record_assessment(db, applicant_id=applicant_id or 1, job_id=job_id, data=data)
 
-        # 存到 job_assessment 表
-        new_assessment = models.JobAssessment(
-            applicant_id=1,
-            job_id=job_id,
-            version=version,
-            data_json=data
-        )
-        db.add(new_assessment)
-        db.commit()
-        db.refresh(new_assessment)
-
-        return {"success": True, "data": data}
+        return {"success": True, "provisional": provisional, "data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI assessment failed: {e}")
+
+
+@router.post("/{job_id}/assess/stream")
+async def assess_cv_stream(
+    request: Request,
+    job_id: int,
+    file: UploadFile = File(...),
+    force_llm: bool = Query(False, description="Always call the LLM, even below the pre-score threshold"),
+    applicant_id: int | None = Query(None, description="Applicant the CV belongs to; the resume text is stored for later re-assessment"),
+    raw: bool = Query(False, description="Also forward the raw model output as `delta` events"),
+    db: Session = Depends(get_db),
+):
+    """assess_cv 的流式版本：通过 SSE 边生成边推送 summary / score / 每条 highlight，结束时写入 job_assessment。"""
+    job = job_cache.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    resume_text = await extract_resume_text(file)
+
+    if applicant_id is not None:
+        save_resume(db, applicant_id, file.filename, resume_text)
+    ensure_synonyms(db)
+
+    # 名额要占到流结束为止，所以不用 admission 依赖；先在这里拿名额（排满时还能返回 429），
+    # 交给 AdmittedStreamingResponse 在响应结束时释放
+    client = client_key(request)
+    await assess_admission.acquire(client)
+    try:
+        events = stream_assessment_events(job, resume_text, applicant_id or 1, force_llm, raw)
+        return AdmittedStreamingResponse(
+            events, assess_admission, client,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    except BaseException:
+        assess_admission.release(client, 0.0)
+        raise
+
+
+@router.post("/{job_id}/assess-all")
+async def assess_all_applicants(
+    request: Request,
+    job_id: int,
+    run_id: int | None = Query(None, description="Resume an earlier run; applicants already assessed in it are skipped"),
+    concurrency: int = Query(4, ge=1, le=16, description="Capped at the per-client assessment limit; the start event reports the value used"),
+    force_llm: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    """对该职位的所有申请人用已保存的简历做评估，通过 SSE 推送进度和每个人的结果。"""
+    job = job_cache.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return StreamingResponse(
+        stream_bulk_assessment(job, run_id, concurrency, force_llm, client_key(request)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
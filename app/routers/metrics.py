@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+
+from app.services.cache import cache_stats
+from app.services.llm import assessment_stats
+from app.services.admission import assess_admission
+from app.services.deadline import query_stats
+from app.services.tracing import tracing_stats
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("/cache")
+def read_cache_stats():
+    return {"caches": cache_stats()}
+
+
+@router.get("/assessment")
+def read_assessment_stats():
+    return assessment_stats.snapshot()
+
+
+@router.get("/admission")
+def read_admission_stats():
+    return {"routes": [assess_admission.snapshot()]}
+
+
+@router.get("/queries")
+def read_query_stats():
+    return query_stats.snapshot()
+
+
+@router.get("/tracing")
+def read_tracing_stats():
+    return tracing_stats()
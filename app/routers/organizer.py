@@ -3,6 +3,7 @@
 from fastapi import APIRouter, Depends
 # 假设 db.py 提供了 get_db_engine 函数
 from app.db import get_db_engine
+from app.services.deadline import REPORT_QUERY_TIMEOUT, query_deadline
 from sqlalchemy import create_engine
 from typing import List
 
@@ -13,6 +14,8 @@ from app.schemas import OrganizerStatsOut, ApplicationTrend, CompanyLeaderboardI
 router = APIRouter(
     prefix="/organizer",
     tags=["Organizer Dashboard"],
+    # 排行榜 / 趋势是大表聚合，单独给一个更宽松的截止时间
+    dependencies=[Depends(query_deadline(REPORT_QUERY_TIMEOUT))],
 )
 
 @router.get("/stats", response_model=OrganizerStatsOut)
@@ -0,0 +1,38 @@
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.db import SessionLocal
+from .. import schemas
+from app.services.search_index import SOURCES, search_index
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/suggest", response_model=schemas.SearchSuggestOut)
+def suggest(
+    q: str = Query(..., min_length=1, max_length=100, description="输入中的关键词，最后一个词按前缀匹配，容忍拼写错误"),
+    types: str = Query("applicant,company", description="Comma separated: applicant, company"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    kinds = [t.strip() for t in types.split(",") if t.strip()]
+    unknown = [k for k in kinds if k not in SOURCES]
+    if unknown or not kinds:
+        raise HTTPException(400, f"Unknown types: {', '.join(unknown) or types!r}")
+    started = time.perf_counter()
+    if not search_index.ensure_fresh(db):
+        # 索引在后台预热，不在请求里等整体构建
+        return {"items": [], "took_ms": round((time.perf_counter() - started) * 1000, 3), "warming": True}
+    items = search_index.suggest(q, kinds, limit)
+    return {"items": items, "took_ms": round((time.perf_counter() - started) * 1000, 3)}
+
+@router.get("/stats")
+def read_search_stats():
+    return search_index.stats()
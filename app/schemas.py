@@ -71,6 +71,34 @@ class ApplicationOut(ApplicationCreate, ORMBase):
     updated_at: Optional[datetime]
 
 
+class ApplicationBulkCreate(BaseModel):
+    applicant_id: int
+    job_ids: List[int] = Field(..., min_length=1, max_length=200)
+
+
+class ApplicationBulkOut(BaseModel):
+    created: List[ApplicationOut]
+    already_applied: List[int]
+    missing_job_ids: List[int]
+
+
+class StatusBatchUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=500)
+    status: str
+
+
+class StatusRejection(BaseModel):
+    id: int
+    status: Optional[str]
+    reason: str
+
+
+class ApplicationStatusBatchOut(BaseModel):
+    updated: List[ApplicationOut]
+    rejected: List[StatusRejection]
+    missing_ids: List[int]
+
+
 class JobAssessmentCreate(BaseModel):
     applicant_id: int
     job_id: int
@@ -85,12 +113,37 @@ class JobAssessmentOut(JobAssessmentCreate, ORMBase):
     updated_at: Optional[datetime]
 
 
+class MultiGetIn(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=5000)
+
+
+class JobMultiGetOut(BaseModel):
+    items: List[JobOut]
+    missing_ids: List[int]
+
+
+class ApplicantMultiGetOut(BaseModel):
+    items: List[ApplicantOut]
+    missing_ids: List[int]
+
+
+class CompanyMultiGetOut(BaseModel):
+    items: List[CompanyOut]
+    missing_ids: List[int]
+
+
+class ApplicationMultiGetOut(BaseModel):
+    items: List[ApplicationOut]
+    missing_ids: List[int]
+
+
 class Score(BaseModel):
     overall: int
-    skills_match: int
-    experience_depth: int
-    education_match: int
-    potential_fit: int
+    # 本地预评分（provisional）只算 overall / skills_match，其余分项为空
+    skills_match: Optional[int] = None
+    experience_depth: Optional[int] = None
+    education_match: Optional[int] = None
+    potential_fit: Optional[int] = None
 
 
 class AssessmentResult(BaseModel):
@@ -101,6 +154,7 @@ class AssessmentResult(BaseModel):
     assessment_highlights: List[str]
     recommendations_for_candidate: List[str]
     createdAt: str
+    provisional: bool = False
 
 
 class InterviewCreate(BaseModel):
@@ -124,6 +178,19 @@ class InterviewOut(InterviewCreate):
     class Config:
         from_attributes = True
 
+class InterviewStatusBatchOut(BaseModel):
+    updated: List[InterviewOut]
+    rejected: List[StatusRejection]
+    missing_ids: List[int]
+
+class ApplicantOverviewOut(BaseModel):
+    applicant: ApplicantOut
+    applications: Optional[List[ApplicationOut]] = None
+    jobs: Optional[List[JobOut]] = None
+    companies: Optional[List[CompanyOut]] = None
+    assessments: Optional[List[AssessmentResult]] = None
+    interviews: Optional[List[InterviewOut]] = None
+
 class OrganizerStatsOut(BaseModel):
     total_students: int
     total_companies: int
@@ -153,6 +220,21 @@ class CompanyLeaderboardItem(BaseModel):
     interviews: int
     placements: int
 
+
+class SearchSuggestion(BaseModel):
+    type: str  # applicant / company
+    id: int
+    label: str
+    detail: str
+    score: float
+    matched_field: Optional[str] = None
+
+
+class SearchSuggestOut(BaseModel):
+    items: List[SearchSuggestion]
+    took_ms: float
+    warming: bool = False  # 索引还在预热，items 为空
+
 # schemas.py
 
 class MarketingCommIn(BaseModel):
@@ -0,0 +1,239 @@
+import asyncio
+import ipaddress
+import math
+import os
+import time
+from collections import deque
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+
+class AdmissionController:
+    """
+    单个路由的准入控制：最多 max_concurrency 个请求同时执行，其余进入有上限的等待队列，
+    超过 queue_timeout 仍未轮到则返回 429。
+    队列按客户端轮询出队，每个客户端（执行中 + 排队中）最多 per_client_limit 个，一个用户刷不满整个队列。
+    只在事件循环线程里调用，不需要加锁。
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float, per_client_limit: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.per_client_limit = per_client_limit
+
+        self.in_flight = 0
+        self.queued = 0
+        self._waiters: dict[str, deque] = {}
+        self._turns: deque[str] = deque()
+        self._client_load: dict[str, int] = {}
+
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_client_limit = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.completed = 0
+        self.total_service = 0.0
+
+    def _reject(self, detail: str):
+        # 按平均处理时长估算多久之后再试
+        avg = self.total_service / self.completed if self.completed else 5.0
+        retry_after = math.ceil(avg * (self.queued + 1) / self.max_concurrency)
+        raise HTTPException(
+            status_code=429,
+            detail=detail,
+            headers={"Retry-After": str(min(max(retry_after, 1), 120))},
+        )
+
+    async def acquire(self, client: str) -> float:
+        """拿到执行名额后返回等待的秒数。"""
+        if self._client_load.get(client, 0) >= self.per_client_limit:
+            self.rejected_client_limit += 1
+            self._reject("Too many concurrent requests from this client")
+
+        if self.in_flight < self.max_concurrency and not self.queued:
+            self.in_flight += 1
+            self._admit(client, 0.0)
+            return 0.0
+
+        if self.queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            self._reject(f"{self.name} is busy, please retry later")
+
+        future = asyncio.get_running_loop().create_future()
+        if client not in self._waiters:
+            self._waiters[client] = deque()
+            self._turns.append(client)
+        self._waiters[client].append(future)
+        self.queued += 1
+        self._client_load[client] = self._client_load.get(client, 0) + 1
+
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(client, future)
+            self.timed_out += 1
+            self._reject(f"{self.name} queue wait exceeded {self.queue_timeout:g}s")
+        except asyncio.CancelledError:
+            # 客户端断开
+            self._abandon(client, future)
+            raise
+
+        waited = time.monotonic() - started
+        self._client_load[client] -= 1
+        self._admit(client, waited)
+        return waited
+
+    def _admit(self, client: str, waited: float):
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self._client_load[client] = self._client_load.get(client, 0) + 1
+
+    def _abandon(self, client: str, future):
+        if future.done() and not future.cancelled():
+            # 超时 / 取消的同时名额已经交给了我们，转交给下一个
+            self._client_load[client] -= 1
+            if not self._client_load[client]:
+                del self._client_load[client]
+            self.release(client, 0.0, counted=False)
+        else:
+            self._drop_waiter(client, future)
+
+    def _drop_waiter(self, client: str, future):
+        queue = self._waiters.get(client)
+        if queue is not None and future in queue:
+            queue.remove(future)
+            self.queued -= 1
+            if not queue:
+                del self._waiters[client]
+                self._turns.remove(client)
+        # 不在队列里说明 release() 已经把它（已取消的 future）弹出并跳过了
+        self._client_load[client] -= 1
+        if not self._client_load[client]:
+            del self._client_load[client]
+
+    def release(self, client: str, service_seconds: float, counted: bool = True):
+        if counted:
+            self.completed += 1
+            self.total_service += service_seconds
+            self._client_load[client] -= 1
+            if not self._client_load[client]:
+                del self._client_load[client]
+
+        # 名额直接交给下一个客户端的排队请求（轮询），in_flight 不变
+        while self._turns:
+            next_client = self._turns.popleft()
+            queue = self._waiters[next_client]
+            future = queue.popleft()
+            self.queued -= 1
+            if queue:
+                self._turns.append(next_client)
+            else:
+                del self._waiters[next_client]
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "per_client_limit": self.per_client_limit,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_client_limit": self.rejected_client_limit,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 1) if self.admitted else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "avg_service_seconds": round(self.total_service / self.completed, 3) if self.completed else 0.0,
+        }
+
+
+def _parse_networks(value: str) -> list:
+    return [ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip()]
+
+
+# 可信的反向代理（逗号分隔的 IP / CIDR，例如 Nginx 所在的 127.0.0.1,10.0.0.0/8）；
+# 只有直接连过来的是这些地址时才看 X-Forwarded-For，否则客户端换个请求头就能拿到新的配额
+TRUSTED_PROXIES = _parse_networks(os.getenv("TRUSTED_PROXIES", ""))
+
+
+def _is_trusted(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def client_key(request: Request) -> str:
+    """
+    按客户端 IP 区分。对端是可信代理时，从 X-Forwarded-For 右边往左跳过可信代理，
+    取第一个不可信的地址（代理追加的那一跳）；更左边的地址是客户端自己填的，不采信。
+    """
+    host = request.client.host if request.client else "unknown"
+    if not _is_trusted(host):
+        return host
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop):
+            return hop
+    return host
+
+
+def admission(controller: AdmissionController):
+    """FastAPI 依赖：在路由执行期间占用一个名额。"""
+    async def dependency(request: Request):
+        client = client_key(request)
+        await controller.acquire(client)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            controller.release(client, time.monotonic() - started)
+    return dependency
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    持有一个已拿到的名额直到响应结束的流式响应。名额在 __call__ 的 finally 里释放：
+    事件流还没开始迭代客户端就断开、发送时出错，都不会漏掉释放。
+    """
+
+    def __init__(self, content, controller: AdmissionController, client: str, **kwargs):
+        super().__init__(content, **kwargs)
+        self.controller = controller
+        self.client = client
+        self.started = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.controller.release(self.client, time.monotonic() - self.started)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+
+
+assess_admission = AdmissionController(
+    "assessment",
+    max_concurrency=int(os.getenv("ASSESS_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("ASSESS_MAX_QUEUE", "32")),
+    queue_timeout=float(os.getenv("ASSESS_QUEUE_TIMEOUT", "30")),
+    per_client_limit=int(os.getenv("ASSESS_PER_CLIENT_LIMIT", "2")),
+)
@@ -0,0 +1,78 @@
+import logging
+
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from app.db import SessionLocal
+from app.services.assessments import record_assessment
+from app.services.bulk_assessment import sse
+from app.services.json_stream import IncrementalJSONParser
+from app.services.llm import stream_assessment
+from app.services.prescore import triage
+
+logger = logging.getLogger(__name__)
+
+# 顶层数组字段 -> 每个元素完整时推送的事件名
+ITEM_EVENTS = {
+    "assessment_highlights": "highlight",
+    "recommendations_for_candidate": "recommendation",
+}
+
+
+def _persist(applicant_id: int, job_id: int, data: dict) -> int:
+    db = SessionLocal()
+    try:
+        return record_assessment(db, applicant_id=applicant_id, job_id=job_id, data=data).id
+    finally:
+        db.close()
+
+
+def _to_sse(event: tuple) -> str | None:
+    if event[0] == "item":
+        _, key, index, value = event
+        name = ITEM_EVENTS.get(key)
+        return sse(name, {"index": index, "text": value}) if name else None
+    _, key, value = event
+    if key in ITEM_EVENTS:
+        # 元素已经逐条推送过
+        return None
+    if key in ("summary", "score"):
+        return sse(key, {key: value})
+    return sse("field", {"key": key, "value": value})
+
+
+async def stream_assessment_events(
+    job: dict,
+    resume_text: str,
+    applicant_id: int,
+    force_llm: bool = False,
+    raw: bool = False,
+):
+    """
+    SSE 事件流：prescore（本地预评分，立即返回）→ summary / score / highlight / recommendation（模型输出到哪推到哪）
+    → done（完整结果，已写入 job_assessment）。raw=True 时额外推送模型的原始输出片段 delta。
+    """
+    try:
+        data, provisional = await run_in_threadpool(triage, job, resume_text, force_llm)
+        yield sse("prescore", {"score": data["score"], "provisional": provisional})
+
+        if not provisional:
+            parser = IncrementalJSONParser()
+            chunks = stream_assessment(job.get("description"), resume_text)
+            async for chunk in iterate_in_threadpool(chunks):
+                if raw:
+                    yield sse("delta", {"text": chunk})
+                for event in parser.feed(chunk):
+                    message = _to_sse(event)
+                    if message:
+                        yield message
+                if parser.complete:
+                    break
+            # 拿到完整对象后不再等 [DONE]，立即关闭到 worker 的连接
+            await run_in_threadpool(chunks.close)
+            data = parser.result()
+
+        assessment_id = await run_in_threadpool(_persist, applicant_id, job["id"], data)
+        yield sse("done", {"assessment_id": assessment_id, "provisional": provisional, "data": data})
+    except Exception as e:
+        logger.warning("streaming assessment failed for job %s: %s", job["id"], e)
+        yield sse("error", {"message": f"AI assessment failed: {e}"})
@@ -0,0 +1,206 @@
+import datetime
+import os
+import sys
+
+from sqlalchemy import case, delete, exists, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.services.tracing import traced
+
+# 压缩策略：每个 (applicant, job) 至少保留最近 N 个版本，更旧的版本超过保留天数后归档或删除
+ASSESSMENT_KEEP_VERSIONS = int(os.getenv("ASSESSMENT_KEEP_VERSIONS", "3"))
+ASSESSMENT_RETENTION_DAYS = int(os.getenv("ASSESSMENT_RETENTION_DAYS", "30"))
+
+
+# 本地预评分（data_json.provisional）写入的版本号带这个后缀，latest 指针据此判断能否被覆盖
+PROVISIONAL_VERSION_SUFFIX = "-provisional"
+
+
+def is_provisional_version(version: str | None) -> bool:
+    return bool(version) and version.endswith(PROVISIONAL_VERSION_SUFFIX)
+
+
+@traced("assessment.record")
+def record_assessment(db: Session, applicant_id: int, job_id: int, data: dict) -> models.JobAssessment:
+    """
+    写入一条新的 job_assessment，并在同一事务里把 latest 指针指向它。
+    本地预评分（provisional）结果照常保存，但不会取代已有的 LLM 评估成为 latest。
+    """
+    version = datetime.datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    if data.get("provisional"):
+        version += PROVISIONAL_VERSION_SUFFIX
+    assessment = models.JobAssessment(
+        applicant_id=applicant_id,
+        job_id=job_id,
+        version=version,
+        data_json=data
+    )
+    db.add(assessment)
+    db.flush()
+    _point_latest(db, applicant_id, job_id, assessment.id, version)
+    db.commit()
+    return assessment
+
+
+def save_resume(db: Session, applicant_id: int, file_name: str | None, resume_text: str):
+    """保存（覆盖）申请人的简历文本。"""
+    resume = db.get(models.ApplicantResume, applicant_id)
+    if resume is None:
+        db.add(models.ApplicantResume(applicant_id=applicant_id, file_name=file_name, resume_text=resume_text))
+    else:
+        resume.file_name = file_name
+        resume.resume_text = resume_text
+    db.commit()
+
+
+def _point_latest(db: Session, applicant_id: int, job_id: int, assessment_id: int, version: str):
+    """
+    用条件 UPDATE 移动 latest 指针：只有新行的 id 更大时才生效，并发写入不会让旧评估盖掉新评估；
+    provisional 行只能取代 provisional 指针。还没有指针时插入，主键冲突说明并发写入刚插入，再 UPDATE 一次。
+    """
+    latest = models.JobAssessmentLatest
+    conditions = [
+        latest.applicant_id == applicant_id,
+        latest.job_id == job_id,
+        latest.job_assessment_id < assessment_id,
+    ]
+    if is_provisional_version(version):
+        conditions.append(latest.version.like(f"%{PROVISIONAL_VERSION_SUFFIX}"))
+    move = update(latest).where(*conditions).values(job_assessment_id=assessment_id, version=version)
+    if db.execute(move).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(latest).values(
+                applicant_id=applicant_id, job_id=job_id, job_assessment_id=assessment_id, version=version,
+            ))
+    except IntegrityError:
+        db.execute(move)
+
+
+def latest_assessment_query(db: Session):
+    """job_assessment JOIN job_assessment_latest，调用方再按 applicant_id / job_id 过滤。"""
+    return db.query(models.JobAssessment).join(
+        models.JobAssessmentLatest,
+        models.JobAssessmentLatest.job_assessment_id == models.JobAssessment.id,
+    )
+
+
+def build_assessment_result(record: models.JobAssessment) -> schemas.AssessmentResult:
+    data = record.data_json
+    return schemas.AssessmentResult(
+        jobId=record.job_id,
+        applicantId=record.applicant_id,
+        summary=data.get("summary", ""),
+        score=schemas.Score(**data.get("score", {})),
+        assessment_highlights=data.get("assessment_highlights", []),
+        recommendations_for_candidate=data.get("recommendations_for_candidate", []),
+        createdAt=record.created_at.isoformat() if record.created_at else "",
+        provisional=bool(data.get("provisional")),
+    )
+
+
+def backfill_latest(db: Session) -> int:
+    """
+    根据已有数据重建 job_assessment_latest（上线指针表时执行一次）。
+    和 _point_latest 的规则一致：指向最新的非 provisional 评估，只有预评分结果时才指向最新的 provisional 行。
+    """
+    final = case((models.JobAssessment.version.not_like(f"%{PROVISIONAL_VERSION_SUFFIX}"), models.JobAssessment.id))
+    newest = (
+        select(func.coalesce(func.max(final), func.max(models.JobAssessment.id)).label("id"))
+        .group_by(models.JobAssessment.applicant_id, models.JobAssessment.job_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            models.JobAssessment.applicant_id,
+            models.JobAssessment.job_id,
+            models.JobAssessment.id,
+            models.JobAssessment.version,
+        ).join(newest, newest.c.id == models.JobAssessment.id)
+    ).all()
+    db.execute(delete(models.JobAssessmentLatest))
+    if rows:
+        db.execute(insert(models.JobAssessmentLatest), [
+            {"applicant_id": a, "job_id": j, "job_assessment_id": i, "version": v}
+            for a, j, i, v in rows
+        ])
+    db.commit()
+    return len(rows)
+
+
+def compact(
+    db: Session,
+    keep_versions: int = ASSESSMENT_KEEP_VERSIONS,
+    retention_days: int = ASSESSMENT_RETENTION_DAYS,
+    archive: bool = True,
+    batch_size: int = 200,
+) -> dict:
+    """
+    清理被新版本取代的评估：
+    每个 (applicant, job) 保留最新 keep_versions 个版本、latest 指针指向的版本和被 application 引用的版本，
+    其余早于 retention_days 的版本移到 job_assessment_archive（archive=False 时直接删除）。
+    """
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=retention_days)
+    pairs = db.execute(
+        select(models.JobAssessment.applicant_id, models.JobAssessment.job_id)
+        .group_by(models.JobAssessment.applicant_id, models.JobAssessment.job_id)
+        .having(func.count() > keep_versions)
+    ).all()
+
+    referenced = exists().where(models.Application.job_assessment_id == models.JobAssessment.id)
+    is_latest = exists().where(models.JobAssessmentLatest.job_assessment_id == models.JobAssessment.id)
+    removed = 0
+    for start in range(0, len(pairs), batch_size):
+        ids = []
+        for applicant_id, job_id in pairs[start:start + batch_size]:
+            pair = (models.JobAssessment.applicant_id == applicant_id, models.JobAssessment.job_id == job_id)
+            keep = db.execute(
+                select(models.JobAssessment.id).where(*pair)
+                .order_by(models.JobAssessment.id.desc())
+                .limit(keep_versions)
+            ).scalars().all()
+            ids += db.execute(
+                select(models.JobAssessment.id).where(
+                    *pair,
+                    models.JobAssessment.id.not_in(keep),
+                    models.JobAssessment.created_at < cutoff,
+                    ~referenced,
+                    ~is_latest,
+                )
+            ).scalars().all()
+        if not ids:
+            continue
+        if archive:
+            columns = ["id", "applicant_id", "job_id", "version", "data_json", "created_at", "updated_at"]
+            db.execute(
+                insert(models.JobAssessmentArchive).from_select(
+                    columns,
+                    select(*[getattr(models.JobAssessment, c) for c in columns])
+                    .where(models.JobAssessment.id.in_(ids)),
+                )
+            )
+        db.execute(delete(models.JobAssessment).where(models.JobAssessment.id.in_(ids)))
+        db.commit()
+        removed += len(ids)
+
+    return {"pairs_checked": len(pairs), "removed": removed, "archived": archive}
+
+
+if __name__ == "__main__":
+    # python -m app.services.assessments backfill-latest | compact [--prune]
+    from app.db import SessionLocal
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    session = SessionLocal()
+    try:
+        if command == "backfill-latest":
+            print({"pointers": backfill_latest(session)})
+        elif command == "compact":
+            print(compact(session, archive="--prune" not in sys.argv[2:]))
+        else:
+            sys.exit("usage: python -m app.services.assessments backfill-latest | compact [--prune]")
+    finally:
+        session.close()
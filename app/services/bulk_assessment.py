@@ -0,0 +1,213 @@
+import asyncio
+import json
+import logging
+import time
+
+import anyio
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+
+from app import models
+from app.db import SessionLocal
+from app.services.admission import assess_admission
+from app.services.assessments import record_assessment
+from app.services.llm import request_assessment
+from app.services.prescore import triage
+from app.services.skills import ensure_synonyms
+from app.services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def _prepare_run(job_id: int, run_id: int | None) -> tuple[int, list, list[int]]:
+    """
+    创建（或恢复）一次批量评估，返回 (run_id, 待评估的 (application_id, applicant_id, resume_text), 没有简历的 applicant_id)。
+    恢复时，本次 run 开始之后已经评估过的申请人会被跳过（断点续跑），done / failed 按已有结果重新计算。
+    """
+    db = SessionLocal()
+    try:
+        ensure_synonyms(db)
+        if run_id is None:
+            run = models.BulkAssessmentRun(job_id=job_id, status="running")
+            db.add(run)
+            db.commit()
+            db.refresh(run)
+        else:
+            run = db.get(models.BulkAssessmentRun, run_id)
+            if run is None or run.job_id != job_id:
+                raise LookupError(f"Run {run_id} not found for job {job_id}")
+            run.status = "running"
+            db.commit()
+
+        applications = db.execute(
+            select(models.Application.id, models.Application.applicant_id, models.ApplicantResume.resume_text)
+            .outerjoin(models.ApplicantResume, models.ApplicantResume.applicant_id == models.Application.applicant_id)
+            .where(models.Application.job_id == job_id)
+            .order_by(models.Application.id)
+        ).all()
+
+        # 直接查本次 run 开始之后写入的 job_assessment，不经过 latest 指针：
+        # 预评分结果不会取代已有的 LLM 评估成为 latest，但同样算作本次已经评估过。
+        # started_at 用子查询在数据库里比较，两边都是数据库生成的时间，格式和精度一致
+        started_at = select(models.BulkAssessmentRun.started_at).where(models.BulkAssessmentRun.id == run.id)
+        done_since_start = set(db.execute(
+            select(models.JobAssessment.applicant_id)
+            .where(models.JobAssessment.job_id == job_id, models.JobAssessment.created_at >= started_at.scalar_subquery())
+            .distinct()
+        ).scalars()) if run_id is not None else set()
+
+        todo = [(a, p, text) for a, p, text in applications if text and p not in done_since_start]
+        no_resume = [p for _, p, text in applications if not text]
+        run.total = len(applications)
+        # 上次失败的申请人这次会重新评估，所以 failed 从 0 开始
+        run.done = sum(1 for _, p, _ in applications if p in done_since_start)
+        run.failed = 0
+        db.commit()
+        return run.id, todo, no_resume
+    finally:
+        db.close()
+
+
+def _save_result(run_id: int, job_id: int, application_id: int, applicant_id: int, data: dict | None):
+    db = SessionLocal()
+    try:
+        if data is not None:
+            assessment = record_assessment(db, applicant_id=applicant_id, job_id=job_id, data=data)
+            db.execute(
+                update(models.Application)
+                .where(models.Application.id == application_id)
+                .values(job_assessment_id=assessment.id)
+            )
+            column = models.BulkAssessmentRun.done
+        else:
+            column = models.BulkAssessmentRun.failed
+        db.execute(
+            update(models.BulkAssessmentRun)
+            .where(models.BulkAssessmentRun.id == run_id)
+            .values({column: column + 1})
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _finish_run(run_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        run = db.get(models.BulkAssessmentRun, run_id)
+        run.status = "completed"
+        run.finished_at = func.now()
+        db.commit()
+        db.refresh(run)
+        return {"run_id": run.id, "total": run.total, "done": run.done, "failed": run.failed}
+    finally:
+        db.close()
+
+
+def _fail_run(run_id: int):
+    """事件流没有走到 done（出错或客户端断开）时调用，之后可以用 run_id 续跑。"""
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(models.BulkAssessmentRun)
+            .where(models.BulkAssessmentRun.id == run_id, models.BulkAssessmentRun.status == "running")
+            .values(status="failed", finished_at=func.now())
+        )
+        db.commit()
+    except SQLAlchemyError:
+        logger.exception("could not mark bulk assessment run %s as failed", run_id)
+    finally:
+        db.close()
+
+
+async def _evaluate(job: dict, resume_text: str, force_llm: bool, client: str) -> tuple[dict, bool]:
+    """
+    evaluate_resume 的批量版本：预评分在线程池里算，需要调用 LLM 时才占用 assess_admission 的名额，
+    和 /assess 共用同一个并发上限和客户端配额。
+    """
+    data, provisional = await run_in_threadpool(triage, job, resume_text, force_llm)
+    if provisional:
+        return data, provisional
+    await assess_admission.acquire(client)
+    started = time.monotonic()
+    try:
+        data = await run_in_threadpool(request_assessment, job.get("description"), resume_text)
+    finally:
+        assess_admission.release(client, time.monotonic() - started)
+    return data, provisional
+
+
+async def _save(run_id: int, job_id: int, application_id: int, applicant_id: int, data: dict | None) -> str | None:
+    """保存一个申请人的结果；数据库出错时记为失败并返回错误信息。"""
+    try:
+        await run_in_threadpool(_save_result, run_id, job_id, application_id, applicant_id, data)
+        return None
+    except SQLAlchemyError as e:
+        logger.warning("could not save bulk assessment for applicant %s: %s", applicant_id, e)
+        if data is not None:
+            try:
+                await run_in_threadpool(_save_result, run_id, job_id, application_id, applicant_id, None)
+            except SQLAlchemyError:
+                logger.exception("could not count failure for applicant %s", applicant_id)
+        return f"Could not save the assessment: {e}"
+
+
+async def stream_bulk_assessment(job: dict, run_id: int | None, concurrency: int, force_llm: bool, client: str):
+    """
+    SSE 事件流：start → result / error（按完成顺序）→ done。
+    并发不超过 assess_admission 的单客户端配额，否则超出的 LLM 调用会被 429 拒绝；
+    实际使用的并发数放在 start 事件的 concurrency 里。
+    """
+    try:
+        run_id, todo, no_resume = await run_in_threadpool(_prepare_run, job["id"], run_id)
+    except LookupError as e:
+        yield sse("error", {"message": str(e)})
+        return
+
+    concurrency = min(concurrency, assess_admission.per_client_limit)
+    yield sse("start", {
+        "run_id": run_id, "job_id": job["id"], "pending": len(todo), "skipped_no_resume": no_resume,
+        "concurrency": concurrency,
+    })
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def assess(application_id: int, applicant_id: int, resume_text: str):
+        # span 是同步上下文管理器，不能和 semaphore 写在同一个 async with 里
+        async with semaphore:
+            with span("bulk.assess_applicant", applicant_id=applicant_id):
+                try:
+                    data, provisional = await _evaluate(job, resume_text, force_llm, client)
+                except Exception as e:
+                    logger.warning("bulk assessment failed for applicant %s: %s", applicant_id, e)
+                    await _save(run_id, job["id"], application_id, applicant_id, None)
+                    return {"applicant_id": applicant_id, "error": str(e)}
+                error = await _save(run_id, job["id"], application_id, applicant_id, data)
+                if error:
+                    return {"applicant_id": applicant_id, "error": error}
+                return {"applicant_id": applicant_id, "application_id": application_id, "provisional": provisional, "data": data}
+
+    tasks = [asyncio.create_task(assess(*item)) for item in todo]
+    completed = 0
+    finished = False
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            completed += 1
+            yield sse("error" if "error" in result else "result", result)
+            yield sse("progress", {"run_id": run_id, "completed": completed, "pending": len(todo) - completed})
+        summary = await run_in_threadpool(_finish_run, run_id)
+        finished = True
+        yield sse("done", summary)
+    finally:
+        # 客户端断开或出错时取消还没开始的评估，run 标记为 failed，之后可以用 run_id 续跑
+        for task in tasks:
+            task.cancel()
+        if not finished:
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(_fail_run, run_id)
@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+
+logger = logging.getLogger(__name__)
+
+# 设置后改用共享缓存服务（例如 redis://127.0.0.1:6379/0），多个 uvicorn worker 共用一份缓存
+ENTITY_CACHE_URL = os.getenv("ENTITY_CACHE_URL")
+
+
+class LocalLRUBackend:
+    """进程内 LRU，超过容量时淘汰最久未访问的 key。"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: int):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisBackend:
+    """共享缓存服务，淘汰策略交给服务端（maxmemory-policy allkeys-lru）。"""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("ENTITY_CACHE_URL is set but the 'redis' package is not installed") from e
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl: int):
+        self._client.set(key, json.dumps(value), ex=ttl)
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def __len__(self):
+        return -1
+
+
+_shared_backend = None
+
+
+def _make_backend(capacity: int):
+    global _shared_backend
+    if not ENTITY_CACHE_URL:
+        return LocalLRUBackend(capacity)
+    if _shared_backend is None:
+        _shared_backend = RedisBackend(ENTITY_CACHE_URL)
+    return _shared_backend
+
+
+class EntityCache:
+    """
+    按主键缓存实体，值为对应 Out schema 的 JSON dict。
+    读：未命中时从数据库加载并回填；写：创建的路由调用 put，
+    任何通过 ORM 修改 / 删除实体的事务提交后由下面的 Session 钩子调用 invalidate。
+    """
+
+    def __init__(self, name: str, model, schema, capacity: int, ttl: int):
+        self.name = name
+        self.model = model
+        self.schema = schema
+        self.ttl = int(os.getenv(f"ENTITY_CACHE_{name.upper()}_TTL", ttl))
+        capacity = int(os.getenv(f"ENTITY_CACHE_{name.upper()}_SIZE", capacity))
+        self.backend = _make_backend(capacity)
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        # 同步路由在线程池里并发读缓存，计数器的 += 不是原子操作
+        self._stats_lock = threading.Lock()
+
+    def _key(self, entity_id: int) -> str:
+        return f"entity:{self.name}:{entity_id}"
+
+    def get(self, db, entity_id: int) -> dict | None:
+        key = self._key(entity_id)
+        try:
+            value = self.backend.get(key)
+        except Exception:
+            logger.exception("entity cache get failed for %s", key)
+            value = None
+        if value is not None:
+            with self._stats_lock:
+                self.hits += 1
+            return value
+
+        with self._stats_lock:
+            self.misses += 1
+        row = db.get(self.model, entity_id)
+        if row is None:
+            return None
+        return self.put(row)
+
+    def put(self, row) -> dict:
+        value = self.schema.model_validate(row).model_dump(mode="json")
+        try:
+            self.backend.set(self._key(row.id), value, self.ttl)
+        except Exception:
+            logger.exception("entity cache set failed for %s:%s", self.name, row.id)
+        return value
+
+    def invalidate(self, entity_id: int):
+        try:
+            self.backend.delete(self._key(entity_id))
+        except Exception:
+            logger.exception("entity cache delete failed for %s:%s", self.name, entity_id)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "name": self.name,
+            "backend": type(self.backend).__name__,
+            "size": len(self.backend),
+            "capacity": self.capacity,
+            "ttl": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+
+
+job_cache = EntityCache("job", models.Job, schemas.JobOut, capacity=2000, ttl=300)
+company_cache = EntityCache("company", models.Company, schemas.CompanyOut, capacity=500, ttl=900)
+applicant_cache = EntityCache("applicant", models.Applicant, schemas.ApplicantOut, capacity=5000, ttl=300)
+
+
+def cache_stats() -> list[dict]:
+    return [c.stats() for c in (job_cache, company_cache, applicant_cache)]
+
+
+_CACHES = {cache.model: cache for cache in (job_cache, company_cache, applicant_cache)}
+_STALE = "entity_cache_stale"
+
+
+# flush 时记下被修改 / 删除的实体，提交后才失效，回滚则丢弃，避免其他请求在提交前把旧值重新读回缓存
+@event.listens_for(Session, "after_flush")
+def _collect_stale(session, flush_context):
+    for obj in [*session.dirty, *session.deleted]:
+        entity_cache = _CACHES.get(type(obj))
+        if entity_cache is not None:
+            session.info.setdefault(_STALE, set()).add((entity_cache, obj.id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale(session):
+    for entity_cache, entity_id in session.info.pop(_STALE, ()):
+        entity_cache.invalidate(entity_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale(session):
+    session.info.pop(_STALE, None)
@@ -0,0 +1,85 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app import models
+from app.db import SessionLocal
+from app.services.scheduling import DEFAULT_INTERVIEW_MINUTES
+
+ICS_STATUS = {
+    "Pending": "TENTATIVE",
+    "Confirmed": "CONFIRMED",
+    "Cancelled": "CANCELLED",
+    "Completed": "CONFIRMED",
+}
+
+
+def feed_version(db, filters) -> tuple[str, datetime | None]:
+    """
+    用一条聚合查询算出 feed 的 ETag 和 Last-Modified。
+    任何新增或状态变更都会改变 count / max(updated_at) / max(id)。
+    """
+    count, last_modified, max_id = db.execute(
+        select(
+            func.count(models.Interview.id),
+            func.max(func.coalesce(models.Interview.updated_at, models.Interview.created_at)),
+            func.max(models.Interview.id),
+        ).where(*filters)
+    ).one()
+    raw = f"{count}:{last_modified}:{max_id}"
+    return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"', last_modified
+
+
+def _fmt(dt: datetime) -> str:
+    return dt.strftime("%Y%m%dT%H%M%S")
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    # RFC 5545: 每行不超过 75 个字符，续行以空格开头
+    parts = [line[i:i + 74] for i in range(0, len(line), 74)] or [""]
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def iter_ics(filters, calendar_name: str):
+    """逐条生成 VEVENT，使用独立 Session，响应开始后不依赖请求的 Session。"""
+    db = SessionLocal()
+    try:
+        yield _fold("BEGIN:VCALENDAR")
+        yield _fold("VERSION:2.0")
+        yield _fold("PRODID:-//Recruitment MVP//Interviews//EN")
+        yield _fold(f"X-WR-CALNAME:{_escape(calendar_name)}")
+
+        stmt = (
+            select(models.Interview)
+            .where(*filters)
+            .order_by(models.Interview.scheduled_time)
+            .execution_options(yield_per=200)
+        )
+        now = _fmt(datetime.now(timezone.utc).replace(tzinfo=None)) + "Z"
+        for interview in db.execute(stmt).scalars():
+            end = interview.scheduled_time + timedelta(minutes=interview.duration_minutes or DEFAULT_INTERVIEW_MINUTES)
+            stamp = interview.updated_at or interview.created_at
+            lines = [
+                "BEGIN:VEVENT",
+                f"UID:interview-{interview.id}@recruitment",
+                f"DTSTAMP:{_fmt(stamp) + 'Z' if stamp else now}",
+                f"DTSTART:{_fmt(interview.scheduled_time)}",
+                f"DTEND:{_fmt(end)}",
+                f"SUMMARY:{_escape(f'{interview.type} interview #{interview.id}')}",
+                f"STATUS:{ICS_STATUS.get(interview.status, 'TENTATIVE')}",
+            ]
+            if interview.location_url:
+                lines.append(f"LOCATION:{_escape(interview.location_url)}")
+            if interview.notes:
+                lines.append(f"DESCRIPTION:{_escape(interview.notes)}")
+            lines.append("END:VEVENT")
+            yield "".join(_fold(line) for line in lines)
+
+        yield _fold("END:VCALENDAR")
+    finally:
+        db.close()
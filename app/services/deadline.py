@@ -0,0 +1,176 @@
+import asyncio
+import contextvars
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+from fastapi import Request
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+
+from app.db import engine
+
+# 路由级查询截止时间（秒）。整个请求内所有 SQL 共用一个截止时间，不是每条语句单独计时
+DEFAULT_QUERY_TIMEOUT = float(os.getenv("QUERY_TIMEOUT_SECONDS", "5"))
+SEARCH_QUERY_TIMEOUT = float(os.getenv("SEARCH_QUERY_TIMEOUT_SECONDS", "2"))
+REPORT_QUERY_TIMEOUT = float(os.getenv("REPORT_QUERY_TIMEOUT_SECONDS", "10"))
+DISCONNECT_POLL_SECONDS = 0.25
+
+# MySQL: 3024 = 超过 max_execution_time，1317 = 被 KILL QUERY 中断
+_MYSQL_INTERRUPTED = {3024, 1317}
+_SELECT = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+
+
+class QueryDeadlineExceeded(Exception):
+    def __init__(self, route: str, seconds: float):
+        self.route = route
+        self.seconds = seconds
+        super().__init__(f"Query exceeded the {seconds:g}s deadline for {route}")
+
+
+class QueryCancelled(Exception):
+    def __init__(self, route: str):
+        self.route = route
+        super().__init__(f"Query cancelled because the client disconnected ({route})")
+
+
+class QueryScope:
+    """一个请求的查询截止时间，以及正在执行的语句（客户端断开时用来取消）。"""
+
+    def __init__(self, route: str, seconds: float):
+        self.route = route
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        self.cancelled = False
+        self.active: set = set()
+        self._lock = threading.Lock()
+
+    def remaining_ms(self) -> int:
+        return int((self.deadline - time.monotonic()) * 1000)
+
+    def expired(self) -> bool:
+        return self.cancelled or time.monotonic() >= self.deadline
+
+    def track(self, dialect: str, dbapi_connection):
+        with self._lock:
+            self.active.add((dialect, dbapi_connection))
+
+    def untrack(self, dialect: str, dbapi_connection):
+        with self._lock:
+            self.active.discard((dialect, dbapi_connection))
+
+    def running(self) -> list:
+        with self._lock:
+            return list(self.active)
+
+
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timeouts = Counter()
+        self.cancelled = Counter()
+
+    def record(self, kind: str, route: str):
+        with self._lock:
+            getattr(self, kind)[route] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"timeouts": dict(self.timeouts), "cancelled": dict(self.cancelled)}
+
+
+query_stats = QueryStats()
+_current_scope: contextvars.ContextVar[QueryScope | None] = contextvars.ContextVar("query_scope", default=None)
+
+
+def query_deadline(seconds: float = DEFAULT_QUERY_TIMEOUT):
+    """
+    FastAPI 依赖：给当前请求的所有查询设置截止时间，并在客户端断开时取消正在执行的语句。
+    截止时间放在 contextvar 里，同步路由在线程池里执行时也能拿到（Session / engine 都不用额外传参）。
+    只用于 GET 路由：断开检测会读取请求的 receive 通道。
+    """
+    async def dependency(request: Request):
+        route = request.scope.get("route")
+        scope = QueryScope(route.path if route else request.url.path, seconds)
+        _current_scope.set(scope)
+        watcher = asyncio.create_task(_watch_disconnect(request, scope))
+        try:
+            yield scope
+        finally:
+            watcher.cancel()
+    return dependency
+
+
+async def _watch_disconnect(request: Request, scope: QueryScope):
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+    scope.cancelled = True
+    for dialect, dbapi_connection in scope.running():
+        if dialect == "mysql":
+            await run_in_threadpool(_kill_query, dbapi_connection.thread_id())
+        # SQLite 由 progress handler 检查 scope.cancelled 自行中断
+
+
+def _kill_query(thread_id: int):
+    # 线程池里复制了请求的 context，先清掉，KILL 本身不受截止时间限制
+    _current_scope.set(None)
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"KILL QUERY {int(thread_id)}")
+
+
+@event.listens_for(engine, "before_cursor_execute", retval=True)
+def _apply_deadline(conn, cursor, statement, parameters, context, executemany):
+    scope = _current_scope.get()
+    if scope is None:
+        return statement, parameters
+    if scope.expired():
+        raise QueryCancelled(scope.route) if scope.cancelled else QueryDeadlineExceeded(scope.route, scope.seconds)
+
+    dbapi_connection = conn.connection.dbapi_connection
+    dialect = conn.dialect.name
+    scope.track(dialect, dbapi_connection)
+    if dialect == "mysql" and _SELECT.match(statement):
+        # max_execution_time 只对 SELECT 生效，用优化器提示按剩余时间逐条设置，不需要额外的 SET 往返
+        hint = f"/*+ MAX_EXECUTION_TIME({max(scope.remaining_ms(), 1)}) */"
+        statement = _SELECT.sub(lambda m: f"{m.group(0)} {hint}", statement, count=1)
+    elif dialect == "sqlite":
+        # 本地 SQLite 没有 max_execution_time，用 progress handler 每 1000 条 VM 指令检查一次
+        dbapi_connection.set_progress_handler(scope.expired, 1000)
+    return statement, parameters
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _statement_done(conn, cursor, statement, parameters, context, executemany):
+    scope = _current_scope.get()
+    if scope is not None:
+        scope.untrack(conn.dialect.name, conn.connection.dbapi_connection)
+
+
+@event.listens_for(engine, "handle_error")
+def _translate_interrupt(context):
+    scope = _current_scope.get()
+    if scope is None:
+        return
+    if context.connection is not None and not context.connection.invalidated:
+        scope.untrack(context.connection.dialect.name, context.connection.connection.dbapi_connection)
+    original = context.original_exception
+    if isinstance(original, (QueryCancelled, QueryDeadlineExceeded)):
+        query_stats.record("cancelled" if isinstance(original, QueryCancelled) else "timeouts", scope.route)
+        return
+    code = original.args[0] if original.args else None
+    interrupted = code in _MYSQL_INTERRUPTED or str(code) == "interrupted"
+    if not interrupted:
+        return
+    if scope.cancelled:
+        query_stats.record("cancelled", scope.route)
+        raise QueryCancelled(scope.route) from original
+    query_stats.record("timeouts", scope.route)
+    raise QueryDeadlineExceeded(scope.route, scope.seconds) from original
+
+
+@event.listens_for(engine, "checkin")
+def _reset_connection(dbapi_connection, connection_record):
+    if engine.dialect.name == "sqlite":
+        dbapi_connection.set_progress_handler(None, 0)
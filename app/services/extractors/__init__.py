@@ -0,0 +1,123 @@
+"""
+简历文本提取器注册表，按扩展名和 MIME 类型查找。
+后端用 "模块:函数" 字符串注册，第一次真正用到时才 import，
+worker 启动时不用加载 pdfplumber / python-docx 这类重量级依赖。
+
+新格式以插件形式注册：
+
+    from app.services.extractors import register
+    register("odt", extensions=[".odt"], mime_types=["application/vnd.oasis.opendocument.text"],
+             target="my_plugins.odt:extract")
+
+RESUME_EXTRACTOR_PLUGINS 环境变量（逗号分隔的模块名）里的模块会在第一次查找时导入，模块导入时调用 register 即可。
+"""
+import importlib
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable
+
+from app.services.tracing import span
+
+
+class UnsupportedFormat(ValueError):
+    """没有注册处理这个扩展名 / MIME 类型的提取器。"""
+
+
+class ExtractorUnavailable(RuntimeError):
+    """格式已注册，但后端依赖（Python 包或命令行工具）没有安装。"""
+
+
+class ExtractionFailed(ValueError):
+    """文件内容解析失败（文件损坏或内容和扩展名不符）。"""
+
+
+@dataclass
+class Extractor:
+    name: str
+    extensions: tuple[str, ...]
+    mime_types: tuple[str, ...]
+    target: str
+    _func: Callable[[BinaryIO], str] | None = field(default=None, repr=False)
+
+    def load(self) -> Callable[[BinaryIO], str]:
+        if self._func is None:
+            module_name, func_name = self.target.split(":")
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError as e:
+                raise ExtractorUnavailable(f"{self.name} extractor is not available: {e}") from e
+            self._func = getattr(module, func_name)
+        return self._func
+
+    def __call__(self, fileobj: BinaryIO) -> str:
+        with span("resume.extract", format=self.name) as s:
+            func = self.load()
+            try:
+                text = func(fileobj)
+            except (ExtractorUnavailable, ExtractionFailed):
+                raise
+            except Exception as e:
+                # 后端库对损坏文件抛出的异常各不相同，统一成 ExtractionFailed
+                raise ExtractionFailed(f"Could not read {self.name} file: {e}") from e
+            s.set_attribute("resume.chars", len(text))
+            return text
+
+
+_by_extension: dict[str, Extractor] = {}
+_by_mime: dict[str, Extractor] = {}
+_plugins_loaded = False
+_lock = threading.Lock()
+
+
+def register(name: str, extensions: list[str], mime_types: list[str], target: str) -> Extractor:
+    """注册（或覆盖）一个提取器，target 为 "模块:函数"，函数接收二进制文件对象、返回文本。"""
+    extractor = Extractor(name, tuple(e.lower() for e in extensions), tuple(m.lower() for m in mime_types), target)
+    for ext in extractor.extensions:
+        _by_extension[ext] = extractor
+    for mime in extractor.mime_types:
+        _by_mime[mime] = extractor
+    return extractor
+
+
+def _load_plugins():
+    global _plugins_loaded
+    with _lock:
+        if _plugins_loaded:
+            return
+        for module_name in filter(None, (m.strip() for m in os.getenv("RESUME_EXTRACTOR_PLUGINS", "").split(","))):
+            importlib.import_module(module_name)
+        _plugins_loaded = True
+
+
+def find_extractor(filename: str | None, content_type: str | None = None) -> Extractor | None:
+    """先按扩展名查找，找不到再按 MIME 类型（浏览器经常把未知类型报成 application/octet-stream，所以扩展名优先）。"""
+    if not _plugins_loaded:
+        _load_plugins()
+    if filename:
+        ext = os.path.splitext(filename.lower())[1]
+        if ext in _by_extension:
+            return _by_extension[ext]
+    if content_type:
+        return _by_mime.get(content_type.split(";")[0].strip().lower())
+    return None
+
+
+def extract_text(fileobj: BinaryIO, filename: str | None, content_type: str | None = None) -> str:
+    """找到提取器并提取文本；可能抛出 UnsupportedFormat、ExtractorUnavailable、ExtractionFailed。"""
+    extractor = find_extractor(filename, content_type)
+    if extractor is None:
+        raise UnsupportedFormat(f"Unsupported file format: {filename or content_type}")
+    return extractor(fileobj)
+
+
+register("pdf", [".pdf"], ["application/pdf"], "app.services.extractors.pdf:extract")
+register(
+    "docx",
+    [".docx"],
+    ["application/vnd.openxmlformats-officedocument.wordprocessingml.document"],
+    "app.services.extractors.word:extract",
+)
+register("text", [".txt"], ["text/plain"], "app.services.extractors.text:extract")
+register("doc", [".doc"], ["application/msword"], "app.services.extractors.doc:extract")
+register("rtf", [".rtf"], ["application/rtf", "text/rtf"], "app.services.extractors.rtf:extract")
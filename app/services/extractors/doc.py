@@ -0,0 +1,38 @@
+"""旧版 Word (.doc) 二进制格式，交给 antiword 或 catdoc 命令行工具转换。"""
+import shutil
+import subprocess
+import tempfile
+
+from app.services.extractors import ExtractionFailed, ExtractorUnavailable
+
+# 按顺序尝试；上传内容先写到临时文件再交给命令行工具
+COMMANDS = (
+    ("antiword", ["-w", "0"]),
+    ("catdoc", ["-w"]),
+)
+TIMEOUT_SECONDS = 30
+
+
+def extract(fileobj) -> str:
+    errors = []
+    for executable, args in COMMANDS:
+        path = shutil.which(executable)
+        if path is None:
+            continue
+        fileobj.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=".doc") as tmp:
+            shutil.copyfileobj(fileobj, tmp)
+            tmp.flush()
+            try:
+                result = subprocess.run([path, *args, tmp.name], capture_output=True, timeout=TIMEOUT_SECONDS)
+            except subprocess.TimeoutExpired:
+                errors.append(f"{executable} timed out after {TIMEOUT_SECONDS}s")
+                continue
+        if result.returncode == 0:
+            return result.stdout.decode("utf-8", errors="replace")
+        # 文件损坏或不是 Word 97-2003 格式；换下一个工具再试
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
+        errors.append(f"{executable} exited with {result.returncode}: {stderr[:200]}")
+    if errors:
+        raise ExtractionFailed("Could not read doc file: " + "; ".join(errors))
+    raise ExtractorUnavailable("doc extractor needs antiword or catdoc installed")
@@ -0,0 +1,6 @@
+import pdfplumber
+
+
+def extract(fileobj) -> str:
+    with pdfplumber.open(fileobj) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages)
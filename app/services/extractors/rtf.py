@@ -0,0 +1,84 @@
+"""RTF 纯文本提取，不依赖第三方包：跳过字体表 / 样式表 / 图片等目标组，处理 \\par、\\'hh 和 \\uN。"""
+import re
+
+# 这些组的内容不是正文
+SKIP_DESTINATIONS = {
+    "fonttbl", "colortbl", "stylesheet", "info", "pict", "header", "footer", "headerl", "headerr",
+    "footerl", "footerr", "listtable", "listoverridetable", "rsidtbl", "generator", "xmlnstbl",
+    "themedata", "colorschememapping", "latentstyles", "datastore", "object", "fldinst",
+}
+SPECIAL = {"par": "\n", "line": "\n", "sect": "\n\n", "page": "\n\n", "tab": "\t", "cell": "\t", "row": "\n",
+           "emdash": "\u2014", "endash": "\u2013", "bullet": "\u2022", "lquote": "\u2018", "rquote": "\u2019",
+           "ldblquote": "\u201c", "rdblquote": "\u201d"}
+
+TOKEN = re.compile(r"\\([a-z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-f]{2})|\\([^a-z])|([{}])|[\r\n]+|([^\\{}\r\n]+)", re.I)
+
+
+def rtf_to_text(rtf: str) -> str:
+    stack = []
+    skip = False
+    encoding = "cp1252"
+    uc_skip = 1  # \ucN：\uN 之后跟着的替代字符数
+    pending_skip = 0
+    out = []
+    hex_bytes = bytearray()  # 连续的 \'hh 一起解码，GBK 等双字节代码页的汉字由两个 \'hh 组成
+
+    def flush():
+        if hex_bytes:
+            try:
+                out.append(hex_bytes.decode(encoding))
+            except (LookupError, UnicodeDecodeError):
+                out.append(hex_bytes.decode("cp1252", errors="replace"))
+            hex_bytes.clear()
+
+    for m in TOKEN.finditer(rtf):
+        word, arg, hexcode, symbol, brace, text = m.groups()
+        if hexcode is None:
+            flush()
+        if brace == "{":
+            stack.append((skip, uc_skip))
+            continue
+        if brace == "}":
+            skip, uc_skip = stack.pop() if stack else (False, 1)
+            continue
+        if pending_skip and (hexcode or text):
+            # 丢弃 \uN 后面的 ANSI 替代字符
+            if text:
+                consumed = min(pending_skip, len(text))
+                pending_skip -= consumed
+                text = text[consumed:]
+            else:
+                pending_skip -= 1
+                continue
+        if symbol == "*":
+            skip = True
+        elif symbol is not None:
+            if not skip and symbol in "\\{}":
+                out.append(symbol)
+            elif not skip and symbol == "~":
+                out.append("\u00a0")
+        elif word is not None:
+            word = word.lower()
+            if word in SKIP_DESTINATIONS:
+                skip = True
+            elif word == "ansicpg" and arg:
+                encoding = f"cp{arg}"
+            elif word == "uc" and arg:
+                uc_skip = int(arg)
+            elif word == "u" and arg:
+                if not skip:
+                    out.append(chr(int(arg) % 65536))
+                pending_skip = uc_skip
+            elif not skip and word in SPECIAL:
+                out.append(SPECIAL[word])
+        elif hexcode is not None:
+            if not skip:
+                hex_bytes.append(int(hexcode, 16))
+        elif text and not skip:
+            out.append(text)
+    flush()
+    return "".join(out).strip()
+
+
+def extract(fileobj) -> str:
+    return rtf_to_text(fileobj.read().decode("latin-1"))
@@ -0,0 +1,2 @@
+def extract(fileobj) -> str:
+    return fileobj.read().decode("utf-8", errors="replace")
@@ -0,0 +1,6 @@
+import docx
+
+
+def extract(fileobj) -> str:
+    doc = docx.Document(fileobj)
+    return "\n".join([p.text for p in doc.paragraphs])
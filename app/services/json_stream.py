@@ -0,0 +1,130 @@
+import json
+
+
+class IncrementalJSONParser:
+    """
+    逐块喂入模型输出的 JSON 文本，顶层对象的某个字段一旦完整就产出 ("field", key, value)；
+    顶层字段是数组时，每个元素完整时额外产出 ("item", key, index, value)，不用等整个数组结束。
+    第一个 `{` 之前的内容（例如 ```json 代码块标记）会被忽略。
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._expect_key = True
+        self._key = None
+        self._value_start = None
+        self._item_start = None
+        self._item_index = 0
+        self._primitive_depth = None
+        self._object_start = None
+        self._object_end = None
+
+    @property
+    def complete(self) -> bool:
+        return self._object_end is not None
+
+    def result(self) -> dict:
+        """整个顶层对象解析完成后返回它。"""
+        if self._object_end is None:
+            raise ValueError("incomplete JSON object in model output")
+        return json.loads(self._buf[self._object_start:self._object_end])
+
+    def feed(self, chunk: str) -> list[tuple]:
+        if self.complete:
+            return []
+        self._buf += chunk
+        buf = self._buf
+        events = []
+        i = self._pos
+        while i < len(buf) and not self.complete:
+            ch = buf[i]
+            depth = len(self._stack)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if depth == 1 and self._expect_key:
+                        self._key = json.loads(buf[self._value_start:i + 1])
+                        self._value_start = None
+                    elif depth == 1:
+                        events.append(self._field(i + 1))
+                    elif self._in_top_array(depth):
+                        events.append(self._item(i + 1))
+            elif depth == 0:
+                if ch == "{":
+                    self._stack.append(ch)
+                    self._object_start = i
+                    self._expect_key = True
+            elif ch == '"':
+                self._mark_start(i, depth)
+                self._in_string = True
+            elif ch in "{[":
+                self._mark_start(i, depth)
+                self._stack.append(ch)
+            elif ch in "}]":
+                self._end_primitive(i, depth, events)
+                self._stack.pop()
+                depth -= 1
+                if depth == 0:
+                    self._object_end = i + 1
+                elif depth == 1 and self._value_start is not None:
+                    events.append(self._field(i + 1))
+                elif self._in_top_array(depth) and self._item_start is not None:
+                    events.append(self._item(i + 1))
+            elif ch == ",":
+                self._end_primitive(i, depth, events)
+                if depth == 1:
+                    self._expect_key = True
+            elif ch == ":":
+                if depth == 1:
+                    self._expect_key = False
+            elif not ch.isspace():
+                # 数字 / true / false / null
+                if self._mark_start(i, depth):
+                    self._primitive_depth = depth
+            i += 1
+        self._pos = i
+        return events
+
+    def _in_top_array(self, depth: int) -> bool:
+        return depth == 2 and self._stack[1] == "["
+
+    def _mark_start(self, i: int, depth: int) -> bool:
+        if depth == 1 and self._value_start is None:
+            self._value_start = i
+            if not self._expect_key:
+                self._item_index = 0
+            return True
+        if self._in_top_array(depth) and self._item_start is None:
+            self._item_start = i
+            return True
+        return False
+
+    def _end_primitive(self, i: int, depth: int, events: list):
+        if self._primitive_depth != depth:
+            return
+        self._primitive_depth = None
+        if depth == 1:
+            events.append(self._field(i))
+        else:
+            events.append(self._item(i))
+
+    def _field(self, end: int) -> tuple:
+        value = json.loads(self._buf[self._value_start:end])
+        self._value_start = None
+        return "field", self._key, value
+
+    def _item(self, end: int) -> tuple:
+        value = json.loads(self._buf[self._item_start:end])
+        self._item_start = None
+        index = self._item_index
+        self._item_index += 1
+        return "item", self._key, index, value
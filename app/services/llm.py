@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+
+from app.services.tracing import inject_headers, span, start_span
+
+AI_API_URL = os.getenv("AI_API_URL", "https://assess-cv.lhanddong.workers.dev/")
+AI_API_TIMEOUT = int(os.getenv("AI_API_TIMEOUT", "300"))
+
+
+class AssessmentStats:
+    """统计 LLM 调用次数、耗时，以及被本地预评分拦下的次数。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.prescored = 0
+        self.llm_calls = 0
+        self.llm_skipped = 0
+        self.llm_seconds = 0.0
+
+    def record_prescore(self, skipped: bool):
+        with self._lock:
+            self.prescored += 1
+            if skipped:
+                self.llm_skipped += 1
+
+    def record_llm_call(self, seconds: float):
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg = self.llm_seconds / self.llm_calls if self.llm_calls else 0.0
+            return {
+                "prescored": self.prescored,
+                "llm_calls": self.llm_calls,
+                "llm_skipped": self.llm_skipped,
+                "llm_skip_rate": round(self.llm_skipped / self.prescored, 4) if self.prescored else 0.0,
+                "avg_llm_seconds": round(avg, 3),
+                "estimated_seconds_saved": round(avg * self.llm_skipped, 1),
+            }
+
+
+assessment_stats = AssessmentStats()
+
+
+def request_assessment(jd_text: str | None, resume_text: str) -> dict:
+    """调用 AI_API_URL 对简历和 JD 做完整评估，返回 worker 的 JSON 结果。"""
+    payload = {
+        "jd_text": jd_text,
+        "resume_text": resume_text
+    }
+    # requests 只有真正调用 LLM 的 worker 才需要，放到函数里导入以减少启动时间和常驻内存
+    import requests
+
+    started = time.perf_counter()
+    try:
+        with span("llm.request", **{"http.url": AI_API_URL}) as s:
+            response = requests.post(AI_API_URL, json=payload, timeout=AI_API_TIMEOUT, headers=inject_headers())
+            s.set_attribute("http.status_code", response.status_code)
+            response.raise_for_status()
+            return response.json()
+    finally:
+        assessment_stats.record_llm_call(time.perf_counter() - started)
+
+
+def stream_assessment(jd_text: str | None, resume_text: str):
+    """
+    以流式方式调用 AI_API_URL（payload 带 stream=true），逐块产出模型输出的文本。
+    worker 返回 text/event-stream 时按 Workers AI 的格式解析 `data: {"response": "..."}` / `data: [DONE]`，
+    否则把响应体原样分块产出。会阻塞，异步代码里用 iterate_in_threadpool 包一层。
+    """
+    payload = {
+        "jd_text": jd_text,
+        "resume_text": resume_text,
+        "stream": True
+    }
+    import requests
+
+    started = time.perf_counter()
+    # 生成器的每次 next() 可能在不同线程里执行，span 不设为当前 span，手动结束
+    s = start_span("llm.stream", {"http.url": AI_API_URL})
+    first_chunk = True
+    try:
+        with requests.post(AI_API_URL, json=payload, timeout=AI_API_TIMEOUT, stream=True, headers=inject_headers(current=s)) as response:
+            s.set_attribute("http.status_code", response.status_code)
+            response.raise_for_status()
+            for text in _stream_chunks(response):
+                if first_chunk:
+                    s.set_attribute("llm.first_chunk_ms", round((time.perf_counter() - started) * 1000, 1))
+                    first_chunk = False
+                yield text
+    except Exception as e:
+        s.record_error(e)
+        raise
+    finally:
+        s.end()
+        assessment_stats.record_llm_call(time.perf_counter() - started)
+
+
+def _stream_chunks(response):
+    if "charset" not in response.headers.get("content-type", ""):
+        # requests 对没有声明 charset 的 text/* 默认用 ISO-8859-1，中文会乱码
+        response.encoding = "utf-8"
+    if "text/event-stream" not in response.headers.get("content-type", ""):
+        for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+            if chunk:
+                yield chunk
+        return
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            message = json.loads(data)
+        except ValueError:
+            yield data
+            continue
+        text = message.get("response") if isinstance(message, dict) else None
+        if text:
+            yield text
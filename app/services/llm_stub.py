@@ -0,0 +1,108 @@
+"""
+本地 LLM 评估桩服务，行为和 AI_API_URL 的 worker 一致，用于测试和本地开发：
+请求带 "stream": true 时按 Workers AI 的格式以 SSE 逐 token 返回 `data: {"response": "..."}`，以 `data: [DONE]` 结束；
+否则等全部“生成”完再一次性返回 JSON。
+
+    python -m app.services.llm_stub --port 8787 --token-delay 0.02
+    AI_API_URL=http://127.0.0.1:8787/ uvicorn app.main:app
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_ASSESSMENT = {
+    "summary": "候选人的简历与职位描述有一定匹配，但需要进一步强化相关技能和经验",
+    "score": {
+        "overall": 72,
+        "skills_match": 70,
+        "experience_depth": 65,
+        "education_match": 80,
+        "potential_fit": 75
+    },
+    "assessment_highlights": [
+        "具备职位要求的核心技术栈，有完整的项目经验",
+        "有团队协作和跨部门沟通的经历",
+        "在部分进阶技能上还缺少实际项目经验"
+    ],
+    "recommendations_for_candidate": [
+        "在简历中补充量化的项目成果",
+        "针对职位要求补充相关框架的实践经验"
+    ]
+}
+
+
+def _tokens(text: str) -> list[str]:
+    # 粗略模拟模型的 token 粒度：ASCII 单词 / 标点 / 单个汉字
+    return re.findall(r"\s+|[A-Za-z0-9_]+|.", text)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    token_delay = 0.02
+    first_token_delay = 0.3
+    assessment = SAMPLE_ASSESSMENT
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.send_error(400, "invalid JSON")
+            return
+
+        text = json.dumps(self.assessment, ensure_ascii=False, indent=2)
+        tokens = _tokens(text)
+        if not payload.get("stream"):
+            time.sleep(self.first_token_delay + self.token_delay * len(tokens))
+            body = text.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        time.sleep(self.first_token_delay)
+        try:
+            for token in tokens:
+                message = json.dumps({"response": token}, ensure_ascii=False)
+                self.wfile.write(f"data: {message}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(self.token_delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, token_delay: float = 0.02, first_token_delay: float = 0.3) -> ThreadingHTTPServer:
+    """在后台线程启动桩服务并返回 server，测试里用 server.server_address 拼 AI_API_URL，结束时 server.shutdown()。"""
+    handler = type("Handler", (StubHandler,), {"token_delay": token_delay, "first_token_delay": first_token_delay})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub of the assessment LLM worker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    args = parser.parse_args()
+
+    handler = type("Handler", (StubHandler,), {"token_delay": args.token_delay, "first_token_delay": args.first_token_delay})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"LLM stub listening on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
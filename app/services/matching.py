@@ -1,7 +1,11 @@
+from app.services.skills import canonical_skill
+
+
 def normalize_tags(tags: str | None):
+    # 映射到技能字典里的规范名，"JS" / "Java Script" 都算 "javascript"
     if not tags:
         return set()
-    return set(t.strip().lower() for t in tags.split(",") if t.strip())
+    return set(canonical_skill(t) for t in tags.split(",") if t.strip())
 
 def calc_match_score(applicant_skill_tags: str | None, job_skill_tags: str | None, same_location: bool=False) -> int:
     a = normalize_tags(applicant_skill_tags)
@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select
+
+from app.db import SessionLocal
+
+# 单条 IN (...) 最多带多少个 id，以及最多同时跑几个分片（要小于连接池大小）
+MULTIGET_CHUNK_SIZE = int(os.getenv("MULTIGET_CHUNK_SIZE", "500"))
+MULTIGET_MAX_WORKERS = int(os.getenv("MULTIGET_MAX_WORKERS", "4"))
+
+
+def _fetch_chunk(model, chunk: list[int]):
+    # 每个分片用独立的 Session，Session 不能跨线程共享
+    db = SessionLocal()
+    try:
+        return db.execute(select(model).where(model.id.in_(chunk))).scalars().all()
+    finally:
+        db.close()
+
+
+def fetch_by_ids(model, ids: list[int], chunk_size: int = MULTIGET_CHUNK_SIZE):
+    """
+    按主键批量读取，返回 (按请求顺序排列的对象列表, 未找到的 id 列表)。
+    重复的 id 只查询、返回一次。
+    """
+    ordered_ids = list(dict.fromkeys(ids))
+    if not ordered_ids:
+        return [], []
+
+    chunks = [ordered_ids[i:i + chunk_size] for i in range(0, len(ordered_ids), chunk_size)]
+    if len(chunks) == 1:
+        rows = _fetch_chunk(model, chunks[0])
+    else:
+        with ThreadPoolExecutor(max_workers=min(MULTIGET_MAX_WORKERS, len(chunks))) as pool:
+            rows = [row for part in pool.map(lambda c: _fetch_chunk(model, c), chunks) for row in part]
+
+    by_id = {row.id: row for row in rows}
+    items = [by_id[i] for i in ordered_ids if i in by_id]
+    missing_ids = [i for i in ordered_ids if i not in by_id]
+    return items, missing_ids
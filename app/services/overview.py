@@ -0,0 +1,117 @@
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.services.assessments import build_assessment_result, latest_assessment_query
+
+OVERVIEW_SECTIONS = ("applications", "jobs", "companies", "assessments", "interviews")
+
+# fields= 选择器：section -> (元素 schema, 总是保留的标识字段)
+OVERVIEW_FIELDS = {
+    "applicant": (schemas.ApplicantOut, "id"),
+    "applications": (schemas.ApplicationOut, "id"),
+    "jobs": (schemas.JobOut, "id"),
+    "companies": (schemas.CompanyOut, "id"),
+    "assessments": (schemas.AssessmentResult, "jobId"),
+    "interviews": (schemas.InterviewOut, "id"),
+}
+
+# 单个申请人的申请数量上限，防止 overview 变成全表扫描
+MAX_OVERVIEW_APPLICATIONS = 500
+
+
+def load_applicant_overview(db: Session, applicant_id: int, sections: set[str]) -> dict:
+    """
+    一次性加载申请人 dashboard 需要的数据。
+    每个 section 最多一条查询（IN 批量），查询次数与申请数量无关；未选中的 section 不查询。
+    """
+    overview = {}
+
+    applications = []
+    if sections & {"applications", "jobs", "companies", "assessments"}:
+        applications = (
+            db.query(models.Application)
+            .filter(models.Application.applicant_id == applicant_id)
+            .order_by(models.Application.created_at.desc())
+            .limit(MAX_OVERVIEW_APPLICATIONS)
+            .all()
+        )
+        if "applications" in sections:
+            overview["applications"] = applications
+
+    job_ids = list(dict.fromkeys(a.job_id for a in applications))
+
+    if "jobs" in sections or "companies" in sections:
+        jobs = db.query(models.Job).filter(models.Job.id.in_(job_ids)).all() if job_ids else []
+        by_id = {j.id: j for j in jobs}
+        if "jobs" in sections:
+            overview["jobs"] = [by_id[i] for i in job_ids if i in by_id]
+
+        if "companies" in sections:
+            company_ids = list(dict.fromkeys(
+                [a.company_id for a in applications if a.company_id]
+                + [j.company_id for j in jobs if j.company_id]
+            ))
+            overview["companies"] = (
+                db.query(models.Company).filter(models.Company.id.in_(company_ids)).all()
+                if company_ids else []
+            )
+
+    if "assessments" in sections:
+        records = _latest_assessments(db, applicant_id, job_ids) if job_ids else []
+        overview["assessments"] = [build_assessment_result(r) for r in records]
+
+    if "interviews" in sections:
+        overview["interviews"] = (
+            db.query(models.Interview)
+            .filter(models.Interview.applicant_id == applicant_id)
+            .order_by(models.Interview.scheduled_time.desc())
+            .all()
+        )
+
+    return overview
+
+
+def _latest_assessments(db: Session, applicant_id: int, job_ids: list[int]):
+    records = (
+        latest_assessment_query(db)
+        .filter(
+            models.JobAssessmentLatest.applicant_id == applicant_id,
+            models.JobAssessmentLatest.job_id.in_(job_ids),
+        )
+        .all()
+    )
+    by_job = {r.job_id: r for r in records}
+    return [by_job[i] for i in job_ids if i in by_job]
+
+
+def parse_overview_fields(fields: str | None) -> dict[str, list[str]]:
+    """
+    解析 fields=jobs.title,jobs.location,applications.status（section.field），返回 {section: [field]}。
+    每个 section 的标识字段（id / jobId）总是包含在内；未知的 section 或字段返回 400。
+    """
+    selected: dict[str, list[str]] = {}
+    unknown = []
+    for item in dict.fromkeys(f.strip() for f in (fields or "").split(",") if f.strip()):
+        section, _, field = item.partition(".")
+        if section not in OVERVIEW_FIELDS or field not in OVERVIEW_FIELDS[section][0].model_fields:
+            unknown.append(item)
+            continue
+        selected.setdefault(section, [OVERVIEW_FIELDS[section][1]])
+        if field not in selected[section]:
+            selected[section].append(field)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return selected
+
+
+def project_overview(overview: dict, fields: dict[str, list[str]]) -> dict:
+    """按 parse_overview_fields 的结果裁剪已序列化的 overview，没有列出的 section 原样返回。"""
+    projected = dict(overview)
+    for section, keep in fields.items():
+        value = overview.get(section)
+        if isinstance(value, dict):
+            projected[section] = {k: value[k] for k in keep if k in value}
+        elif isinstance(value, list):
+            projected[section] = [{k: item[k] for k in keep if k in item} for item in value]
+    return projected
@@ -0,0 +1,102 @@
+import os
+
+from app.services.llm import assessment_stats, request_assessment
+from app.services.matching import calc_match_score, normalize_tags
+from app.services.skills import find_skills
+from app.services.tracing import traced
+from app.services.vector_index import tokenize
+
+# 本地预评分低于这个分数时不调用 LLM，直接返回预评分结果
+ASSESS_LLM_THRESHOLD = int(os.getenv("ASSESS_LLM_THRESHOLD", "40"))
+# 职位没有 skill_tags 时，从 JD 里取出现次数最多的这么多个已知技能作为要求
+PRESCORE_JD_SKILLS = int(os.getenv("PRESCORE_JD_SKILLS", "8"))
+
+
+def extract_skills(resume_text: str, job_skill_tags: str | None) -> list[str]:
+    """
+    在简历全文里查找职位要求的技能。简历中 1-3 个词的片段都映射成规范技能名，
+    所以 "JS" / "Java Script" 也能命中 "javascript"；"go" / "ts" 这类短别名要有大小写或上下文。
+    """
+    required = normalize_tags(job_skill_tags)
+    return sorted(required & find_skills(resume_text, required).keys())
+
+
+def jd_skills(jd_text: str | None, limit: int = PRESCORE_JD_SKILLS) -> list[str]:
+    """JD 里出现最多的 limit 个技能字典里的技能，给没有 skill_tags 的职位当作技能要求。"""
+    return [skill for skill, _ in find_skills(jd_text).most_common(limit)]
+
+
+def required_skills(job: dict) -> list[str]:
+    if job.get("skill_tags"):
+        return sorted(normalize_tags(job["skill_tags"]))
+    return jd_skills(job.get("description"))
+
+
+def keyword_overlap(resume_text: str, jd_text: str | None) -> int:
+    """JD 中的不同关键词有多少出现在简历里，0-100。"""
+    jd_terms = set(tokenize(jd_text))
+    if not jd_terms:
+        return 0
+    resume_terms = set(tokenize(resume_text))
+    return round(len(jd_terms & resume_terms) / len(jd_terms) * 100)
+
+
+def prescore(job: dict, resume_text: str) -> dict:
+    """
+    便宜的本地评分，结构与 LLM 返回的 data_json 相同，额外带 provisional=True。
+    只算技能匹配和关键词重合度，其余分项（experience_depth 等）本地算不出来，留空。
+    职位没有可比较的技能时 skills_match 为 None，triage 不会据此拦下 LLM 调用。
+    """
+    required = required_skills(job)
+    tags = ",".join(required)
+    matched = extract_skills(resume_text, tags) if required else []
+    missing = sorted(set(required) - set(matched))
+    keywords = keyword_overlap(resume_text, job.get("description"))
+    skills = calc_match_score(",".join(matched), tags) if required else None
+    overall = round(0.6 * skills + 0.4 * keywords) if required else keywords
+
+    highlights = [f"Keyword overlap with the job description: {keywords}%"]
+    if matched:
+        highlights.insert(0, f"Matched skills: {', '.join(matched)}")
+    if missing:
+        highlights.append(f"Skills not found in the resume: {', '.join(missing)}")
+
+    return {
+        "summary": "Provisional local match score",
+        "score": {
+            "overall": overall,
+            "skills_match": skills,
+            "experience_depth": None,
+            "education_match": None,
+            "potential_fit": None,
+        },
+        "assessment_highlights": highlights,
+        "recommendations_for_candidate": (
+            [f"Highlight any experience with {', '.join(missing)} if you have it"] if missing else []
+        ),
+        "provisional": True,
+    }
+
+
+@traced("assessment.prescore")
+def triage(job: dict, resume_text: str, force_llm: bool = False) -> tuple[dict, bool]:
+    """
+    本地预评分，返回 (预评分结果, provisional)；provisional 为 True 表示不需要再调用 LLM。
+    没有技能可比较（skills_match 为 None）时只有关键词重合度，分数不可靠，总是交给 LLM。
+    """
+    data = prescore(job, resume_text)
+    gated = data["score"]["skills_match"] is not None
+    provisional = not force_llm and gated and data["score"]["overall"] < ASSESS_LLM_THRESHOLD
+    assessment_stats.record_prescore(skipped=provisional)
+    return data, provisional
+
+
+def evaluate_resume(job: dict, resume_text: str, force_llm: bool = False) -> tuple[dict, bool]:
+    """
+    分级评估：先本地预评分，低于 ASSESS_LLM_THRESHOLD 且没有 force_llm 时直接返回预评分，
+    否则调用 LLM。返回 (data_json, provisional)。会阻塞，异步代码里放到线程池执行。
+    """
+    data, provisional = triage(job, resume_text, force_llm)
+    if not provisional:
+        data = request_assessment(job.get("description"), resume_text)
+    return data, provisional
@@ -0,0 +1,35 @@
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+
+def select_fields(fields: str | None, schema) -> list[str]:
+    """
+    解析 fields=a,b,c（稀疏字段集），默认返回 schema 的全部字段；id 总是包含在内。
+    """
+    allowed = list(schema.model_fields)
+    if not fields:
+        return allowed
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return requested
+
+
+def projected_rows(query, model, fields: list[str]) -> list[dict]:
+    """只 SELECT 需要的列，拿 Row 元组（不进 ORM identity map），转成 dict。"""
+    rows = query.with_entities(*[getattr(model, f) for f in fields]).all()
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def orjson_response(content) -> Response:
+    """用 orjson 序列化成 JSON 响应（ORJSONResponse 在新版 FastAPI 里已弃用）。"""
+    return Response(orjson.dumps(content), media_type="application/json")
+
+
+def projected_response(query, model, fields: list[str]) -> Response:
+    """列表接口的快速路径：列投影 + 跳过 response_model 校验，直接用 orjson 序列化。"""
+    return orjson_response(projected_rows(query, model, fields))
@@ -0,0 +1,203 @@
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, event, func, inspect, or_, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import SessionLocal
+from app.services.matching import calc_match_score
+
+FEED_SIZE = 50
+# 超过这个时间没有整体刷新的 feed 视为过期，读取时回退到实时计算
+FEED_MAX_AGE = timedelta(hours=int(os.getenv("RECOMMENDATION_FEED_MAX_AGE_HOURS", "24")))
+
+
+def _same_loc(desired_location: str | None, job_loc: str | None) -> bool:
+    return bool(desired_location and (job_loc == desired_location or job_loc == "Remote"))
+
+
+def rank_key(score: int, created_at, job_id: int) -> tuple:
+    """feed 的排序：分数高的在前，同分时发布早的在前，再按 job id。实时计算、读取和淘汰都按这个顺序。"""
+    return (-score, created_at, job_id)
+
+
+def _feed_order(lowest_first: bool = False) -> list:
+    """rank_key 对应的 ORDER BY；lowest_first 时反过来，第一条就是要淘汰的那条。"""
+    score, created_at, job_id = models.ApplicantRecommendation.score, models.Job.created_at, models.Job.id
+    if lowest_first:
+        return [score, created_at.desc(), job_id.desc()]
+    return [score.desc(), created_at, job_id]
+
+
+def _upsert_feed_rows(db: Session, rows: list[dict]):
+    """(applicant_id, job_id) 已存在时更新分数，并发刷新同一个申请人不会撞主键。"""
+    table = models.ApplicantRecommendation.__table__
+    if db.get_bind().dialect.name == "mysql":
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update(score=stmt.inserted.score, computed_at=stmt.inserted.computed_at)
+    else:
+        # 测试用的 SQLite
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.applicant_id, table.c.job_id],
+            set_={"score": stmt.excluded.score, "computed_at": stmt.excluded.computed_at},
+        )
+    db.execute(stmt, rows)
+
+
+def _job_item(j, score: int) -> dict:
+    return {
+        "id": j.id,
+        "title": j.title,
+        "company_name": j.company_name,
+        "location": j.location,
+        "role": j.role,
+        "employment_type": j.employment_type,
+        "skill_tags": j.skill_tags,
+        "salary": j.salary,
+        "matchScore": score,
+        "created_at": j.created_at,
+    }
+
+
+def live_recommendations(db: Session, applicant) -> list[dict]:
+    """实时计算：同岗位、地点匹配（或 Remote）的最近 200 个职位按技能匹配度排序。"""
+    jobs = (
+        db.query(models.Job)
+        .filter(models.Job.role == applicant.desired_role)
+        .filter((models.Job.location == applicant.desired_location) | (models.Job.location == "Remote") | (applicant.desired_location == None))
+        .order_by(models.Job.created_at.desc())
+        .limit(200)
+        .all()
+    )
+    result = [
+        _job_item(j, calc_match_score(applicant.skill_tags, j.skill_tags, _same_loc(applicant.desired_location, j.location)))
+        for j in jobs
+    ]
+    result.sort(key=lambda x: rank_key(x["matchScore"], x["created_at"], x["id"]))
+    return result[:FEED_SIZE]
+
+
+def refresh_applicant(db: Session, applicant) -> list[dict]:
+    """
+    重新计算一个申请人的 feed（申请人技能变化或 feed 过期时调用）。
+    GET 读取时也会调用，所以用 upsert + 删除不在结果里的行，并发刷新不会冲突。
+    """
+    result = live_recommendations(db, applicant)
+    now = datetime.utcnow()
+    if result:
+        _upsert_feed_rows(db, [
+            {"applicant_id": applicant.id, "job_id": item["id"], "score": item["matchScore"], "computed_at": now}
+            for item in result
+        ])
+    db.execute(delete(models.ApplicantRecommendation).where(
+        models.ApplicantRecommendation.applicant_id == applicant.id,
+        models.ApplicantRecommendation.job_id.not_in([item["id"] for item in result]),
+    ))
+    db.commit()
+    return result
+
+
+def read_feed(db: Session, applicant_id: int) -> list[dict] | None:
+    """读取预计算的 feed，一条走 (applicant_id, score) 索引的查询；没有或已过期时返回 None。"""
+    rows = (
+        db.query(models.Job, models.ApplicantRecommendation.score, models.ApplicantRecommendation.computed_at)
+        .join(models.ApplicantRecommendation, models.ApplicantRecommendation.job_id == models.Job.id)
+        .filter(models.ApplicantRecommendation.applicant_id == applicant_id)
+        .order_by(*_feed_order())
+        .limit(FEED_SIZE)
+        .all()
+    )
+    if not rows or min(computed_at for _, _, computed_at in rows) < datetime.utcnow() - FEED_MAX_AGE:
+        return None
+    return [_job_item(job, score) for job, score, _ in rows]
+
+
+# 这些字段决定 feed 里有哪些职位、各自多少分
+_FEED_INPUTS = ("skill_tags", "desired_role", "desired_location")
+
+
+@event.listens_for(models.Applicant, "after_update")
+def _drop_stale_feed(mapper, connection, target):
+    """
+    申请人的技能、期望岗位或地点变了，在同一个事务里删掉他的 feed，
+    下次 GET /jobs/recommend 读不到 feed 就会实时计算并写回；改动回滚时 feed 也跟着保留。
+    """
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _FEED_INPUTS):
+        connection.execute(delete(models.ApplicantRecommendation).where(
+            models.ApplicantRecommendation.applicant_id == target.id,
+        ))
+
+
+def on_job_created(job_id: int):
+    """
+    新职位只和同岗位、地点匹配的申请人打分，分数进入对方 top-N 时写入 feed。
+    作为 BackgroundTask 运行，使用独立 Session。
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(models.Job, job_id)
+        if job is None:
+            return
+        location_filter = [models.Applicant.desired_location == None]
+        if job.location == "Remote":
+            location_filter = []
+        elif job.location:
+            location_filter.append(models.Applicant.desired_location == job.location)
+        query = (
+            db.query(models.Applicant.id, models.Applicant.skill_tags, models.Applicant.desired_location)
+            .filter(models.Applicant.desired_role == job.role)
+        )
+        if location_filter:
+            query = query.filter(or_(*location_filter))
+        applicants = query.all()
+        if not applicants:
+            return
+
+        feed_stats = dict(
+            (applicant_id, (count, min_score))
+            for applicant_id, count, min_score in db.execute(
+                select(
+                    models.ApplicantRecommendation.applicant_id,
+                    func.count(),
+                    func.min(models.ApplicantRecommendation.score),
+                )
+                .where(models.ApplicantRecommendation.applicant_id.in_([a.id for a in applicants]))
+                .group_by(models.ApplicantRecommendation.applicant_id)
+            ).all()
+        )
+
+        now = datetime.utcnow()
+        rows, full = [], []
+        for a in applicants:
+            if a.id not in feed_stats:
+                # 没有 feed 的申请人下次读取时会实时计算，这里不用补
+                continue
+            score = calc_match_score(a.skill_tags, job.skill_tags, _same_loc(a.desired_location, job.location))
+            count, min_score = feed_stats[a.id]
+            if count < FEED_SIZE or score > min_score:
+                rows.append({"applicant_id": a.id, "job_id": job.id, "score": score, "computed_at": now})
+                if count >= FEED_SIZE:
+                    full.append(a.id)
+        if rows:
+            _upsert_feed_rows(db, rows)
+        for applicant_id in full:
+            # feed 已满：按 rank_key 挤掉排在最后的一条
+            lowest = db.execute(
+                select(models.ApplicantRecommendation.job_id)
+                .join(models.Job, models.Job.id == models.ApplicantRecommendation.job_id)
+                .where(models.ApplicantRecommendation.applicant_id == applicant_id)
+                .order_by(*_feed_order(lowest_first=True))
+                .limit(1)
+            ).scalar_one()
+            db.execute(delete(models.ApplicantRecommendation).where(
+                models.ApplicantRecommendation.applicant_id == applicant_id,
+                models.ApplicantRecommendation.job_id == lowest,
+            ))
+        db.commit()
+    finally:
+        db.close()
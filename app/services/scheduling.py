@@ -0,0 +1,240 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+
+DEFAULT_INTERVIEW_MINUTES = 60
+# 其他 worker 创建的面试最多延迟这么久才会出现在本进程的索引里
+INDEX_TTL_SECONDS = 30
+# 最多缓存多少个面试官 / 申请人的区间索引，超过后淘汰最久未使用的
+SCHEDULE_INDEX_MAX_KEYS = int(os.getenv("SCHEDULE_INDEX_MAX_KEYS", "2000"))
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """数据库和索引里的时间都是不带时区的 UTC；带时区的输入（"...Z"、"+08:00"）先换算成 UTC 再去掉时区。"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def interview_interval(interview) -> tuple[datetime, datetime]:
+    start = to_naive_utc(interview.scheduled_time)
+    return start, start + timedelta(minutes=interview.duration_minutes or DEFAULT_INTERVIEW_MINUTES)
+
+
+class IntervalIndex:
+    """
+    单个面试官 / 申请人的时间段，按开始时间排序。
+    区间之间可能重叠（历史数据、其他 worker 在 TTL 内的写入、取消后恢复的面试），
+    所以另存一份前缀最大结束时间 max_end[k] = max(items[0..k].end)：
+    冲突查询 = 二分定位 + 向前扫描，直到 max_end 不超过查询开始时间为止，O(log n + k)。
+    """
+
+    def __init__(self, items=None):
+        self.items = sorted(items or [])  # (start, end, interview_id)
+        self._rebuild_max_end(0)
+
+    def _rebuild_max_end(self, i: int):
+        if i == 0:
+            self.max_end = []
+        else:
+            del self.max_end[i:]
+        running = self.max_end[-1] if self.max_end else None
+        for _, end, _ in self.items[i:]:
+            running = end if running is None or end > running else running
+            self.max_end.append(running)
+
+    def overlapping(self, start: datetime, end: datetime) -> list[tuple]:
+        i = bisect_left(self.items, (end,))
+        result = []
+        j = i - 1
+        # max_end[j] <= start 说明 items[0..j] 都在查询开始之前结束
+        while j >= 0 and self.max_end[j] > start:
+            if self.items[j][1] > start:
+                result.append(self.items[j])
+            j -= 1
+        result.reverse()
+        return result
+
+    def add(self, start: datetime, end: datetime, interview_id: int):
+        i = bisect_left(self.items, (start, end, interview_id))
+        self.items.insert(i, (start, end, interview_id))
+        self._rebuild_max_end(i)
+
+    def remove(self, interview_id: int):
+        self.remove_many({interview_id})
+
+    def remove_many(self, interview_ids: set[int]):
+        self.items = [item for item in self.items if item[2] not in interview_ids]
+        self._rebuild_max_end(0)
+
+
+def _conflict(kind: str, key_id: int, item: tuple) -> dict:
+    other_start, other_end, other_id = item
+    return {
+        "kind": kind,
+        "id": key_id,
+        "interview_id": other_id,
+        "start": other_start.isoformat(),
+        "end": other_end.isoformat(),
+    }
+
+
+class ScheduleIndex:
+    """按 (interviewer / applicant, id) 懒加载的区间索引，供冲突检查和空闲时段查询使用。"""
+
+    KEY_COLUMNS = {
+        "interviewer": models.Interview.interviewer_id,
+        "applicant": models.Interview.applicant_id,
+    }
+
+    def __init__(self, max_keys: int = SCHEDULE_INDEX_MAX_KEYS):
+        self.max_keys = max_keys
+        self._indexes: OrderedDict[tuple[str, int], tuple[IntervalIndex, float]] = OrderedDict()
+        # 同一进程内串行化 "检查冲突 + 插入"
+        self.lock = threading.Lock()
+        # 只保护 _indexes 的读写和淘汰
+        self._cache_lock = threading.Lock()
+
+    def _load(self, db: Session, kind: str, key_id: int) -> IntervalIndex:
+        column = self.KEY_COLUMNS[kind]
+        rows = db.execute(
+            select(models.Interview.id, models.Interview.scheduled_time, models.Interview.duration_minutes)
+            .where(column == key_id, models.Interview.status != "Cancelled")
+        ).all()
+        return IntervalIndex(
+            (start, start + timedelta(minutes=minutes or DEFAULT_INTERVIEW_MINUTES), interview_id)
+            for interview_id, start, minutes in rows
+        )
+
+    def get(self, db: Session, kind: str, key_id: int) -> IntervalIndex:
+        key = (kind, key_id)
+        with self._cache_lock:
+            entry = self._indexes.get(key)
+            if entry is not None and entry[1] >= time.monotonic() - INDEX_TTL_SECONDS:
+                self._indexes.move_to_end(key)
+                return entry[0]
+        index = self._load(db, kind, key_id)
+        with self._cache_lock:
+            self._indexes[key] = (index, time.monotonic())
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_keys:
+                self._indexes.popitem(last=False)
+        return index
+
+    def clear(self):
+        with self._cache_lock:
+            self._indexes.clear()
+
+    def _keys(self, interview) -> list[tuple[str, int]]:
+        keys = []
+        if interview.interviewer_id:
+            keys.append(("interviewer", interview.interviewer_id))
+        if interview.applicant_id:
+            keys.append(("applicant", interview.applicant_id))
+        return keys
+
+    def find_conflicts(self, db: Session, interview) -> list[dict]:
+        start, end = interview_interval(interview)
+        conflicts = []
+        for kind, key_id in self._keys(interview):
+            for item in self.get(db, kind, key_id).overlapping(start, end):
+                conflicts.append(_conflict(kind, key_id, item))
+        return conflicts
+
+    def find_batch_conflicts(self, db: Session, interviews) -> dict[int, list[dict]]:
+        """
+        一批面试重新占用时间段（取消后恢复）之前的冲突检查：既和已有面试比，也和本批次里前面已通过检查的比。
+        返回 interview_id -> 冲突列表，只包含有冲突的面试。调用方持有 lock。
+        """
+        accepted: dict[tuple[str, int], IntervalIndex] = {}
+        result = {}
+        for interview in interviews:
+            start, end = interview_interval(interview)
+            conflicts = self.find_conflicts(db, interview)
+            for kind, key_id in self._keys(interview):
+                if (kind, key_id) in accepted:
+                    conflicts += [_conflict(kind, key_id, item) for item in accepted[(kind, key_id)].overlapping(start, end)]
+            if conflicts:
+                result[interview.id] = conflicts
+                continue
+            for key in self._keys(interview):
+                accepted.setdefault(key, IntervalIndex()).add(start, end, interview.id)
+        return result
+
+    def add(self, interview):
+        start, end = interview_interval(interview)
+        for key in self._keys(interview):
+            entry = self._indexes.get(key)
+            if entry is not None:
+                entry[0].add(start, end, interview.id)
+
+    def remove(self, interview):
+        for key in self._keys(interview):
+            entry = self._indexes.get(key)
+            if entry is not None:
+                entry[0].remove(interview.id)
+
+    def remove_many(self, interviews):
+        """批量取消时按 key 分组，每个区间索引只重建一次。"""
+        by_key: dict[tuple[str, int], set[int]] = {}
+        for interview in interviews:
+            for key in self._keys(interview):
+                by_key.setdefault(key, set()).add(interview.id)
+        for key, interview_ids in by_key.items():
+            entry = self._indexes.get(key)
+            if entry is not None:
+                entry[0].remove_many(interview_ids)
+
+    def free_slots(
+        self,
+        db: Session,
+        keys: list[tuple[str, int]],
+        date_from: datetime,
+        date_to: datetime,
+        duration_minutes: int,
+        day_start_hour: int,
+        day_end_hour: int,
+    ) -> list[dict]:
+        """在工作时间内找出所有 key 都空闲、且不短于 duration_minutes 的时间段。时间和工作时间都按 UTC。"""
+        date_from, date_to = to_naive_utc(date_from), to_naive_utc(date_to)
+        busy = sorted(
+            (start, end)
+            for kind, key_id in keys
+            for start, end, _ in self.get(db, kind, key_id).overlapping(date_from, date_to)
+        )
+        duration = timedelta(minutes=duration_minutes)
+        slots = []
+
+        day = date_from.replace(hour=0, minute=0, second=0, microsecond=0)
+        i = 0
+        while day < date_to:
+            window_start = max(day.replace(hour=day_start_hour), date_from)
+            window_end = min(day.replace(hour=day_end_hour) if day_end_hour < 24 else day + timedelta(days=1), date_to)
+            cursor = window_start
+            while i < len(busy) and busy[i][1] <= cursor:
+                i += 1
+            j = i
+            while cursor < window_end:
+                if j < len(busy) and busy[j][0] < window_end:
+                    gap_end = min(busy[j][0], window_end)
+                    next_cursor = max(cursor, busy[j][1])
+                    j += 1
+                else:
+                    gap_end = window_end
+                    next_cursor = window_end
+                if gap_end - cursor >= duration:
+                    slots.append({"start": cursor, "end": gap_end})
+                cursor = next_cursor
+            day += timedelta(days=1)
+        return slots
+
+
+schedule_index = ScheduleIndex()
@@ -0,0 +1,406 @@
+import heapq
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import islice
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# 其他进程写入的新记录最多延迟这么久出现在本进程的索引里（按 id 增量加载）
+SEARCH_INDEX_TTL_SECONDS = int(os.getenv("SEARCH_INDEX_TTL_SECONDS", "30"))
+# 修改 / 删除只能靠整体重建发现，在后台线程里做
+SEARCH_INDEX_REBUILD_SECONDS = int(os.getenv("SEARCH_INDEX_REBUILD_SECONDS", "600"))
+# 应用启动时在后台线程里预热索引；关掉后第一次查询才开始构建
+SEARCH_INDEX_WARMUP = os.getenv("SEARCH_INDEX_WARMUP", "1") == "1"
+MIN_SIMILARITY = 0.3
+MAX_PREFIX_WORDS = 200
+MAX_QUERY_WORDS = 5
+# 常见词（例如 "university"、单个字母的前缀）命中的文档很多，只取这么多候选再逐个打分
+MAX_CANDIDATES = 300
+
+# 字母和数字分开成词：邮箱 "jose.li123" -> jose / li / 123
+WORD_RE = re.compile(r"[^\W\d_]+|\d+")
+
+# 类型 -> (模型, {字段: 权重})
+SOURCES = {
+    "applicant": (models.Applicant, {"name": 1.0, "email": 0.9, "university": 0.6, "major": 0.5}),
+    "company": (models.Company, {"name": 1.0, "industry": 0.6}),
+}
+
+
+def normalize(text: str | None) -> str:
+    """小写、去掉重音符号：'José' / 'jose' 查到同一个词。"""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def words(text: str | None) -> list[str]:
+    return WORD_RE.findall(normalize(text))
+
+
+def trigrams(word: str) -> set[str]:
+    # 和 pg_trgm 一样前面补两个空格、后面补一个，短词和词首也能匹配
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _typo_candidate(word: str) -> bool:
+    # 太短的词改一个字母就成了别的词；数字不做容错
+    return len(word) >= 4 and not word.isdigit()
+
+
+def _deletes(word: str) -> set[str]:
+    """删掉一个字符得到的所有变体。两个词的变体有交集 <=> 它们之间最多差一次增 / 删 / 改 / 相邻换位（需要再核对）。"""
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    i = 0
+    while i < min(len(a), len(b)) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        # 替换一个字符，或者交换相邻两个字符
+        return a[i + 1:] == b[i + 1:] or (a[i:i + 2] == b[i:i + 2][::-1] and a[i + 2:] == b[i + 2:])
+    longer, shorter = (a, b) if len(a) > len(b) else (b, a)
+    return longer[i + 1:] == shorter[i:]
+
+
+def _field_words(kind: str, field: str, value: str | None) -> list[str]:
+    if kind == "applicant" and field == "email" and value:
+        # 只索引 @ 前面的部分，域名（gmail / com）对区分候选人没有帮助
+        value = value.split("@")[0]
+    return words(value)
+
+
+def _document(kind: str, values: dict) -> dict:
+    if kind == "applicant":
+        detail = " · ".join(filter(None, [values.get("email"), values.get("university"), values.get("major")]))
+    else:
+        detail = values.get("industry") or ""
+    return {"type": kind, "id": values["id"], "label": values["name"], "detail": detail}
+
+
+class SearchIndex:
+    """
+    申请人 / 公司的内存自动补全索引。
+    以词为单位：trigram -> 词、删字变体 -> 词（容错匹配），有序词表（前缀匹配，bisect），词 -> 字段 -> 文档。
+    查询时每个查询词先找到相似的词，取有限的候选文档再逐个打分，不需要扫描所有文档。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._word_ids: dict[str, int] = {}
+        self._words: list[str] = []
+        self._sorted_words: list[str] = []
+        self._sorted_dirty = False
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        # 删掉一个字符的变体 -> word_id，用来找只差一处拼写错误的短词（trigram 对短词的换位 / 错字不敏感）
+        self._deletes: dict[str, list[int]] = defaultdict(list)
+        # word_id -> {(kind, field): {doc_key}}；doc_key = (kind, id)
+        self._word_docs: dict[int, dict[tuple[str, str], set]] = defaultdict(lambda: defaultdict(set))
+        self._docs: dict[tuple[str, int], dict] = {}
+        # doc_key -> [(word_id, field, 字段权重)]，给候选文档打分用
+        self._doc_words: dict[tuple[str, int], list[tuple[int, str, float]]] = {}
+        self._max_ids = {kind: 0 for kind in SOURCES}
+        self.loaded = False
+        self.refreshed_at = 0.0
+        self.rebuilt_at = 0.0
+        self._rebuilding = False
+
+    # ------------------------------------------------------------ 写入
+
+    def _word_id(self, word: str) -> int:
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = len(self._words)
+            self._word_ids[word] = word_id
+            self._words.append(word)
+            self._sorted_dirty = True
+            if not word.isdigit():
+                for tri in trigrams(word):
+                    self._postings[tri].append(word_id)
+            if _typo_candidate(word):
+                for variant in (word, *_deletes(word)):
+                    self._deletes[variant].append(word_id)
+        return word_id
+
+    def _remove(self, key: tuple[str, int]):
+        for word_id, field, _ in self._doc_words.pop(key, []):
+            self._word_docs[word_id][(key[0], field)].discard(key)
+        self._docs.pop(key, None)
+
+    def _upsert(self, kind: str, values: dict):
+        key = (kind, values["id"])
+        self._remove(key)
+        entries = []
+        for field, weight in SOURCES[kind][1].items():
+            for word in _field_words(kind, field, values.get(field)):
+                word_id = self._word_id(word)
+                self._word_docs[word_id][(kind, field)].add(key)
+                entries.append((word_id, field, weight))
+        self._doc_words[key] = entries
+        self._docs[key] = _document(kind, values)
+        self._max_ids[kind] = max(self._max_ids[kind], values["id"])
+
+    def upsert(self, kind: str, values: dict):
+        with self._lock:
+            self._upsert(kind, values)
+
+    def remove(self, kind: str, entity_id: int):
+        with self._lock:
+            self._remove((kind, entity_id))
+
+    def _load_rows(self, db: Session, kind: str, after_id: int = 0) -> list[dict]:
+        model, fields = SOURCES[kind]
+        rows = db.execute(
+            select(model.id, *[getattr(model, f) for f in fields])
+            .where(model.id > after_id)
+            .order_by(model.id)
+        ).mappings().all()
+        return [dict(r) for r in rows]
+
+    def build(self, db: Session):
+        """整体重建：在锁外构建新索引，再一次性替换。"""
+        fresh = SearchIndex()
+        for kind in SOURCES:
+            for values in self._load_rows(db, kind):
+                fresh._upsert(kind, values)
+        fresh._sort_words()
+        with self._lock:
+            for name in ("_word_ids", "_words", "_sorted_words", "_sorted_dirty", "_postings", "_deletes",
+                         "_word_docs", "_docs", "_doc_words", "_max_ids"):
+                setattr(self, name, getattr(fresh, name))
+            self.loaded = True
+            self.refreshed_at = self.rebuilt_at = time.monotonic()
+
+    def refresh(self, db: Session):
+        """按 id 增量加载其他进程新写入的记录。"""
+        for kind in SOURCES:
+            rows = self._load_rows(db, kind, self._max_ids[kind])
+            if rows:
+                with self._lock:
+                    for values in rows:
+                        self._upsert(kind, values)
+        self.refreshed_at = time.monotonic()
+
+    def warm(self) -> bool:
+        """还没加载时在后台线程里构建，返回索引现在能否查询。构建期间的查询不等待，直接返回空结果。"""
+        if self.loaded:
+            return True
+        self._start_rebuild()
+        return False
+
+    def ensure_fresh(self, db: Session) -> bool:
+        """返回 False 表示索引还在预热；已加载时按 TTL 增量加载新记录，定期在后台整体重建。"""
+        if not self.warm():
+            return False
+        now = time.monotonic()
+        if now - self.refreshed_at > SEARCH_INDEX_TTL_SECONDS:
+            self.refresh(db)
+        if now - self.rebuilt_at > SEARCH_INDEX_REBUILD_SECONDS:
+            self._start_rebuild()
+        return True
+
+    def _start_rebuild(self):
+        with _build_lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, name="search-index-rebuild", daemon=True).start()
+
+    def _rebuild_in_background(self):
+        db = SessionLocal()
+        try:
+            self.build(db)
+        except Exception as e:
+            logger.warning("search index rebuild failed: %s", e)
+        finally:
+            self._rebuilding = False
+            db.close()
+
+    # ------------------------------------------------------------ 查询
+
+    def _sort_words(self):
+        if self._sorted_dirty or len(self._sorted_words) != len(self._words):
+            self._sorted_words = sorted(self._words)
+            self._sorted_dirty = False
+
+    def _similar_words(self, query_word: str, prefix: bool) -> dict[int, float]:
+        """
+        查询词 -> {word_id: 相似度}：完全匹配 1.0，前缀 0.9，一处拼写错误 0.85，
+        其余按 trigram Jaccard 相似度（不低于 MIN_SIMILARITY，乘 0.8）。
+        """
+        matches = {}
+        if query_word in self._word_ids:
+            matches[self._word_ids[query_word]] = 1.0
+        if prefix:
+            start = bisect_left(self._sorted_words, query_word)
+            for word in islice(self._sorted_words, start, start + MAX_PREFIX_WORDS):
+                if not word.startswith(query_word):
+                    break
+                matches.setdefault(self._word_ids[word], 0.9)
+
+        if _typo_candidate(query_word):
+            for variant in (query_word, *_deletes(query_word)):
+                for word_id in self._deletes.get(variant, ()):
+                    if word_id not in matches and _within_one_edit(query_word, self._words[word_id]):
+                        matches[word_id] = 0.85
+
+        if query_word.isdigit():
+            # 数字（学号、邮箱编号）只做完全 / 前缀匹配
+            return matches
+        query_tris = trigrams(query_word)
+        shared = defaultdict(int)
+        for tri in query_tris:
+            for word_id in self._postings.get(tri, ()):
+                shared[word_id] += 1
+        for word_id, count in shared.items():
+            if word_id in matches:
+                continue
+            word_tris = len(self._words[word_id]) + 1
+            similarity = count / (len(query_tris) + word_tris - count)
+            if similarity >= MIN_SIMILARITY:
+                matches[word_id] = similarity * 0.8
+        return matches
+
+    def _postings_for(self, matches: dict[int, float], kinds: list[str]) -> list[tuple[float, int, str, set]]:
+        """查询词命中的 (相似度 × 字段权重, -词长, 字段, 文档集合)，从高到低。"""
+        postings = []
+        for word_id, similarity in matches.items():
+            for (kind, field), docs in self._word_docs[word_id].items():
+                if docs and kind in kinds:
+                    postings.append((similarity * SOURCES[kind][1][field], -len(self._words[word_id]), field, docs))
+        postings.sort(key=lambda p: p[:2], reverse=True)
+        return postings
+
+    def _candidates(self, postings: list[list[tuple]]) -> set:
+        """
+        用命中文档最少的查询词作为驱动，按得分从高到低取候选：先取所有查询词都命中的文档
+        （集合求交在 C 里完成），不够再补只命中驱动词的文档，最多 MAX_CANDIDATES 个。
+        """
+        ordered = sorted(postings, key=lambda ps: sum(len(p[3]) for p in ps))
+        driver, others = ordered[0], ordered[1:]
+        candidates = set()
+        if others:
+            everywhere = set().union(*(p[3] for p in driver))
+            for ps in others:
+                everywhere = set().union(*(everywhere & p[3] for p in ps))
+                if not everywhere:
+                    break
+            for *_, docs in driver:
+                for key in docs & everywhere:
+                    candidates.add(key)
+                    if len(candidates) >= MAX_CANDIDATES:
+                        return candidates
+        for *_, docs in driver:
+            for key in docs:
+                candidates.add(key)
+                if len(candidates) >= MAX_CANDIDATES:
+                    return candidates
+        return candidates
+
+    def suggest(self, q: str, kinds: list[str], limit: int = 10) -> list[dict]:
+        query_words = words(q)[:MAX_QUERY_WORDS]
+        if not query_words:
+            return []
+        with self._lock:
+            self._sort_words()
+            # 最后一个词可能还没输完，按前缀匹配；前面的词要求完整（或容错）匹配
+            postings = [
+                self._postings_for(self._similar_words(w, prefix=i == len(query_words) - 1), kinds)
+                for i, w in enumerate(query_words)
+            ]
+            candidates = self._candidates(postings)
+
+            # 每个候选文档在每个查询词上的最高得分：postings 已按得分从高到低排好，第一次命中就是最高分
+            scores = {key: [0.0] * len(query_words) for key in candidates}
+            best = {}
+            for i, ps in enumerate(postings):
+                for score, _, field, docs in ps:
+                    for key in docs & candidates:
+                        row = scores[key]
+                        if not row[i]:
+                            row[i] = score
+                            if score > best.get(key, (None, 0.0))[1]:
+                                best[key] = (field, score)
+
+            def rank(key):
+                row = scores[key]
+                # 所有查询词都命中的排在前面，其次看平均得分，再按名字长短（越短越接近输入）
+                return (len(row) - row.count(0.0), sum(row), -len(self._docs[key]["label"] or ""), -key[1])
+
+            return [
+                {**self._docs[key], "score": round(sum(scores[key]) / len(query_words), 3), "matched_field": best[key][0]}
+                for key in heapq.nlargest(limit, candidates, key=rank)
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "documents": len(self._docs),
+                "words": len(self._words),
+                "trigrams": len(self._postings),
+                "delete_variants": len(self._deletes),
+            }
+
+
+_build_lock = threading.Lock()
+search_index = SearchIndex()
+
+
+# ------------------------------------------------------------ 写入钩子
+# 任何 Session 提交了 Applicant / Company 的新增、修改、删除后同步更新索引（索引还没加载时跳过，预热的整体构建会读到）。
+# flush 时记下字段值，commit 后再应用，回滚则丢弃。
+
+_KINDS = {models.Applicant: "applicant", models.Company: "company"}
+_PENDING = "search_index_pending"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    pending = None
+    for obj in [*session.new, *session.dirty, *session.deleted]:
+        kind = _KINDS.get(type(obj))
+        if kind is None:
+            continue
+        if pending is None:
+            pending = session.info.setdefault(_PENDING, {})
+        if obj in session.deleted:
+            pending[(kind, obj.id)] = None
+        else:
+            pending[(kind, obj.id)] = {f: getattr(obj, f) for f in ["id", *SOURCES[kind][1]]}
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session):
+    pending = session.info.pop(_PENDING, None)
+    if not pending or not search_index.loaded:
+        return
+    for (kind, entity_id), values in pending.items():
+        if values is None:
+            search_index.remove(kind, entity_id)
+        else:
+            search_index.upsert(kind, values)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,266 @@
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+from sqlalchemy import delete, event, insert, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models
+
+# 规范名 -> 常见写法。数据库 skill_synonym 表里的映射会覆盖 / 补充这里
+BUILTIN_SYNONYMS = {
+    "javascript": ["js", "java script", "ecmascript", "es6"],
+    "typescript": ["ts"],
+    "python": ["py", "python3"],
+    "go": ["golang"],
+    "c++": ["cpp"],
+    "c#": ["csharp", "c sharp"],
+    "node.js": ["node", "nodejs"],
+    "react": ["reactjs", "react.js"],
+    "vue": ["vuejs", "vue.js"],
+    "postgresql": ["postgres", "psql"],
+    "kubernetes": ["k8s"],
+    "machine learning": ["ml"],
+    "amazon web services": ["aws"],
+    ".net": ["dotnet", "asp.net"],
+}
+
+# 同时也是普通英文单词 / 缩写的别名，在自由文本里需要大小写或上下文才算技能：
+# "Go, Rust" / "TS" / "ML engineer" 算，"go to market" / "node failure" 不算
+AMBIGUOUS_ALIASES = {"go", "node", "ts", "ml", "py"}
+_CONTEXT_WORDS = {
+    "lang", "language", "programming", "developer", "developers", "engineer", "engineers",
+    "engineering", "framework", "runtime", "backend", "services", "microservices", "models", "pipelines",
+}
+_LIST_SEPARATORS = set(",/|;()")
+_SENTENCE_END = set(".!?:-*•\n")
+
+# skill.name 的列宽；skill_tags 是自由文本，更长的片段不是技能名，不写进技能字典
+SKILL_NAME_MAX_LENGTH = models.Skill.name.type.length
+
+# 数据库同义词在内存里缓存这么久，过期后下次用到时重新加载
+SKILL_SYNONYMS_TTL_SECONDS = float(os.getenv("SKILL_SYNONYMS_TTL_SECONDS", "300"))
+
+
+def skill_key(tag: str) -> str:
+    """
+    别名查找用的 key：小写，去掉空格、连字符和下划线，'Java Script' / 'java-script' 都变成 'javascript'。
+    点保留，否则普通单词 "net" 会被当成 ".net"。
+    """
+    return re.sub(r"[\s\-_]+", "", tag.strip().lower())
+
+
+def _legacy_key(tag: str) -> str:
+    # 旧版 skill_key 连点一起去掉，seed_synonyms 用它清理旧的同义词行
+    return re.sub(r"[\s\-_.]+", "", tag.strip().lower())
+
+
+def _builtin_aliases() -> dict[str, str]:
+    aliases = {}
+    for canonical, synonyms in BUILTIN_SYNONYMS.items():
+        for alias in [canonical, *synonyms]:
+            aliases[skill_key(alias)] = canonical
+    return aliases
+
+
+_aliases: dict[str, str] = _builtin_aliases()
+_loaded_at: float | None = None
+
+
+def reset_synonyms():
+    """丢掉从数据库加载的同义词，只保留内置的；下次用到时重新加载。"""
+    global _aliases, _loaded_at
+    _aliases = _builtin_aliases()
+    _loaded_at = None
+
+
+def canonical_skill(tag: str) -> str:
+    cleaned = " ".join(tag.strip().lower().split())
+    return _aliases.get(skill_key(cleaned), cleaned)
+
+
+def find_skills(text: str | None, extra: set[str] = frozenset()) -> Counter:
+    """
+    自由文本里 1-3 个词的片段映射成规范技能名，返回 规范名 -> 出现次数。
+    只统计技能字典里的技能和 extra（规范名集合，例如职位要求的技能）；
+    AMBIGUOUS_ALIASES 里的单词需要 is_skill_context 认可才算。
+    """
+    text = text or ""
+    matches = list(re.finditer(r"[A-Za-z0-9+#.]+", text))
+    words = [m.group().rstrip(".") for m in matches]
+    lowered = [w.lower() for w in words]
+    counts = Counter()
+    for n in (1, 2, 3):
+        for i in range(len(words) - n + 1):
+            phrase = " ".join(lowered[i:i + n])
+            key = skill_key(phrase)
+            skill = _aliases.get(key) or (phrase if phrase in extra else None)
+            if skill is None:
+                continue
+            if n == 1 and key in AMBIGUOUS_ALIASES and not is_skill_context(text, matches, i):
+                continue
+            counts[skill] += 1
+    return counts
+
+
+def is_skill_context(text: str, matches: list, i: int) -> bool:
+    """
+    第 i 个词（一个有歧义的短别名）是否在当技能用：
+    前后紧挨着 _CONTEXT_WORDS 里的词（"go developer"、"ML models"）；
+    或者不是全小写（"Go"、"TS"），并且在列表里（前后有逗号、斜杠等）或不在句首。
+    """
+    neighbours = [matches[j].group().rstrip(".").lower() for j in (i - 1, i + 1) if 0 <= j < len(matches)]
+    if any(word in _CONTEXT_WORDS for word in neighbours):
+        return True
+    if matches[i].group().rstrip(".").islower():
+        return False
+    start, end = matches[i].span()
+    before = text[matches[i - 1].end() if i else 0:start]
+    after = text[end:matches[i + 1].start() if i + 1 < len(matches) else len(text)]
+    if _LIST_SEPARATORS & set(before + after):
+        return True
+    preceding = text[:start].rstrip(" \t")
+    return bool(preceding) and preceding[-1] not in _SENTENCE_END
+
+
+def load_synonyms(db: Session):
+    """重新加载内置同义词 + 数据库里的同义词和技能名，整体替换内存映射。Session 和 Connection 都可以传。"""
+    global _aliases, _loaded_at
+    aliases = _builtin_aliases()
+    for (name,) in db.execute(select(models.Skill.name)):
+        aliases.setdefault(skill_key(name), name)
+    rows = db.execute(
+        select(models.SkillSynonym.alias, models.Skill.name)
+        .join(models.Skill, models.Skill.id == models.SkillSynonym.skill_id)
+    ).all()
+    for alias, name in rows:
+        aliases[alias] = name
+    _aliases = aliases
+    _loaded_at = time.monotonic()
+
+
+def ensure_synonyms(db: Session):
+    """还没加载过或者超过 SKILL_SYNONYMS_TTL_SECONDS 时重新加载。"""
+    if _loaded_at is None or time.monotonic() - _loaded_at > SKILL_SYNONYMS_TTL_SECONDS:
+        load_synonyms(db)
+
+
+def parse_skills(skill_tags: str | None) -> list[str]:
+    """skill_tags 拆成去重后的规范名，超过 SKILL_NAME_MAX_LENGTH 的片段跳过。"""
+    if not skill_tags:
+        return []
+    names = (canonical_skill(t) for t in skill_tags.split(",") if t.strip())
+    return list(dict.fromkeys(name for name in names if len(name) <= SKILL_NAME_MAX_LENGTH))
+
+
+def resolve_skill_ids(db: Session, names: list[str]) -> dict[str, int]:
+    """
+    规范名 -> skill.id，字典里没有的技能会被创建，超过列宽的名字忽略。
+    只用 Core 语句，flush 事件里可以传 Connection。
+    """
+    names = [name for name in names if len(name) <= SKILL_NAME_MAX_LENGTH]
+    if not names:
+        return {}
+    found = dict(db.execute(
+        select(models.Skill.name, models.Skill.id).where(models.Skill.name.in_(names))
+    ).all())
+    for name in names:
+        if name in found:
+            continue
+        try:
+            with db.begin_nested():
+                found[name] = db.execute(insert(models.Skill).values(name=name)).inserted_primary_key[0]
+        except IntegrityError:
+            # 并发请求刚刚插入了同名技能
+            found[name] = db.execute(select(models.Skill.id).where(models.Skill.name == name)).scalar_one()
+    return found
+
+
+def _sync(db: Session, model, owner_column: str, owner_id: int, skill_tags: str | None):
+    ensure_synonyms(db)
+    ids = resolve_skill_ids(db, parse_skills(skill_tags))
+    db.execute(delete(model).where(getattr(model, owner_column) == owner_id))
+    if ids:
+        db.execute(insert(model), [{owner_column: owner_id, "skill_id": skill_id} for skill_id in set(ids.values())])
+
+
+def sync_job_skills(db: Session, job_id: int, skill_tags: str | None):
+    _sync(db, models.JobSkill, "job_id", job_id, skill_tags)
+
+
+def sync_applicant_skills(db: Session, applicant_id: int, skill_tags: str | None):
+    _sync(db, models.ApplicantSkill, "applicant_id", applicant_id, skill_tags)
+
+
+# 任何写 applicant 的代码路径都在同一个 flush / 事务里维护 applicant_skill
+@event.listens_for(models.Applicant, "after_insert")
+def _sync_inserted_applicant(mapper, connection, target):
+    sync_applicant_skills(connection, target.id, target.skill_tags)
+
+
+@event.listens_for(models.Applicant, "after_update")
+def _sync_updated_applicant(mapper, connection, target):
+    if inspect(target).attrs.skill_tags.history.has_changes():
+        sync_applicant_skills(connection, target.id, target.skill_tags)
+
+
+def seed_synonyms(db: Session):
+    """把 BUILTIN_SYNONYMS 写入 skill / skill_synonym 表。"""
+    ids = resolve_skill_ids(db, list(BUILTIN_SYNONYMS))
+    existing = set(db.execute(select(models.SkillSynonym.alias)).scalars())
+    for canonical, synonyms in BUILTIN_SYNONYMS.items():
+        keys = {skill_key(alias) for alias in [canonical, *synonyms]}
+        stale = {_legacy_key(alias) for alias in [canonical, *synonyms]} - keys
+        if stale & existing:
+            # 旧 key 去掉了点（".net" 存成了 "net"），删掉以免普通单词命中
+            db.execute(delete(models.SkillSynonym).where(
+                models.SkillSynonym.alias.in_(stale), models.SkillSynonym.skill_id == ids[canonical],
+            ))
+            existing -= stale
+        for alias in [canonical, *synonyms]:
+            key = skill_key(alias)
+            if key not in existing:
+                db.add(models.SkillSynonym(alias=key, skill_id=ids[canonical]))
+                existing.add(key)
+    db.commit()
+
+
+def backfill(db: Session, batch_size: int = 500) -> dict:
+    """为已有的 job / applicant 生成 job_skill / applicant_skill，按 id 分批提交。"""
+    seed_synonyms(db)
+    load_synonyms(db)
+    counts = {}
+    for model, sync in ((models.Job, sync_job_skills), (models.Applicant, sync_applicant_skills)):
+        last_id, total = 0, 0
+        while True:
+            rows = db.execute(
+                select(model.id, model.skill_tags)
+                .where(model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for row_id, skill_tags in rows:
+                sync(db, row_id, skill_tags)
+            db.commit()
+            last_id = rows[-1][0]
+            total += len(rows)
+        counts[model.__tablename__] = total
+    return counts
+
+
+if __name__ == "__main__":
+    # python -m app.services.skills backfill
+    from app.db import SessionLocal
+
+    if sys.argv[1:] != ["backfill"]:
+        sys.exit("usage: python -m app.services.skills backfill")
+    session = SessionLocal()
+    try:
+        print(backfill(session))
+    finally:
+        session.close()
@@ -0,0 +1,80 @@
+"""
+worker 冷启动分析：在全新的解释器里 import app.main，统计导入耗时、进程总耗时、常驻内存 (RSS) 和导入最慢的模块。
+
+    python -m app.services.startup_profile [--runs 7] [--top 15]
+
+只读取 /proc/self/status，需要在 Linux 上运行；不会连接数据库（create_engine 是惰性的）。
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# 按需加载的重量级依赖，出现在这里说明有代码在模块级别导入了它们
+HEAVY_MODULES = ("pdfplumber", "pdfminer", "docx", "lxml", "PIL", "requests", "urllib3")
+
+_CHILD = r"""
+import sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+rss_kib = int(open("/proc/self/status").read().split("VmRSS:")[1].split()[0])
+heavy = [m for m in HEAVY if m in sys.modules]
+print(json.dumps({"import_seconds": elapsed, "rss_kib": rss_kib, "modules": len(sys.modules), "heavy": heavy}))
+"""
+
+
+def _child_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    return env
+
+
+def measure(runs: int) -> dict:
+    samples = []
+    code = f"import json\nHEAVY = {HEAVY_MODULES!r}\n" + _CHILD
+    for _ in range(runs):
+        started = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code], env=_child_env(), capture_output=True, text=True, check=True)
+        sample = json.loads(out.stdout.strip().splitlines()[-1])
+        sample["process_seconds"] = time.perf_counter() - started
+        samples.append(sample)
+    return {
+        "runs": runs,
+        "import_app_main_ms": round(statistics.median(s["import_seconds"] for s in samples) * 1000, 1),
+        "cold_start_process_ms": round(statistics.median(s["process_seconds"] for s in samples) * 1000, 1),
+        "rss_mib": round(statistics.median(s["rss_kib"] for s in samples) / 1024, 1),
+        "modules_loaded": samples[-1]["modules"],
+        "heavy_modules_loaded": samples[-1]["heavy"],
+    }
+
+
+def slowest_imports(top: int) -> list[tuple[str, float]]:
+    """-X importtime 的自身耗时（不含子模块），按毫秒排序。"""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=_child_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|\s+(.+)$", line)
+        if m:
+            rows.append((m.group(3).strip(), int(m.group(1)) / 1000))
+    rows.sort(key=lambda r: -r[1])
+    return rows[:top]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start and import-time profile of app.main")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    print(json.dumps(measure(args.runs), indent=2))
+    print("\nslowest imports (self time, ms):")
+    for name, ms in slowest_imports(args.top):
+        print(f"  {ms:8.1f}  {name}")
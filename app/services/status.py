@@ -0,0 +1,82 @@
+from typing import Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+# 当前状态 -> 允许变更到的状态
+APPLICATION_TRANSITIONS = {
+    "pending": {"reviewing", "interviewing", "accepted", "rejected", "withdrawn"},
+    "reviewing": {"interviewing", "accepted", "rejected", "withdrawn"},
+    "interviewing": {"accepted", "rejected", "withdrawn"},
+    "accepted": {"withdrawn"},
+    "rejected": {"reviewing"},
+    "withdrawn": set(),
+}
+
+INTERVIEW_TRANSITIONS = {
+    "Pending": {"Confirmed", "Cancelled"},
+    "Confirmed": {"Pending", "Completed", "Cancelled"},
+    "Cancelled": {"Pending"},
+    "Completed": set(),
+}
+
+# PATCH /interviews/{id}/status 一直允许四种状态之间任意修改，老客户端依赖这一点，单条路由保留原来的规则
+INTERVIEW_LEGACY_TRANSITIONS = {status: set(INTERVIEW_TRANSITIONS) - {status} for status in INTERVIEW_TRANSITIONS}
+
+
+def batch_transition(
+    db: Session,
+    model,
+    transitions: dict,
+    ids: list[int],
+    new_status: str,
+    check: Callable[[Session, dict], dict] | None = None,
+) -> dict:
+    """
+    把一批记录改成 new_status，一个事务三条语句：
+    SELECT ... FOR UPDATE 锁住并读出当前状态 → 校验状态流转 → UPDATE ... WHERE id IN (合法的 id) → 读回更新后的行。
+    check(db, {id: 原状态}) 可以对通过流转校验的记录再做业务检查，返回 id -> 拒绝原因，在 UPDATE 之前执行。
+    返回 updated（ORM 对象，已从 session 移除，提交后仍可直接序列化）、previous（id -> 原状态）、rejected、missing_ids。
+    """
+    if new_status not in transitions:
+        raise ValueError(f"Invalid status value: {new_status}")
+    ids = list(dict.fromkeys(ids))
+    previous = dict(db.execute(
+        select(model.id, model.status).where(model.id.in_(ids)).with_for_update()
+    ).all())
+
+    valid, rejected = [], []
+    for row_id in ids:
+        if row_id not in previous:
+            continue
+        old_status = previous[row_id]
+        if old_status == new_status:
+            rejected.append({"id": row_id, "status": old_status, "reason": f"Already {new_status}"})
+        elif new_status not in transitions.get(old_status, ()):
+            rejected.append({"id": row_id, "status": old_status, "reason": f"Cannot change status from {old_status} to {new_status}"})
+        else:
+            valid.append(row_id)
+
+    if check is not None and valid:
+        blocked = check(db, {row_id: previous[row_id] for row_id in valid})
+        rejected += [{"id": row_id, "status": previous[row_id], "reason": blocked[row_id]} for row_id in valid if row_id in blocked]
+        valid = [row_id for row_id in valid if row_id not in blocked]
+
+    updated = []
+    if valid:
+        db.execute(
+            update(model).where(model.id.in_(valid)).values(status=new_status),
+            execution_options={"synchronize_session": False},
+        )
+        # check 可能已经把这些行加载进 session，populate_existing 才能读到新状态
+        updated = db.query(model).filter(model.id.in_(valid)).order_by(model.id).populate_existing().all()
+        for row in updated:
+            db.expunge(row)
+    db.commit()
+
+    return {
+        "updated": updated,
+        "previous": {row_id: previous[row_id] for row_id in valid},
+        "rejected": rejected,
+        "missing_ids": [row_id for row_id in ids if row_id not in previous],
+    }
@@ -0,0 +1,174 @@
+"""
+OTLP/HTTP (JSON) collector 的本地替身，以及 trace 瀑布图。
+
+    # 接收 TRACE_EXPORTER=otlp 发来的 span，写入 JSONL 并在终端打印每个 trace 的瀑布图
+    python -m app.services.trace_collector serve --port 4318 --out traces.jsonl
+
+    # 从 JSONL（jsonl exporter 或上面的 serve 写出的文件）里看最慢的 5 个请求
+    python -m app.services.trace_collector waterfall traces.jsonl --slowest 5
+    python -m app.services.trace_collector waterfall traces.jsonl --trace-id <id>
+"""
+import argparse
+import json
+import sys
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BAR_WIDTH = 40
+
+
+def _attr_value(value: dict):
+    if "intValue" in value:
+        return int(value["intValue"])
+    for key in ("stringValue", "doubleValue", "boolValue"):
+        if key in value:
+            return value[key]
+    return None
+
+
+def from_otlp(body: dict) -> list[dict]:
+    """ExportTraceServiceRequest (JSON) -> 和 JsonlExporter 相同格式的 span dict。"""
+    spans = []
+    for resource_spans in body.get("resourceSpans", []):
+        resource = {a["key"]: _attr_value(a["value"]) for a in resource_spans.get("resource", {}).get("attributes", [])}
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for s in scope_spans.get("spans", []):
+                start, end = int(s["startTimeUnixNano"]), int(s["endTimeUnixNano"])
+                status = s.get("status", {})
+                spans.append({
+                    "trace_id": s["traceId"],
+                    "span_id": s["spanId"],
+                    "parent_id": s.get("parentSpanId") or None,
+                    "name": s["name"],
+                    "start_time_unix_nano": start,
+                    "end_time_unix_nano": end,
+                    "duration_ms": round((end - start) / 1e6, 3),
+                    "attributes": {a["key"]: _attr_value(a["value"]) for a in s.get("attributes", [])},
+                    "status": "error" if status.get("code") == 2 else "ok",
+                    "error": status.get("message"),
+                    "service": resource.get("service.name"),
+                })
+    return spans
+
+
+def render_waterfall(spans: list[dict]) -> str:
+    """一个 trace 的瀑布图：按父子关系缩进，条形表示相对根 span 的开始时间和耗时。"""
+    ids = {s["span_id"] for s in spans}
+    children = defaultdict(list)
+    roots = []
+    for s in spans:
+        if s["parent_id"] in ids:
+            children[s["parent_id"]].append(s)
+        else:
+            roots.append(s)
+    origin = min(s["start_time_unix_nano"] for s in spans)
+    total = max(max(s["end_time_unix_nano"] for s in spans) - origin, 1)
+
+    lines = [f"trace {spans[0]['trace_id']}  {total / 1e6:.1f} ms  {len(spans)} spans"]
+
+    def walk(s, depth):
+        offset = s["start_time_unix_nano"] - origin
+        left = int(offset / total * BAR_WIDTH)
+        width = max(int((s["end_time_unix_nano"] - s["start_time_unix_nano"]) / total * BAR_WIDTH), 1)
+        label = ("  " * depth + s["name"])[:48]
+        detail = s["attributes"].get("db.statement") or s["attributes"].get("http.route") or ""
+        flag = " !" if s["status"] == "error" else ""
+        lines.append(
+            f"  {label:<48} {offset / 1e6:>8.1f} {s['duration_ms']:>9.1f} ms "
+            f"|{' ' * left}{'█' * width}{' ' * max(BAR_WIDTH - left - width, 0)}|{flag} {detail[:60]}"
+        )
+        for child in sorted(children[s["span_id"]], key=lambda c: c["start_time_unix_nano"]):
+            walk(child, depth + 1)
+
+    for root in sorted(roots, key=lambda r: r["start_time_unix_nano"]):
+        walk(root, 0)
+    return "\n".join(lines)
+
+
+def load_traces(path: str) -> dict[str, list[dict]]:
+    traces = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                s = json.loads(line)
+                traces[s["trace_id"]].append(s)
+    return traces
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    out = None
+    lock = threading.Lock()
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/traces":
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            spans = from_otlp(json.loads(self.rfile.read(length) or b"{}"))
+        except (ValueError, KeyError) as e:
+            self.send_error(400, str(e))
+            return
+
+        by_trace = defaultdict(list)
+        for s in spans:
+            by_trace[s["trace_id"]].append(s)
+        with self.lock:
+            if self.out:
+                self.out.writelines(json.dumps(s, ensure_ascii=False) + "\n" for s in spans)
+                self.out.flush()
+            for trace_spans in by_trace.values():
+                # 根 span 最后结束，收到根 span 时这个 trace 基本完整
+                if any(s["parent_id"] is None or s["name"].startswith("HTTP ") for s in trace_spans):
+                    print(render_waterfall(trace_spans), flush=True)
+
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 4318, out_path: str | None = None) -> ThreadingHTTPServer:
+    handler = type("Handler", (CollectorHandler,), {"out": open(out_path, "a", encoding="utf-8") if out_path else None})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OTLP/HTTP collector stand-in and trace waterfall viewer")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_cmd = commands.add_parser("serve")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=4318)
+    serve_cmd.add_argument("--out", default=None, help="also append received spans to this JSONL file")
+    view_cmd = commands.add_parser("waterfall")
+    view_cmd.add_argument("path")
+    view_cmd.add_argument("--trace-id")
+    view_cmd.add_argument("--slowest", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = serve(args.host, args.port, args.out)
+        print(f"collector listening on http://{args.host}:{args.port}/v1/traces")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    else:
+        traces = load_traces(args.path)
+        if args.trace_id:
+            if args.trace_id not in traces:
+                sys.exit(f"trace {args.trace_id} not found")
+            selected = [traces[args.trace_id]]
+        else:
+            def total_ms(spans):
+                return (max(s["end_time_unix_nano"] for s in spans) - min(s["start_time_unix_nano"] for s in spans)) / 1e6
+            selected = sorted(traces.values(), key=total_ms, reverse=True)[:args.slowest]
+        for spans in selected:
+            print(render_waterfall(spans))
+            print()
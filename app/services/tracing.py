@@ -0,0 +1,441 @@
+"""
+轻量级链路追踪：每个 HTTP 请求一个 trace，路由、service、SQL 和调用 LLM 的 requests 都是它的子 span。
+span 上下文放在 contextvar 里，同步路由在线程池里执行、asyncio 任务里也能拿到；出站请求带 W3C traceparent 头。
+
+采样：TRACE_SAMPLE_RATE 比例的请求按头部采样导出；没被采到但根 span 耗时超过 TRACE_SLOW_MS 的请求也会整条导出，
+所以每个慢请求都能看到瀑布图。入站 traceparent 的 sampled 标记为 01 时强制导出。
+
+导出：TRACE_EXPORTER=jsonl（按大小轮转的本地 JSONL 文件）/ otlp（OTLP/HTTP JSON，可以发给 OpenTelemetry Collector
+或 python -m app.services.trace_collector 这个本地替身）/ none（默认，不创建任何 span）。
+"""
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "1000"))
+TRACE_JSONL_PATH = os.getenv("TRACE_JSONL_PATH", "traces.jsonl")
+TRACE_JSONL_MAX_BYTES = int(os.getenv("TRACE_JSONL_MAX_BYTES", str(20 * 1024 * 1024)))
+TRACE_JSONL_BACKUPS = int(os.getenv("TRACE_JSONL_BACKUPS", "5"))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://127.0.0.1:4318/v1/traces")
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "recruitment-backend")
+# 批量评估这类长请求里 SQL 很多，每个 trace 最多保留这么多 span
+MAX_SPANS_PER_TRACE = 2000
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Trace:
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: list[Span] = []
+        self.dropped = 0
+        self.exported = None  # None：根 span 还没结束；True / False：已导出 / 已丢弃
+        self._lock = threading.Lock()
+
+    def add(self, span: "Span"):
+        with self._lock:
+            if self.exported is None:
+                if len(self.spans) < MAX_SPANS_PER_TRACE:
+                    self.spans.append(span)
+                else:
+                    self.dropped += 1
+                return
+            late = self.exported
+        # 根 span 结束后才结束的 span（例如 BackgroundTask 里的查询）
+        if late:
+            _processor.submit([span])
+
+    def finish(self, root: "Span"):
+        with self._lock:
+            slow = root.duration_ms >= TRACE_SLOW_MS
+            self.exported = self.sampled or slow
+            spans, self.spans = self.spans, []
+        if self.exported:
+            root.attributes["trace.sampled_by"] = "head" if self.sampled else "slow"
+            if self.dropped:
+                root.attributes["trace.dropped_spans"] = self.dropped
+            _processor.submit(spans)
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: str | None, attributes: dict | None = None, start_ns: int | None = None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException):
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def end(self, end_ns: int | None = None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        self.trace.add(self)
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace.trace_id}-{self.span_id}-{'01' if self.trace.sampled else '00'}"
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "service": SERVICE_NAME,
+        }
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def record_error(self, exc):
+        pass
+
+    def end(self, end_ns=None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def enabled() -> bool:
+    return _processor.exporter is not None
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def start_trace(name: str, traceparent: str | None = None, attributes: dict | None = None) -> Span | None:
+    """开始一个根 span（沿用入站 traceparent 的 trace id），并设为当前 span。"""
+    if not enabled():
+        return None
+    parent_id = None
+    sampled = random.random() < TRACE_SAMPLE_RATE
+    m = _TRACEPARENT.match((traceparent or "").strip().lower())
+    if m:
+        trace_id, parent_id = m.group(1), m.group(2)
+        sampled = sampled or m.group(3) == "01"
+    else:
+        trace_id = os.urandom(16).hex()
+    root = Span(Trace(trace_id, sampled), name, parent_id, attributes)
+    _current.set(root)
+    return root
+
+
+def end_trace(root: Span):
+    root.end()
+    root.trace.finish(root)
+
+
+def start_span(name: str, attributes: dict | None = None, parent: Span | None = None) -> Span | _NoopSpan:
+    """开始一个子 span 但不设为当前 span，用于跨线程 / 生成器的阶段，调用方负责 end()。"""
+    parent = parent or _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    parent = _current.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    child = Span(parent.trace, name, parent.span_id, attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.record_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+
+def traced(name: str):
+    """同步函数装饰器：调用期间包一层子 span。"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def inject_headers(headers: dict | None = None, current: Span | None = None) -> dict:
+    """给出站请求加上 traceparent 头。"""
+    headers = dict(headers or {})
+    current = current or _current.get()
+    if isinstance(current, Span):
+        headers["traceparent"] = current.traceparent()
+    return headers
+
+
+# ---------------------------------------------------------------- exporters
+
+class JsonlExporter:
+    """每个 span 一行 JSON，按大小轮转（RotatingFileHandler 自带线程锁）。"""
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        self._log = logging.getLogger("app.tracing.jsonl")
+        self._log.propagate = False
+        self._log.setLevel(logging.INFO)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._log.addHandler(handler)
+
+    def export(self, spans: list[Span]):
+        for s in spans:
+            self._log.info(json.dumps(s.to_dict(), ensure_ascii=False, default=str))
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: list[Span]) -> dict:
+    """OTLP/HTTP JSON 的 ExportTraceServiceRequest。"""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{
+            "scope": {"name": "app.services.tracing"},
+            "spans": [{
+                "traceId": s.trace.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": s.parent_id or "",
+                "name": s.name,
+                "kind": 2 if s.parent_id is None or s.name.startswith("HTTP ") else 1,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+            } for s in spans],
+        }],
+    }]}
+
+
+class OtlpHttpExporter:
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, spans: list[Span]):
+        import urllib.request
+
+        body = json.dumps(to_otlp(spans)).encode("utf-8")
+        request = urllib.request.Request(self.endpoint, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class BatchProcessor:
+    """后台线程批量导出，请求线程只负责入队；队列满时丢弃并计数。"""
+
+    def __init__(self, exporter, max_queue: int = 10000, batch_size: int = 512, interval: float = 2.0):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self.exported = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+
+    def submit(self, spans: list[Span]):
+        if self.exporter is None:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+        for s in spans:
+            try:
+                self._queue.put_nowait(s)
+            except queue.Full:
+                self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            self._export(batch)
+
+    def _export(self, batch: list[Span]):
+        try:
+            self.exporter.export(batch)
+            self.exported += len(batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.warning("trace export failed: %s", e)
+
+    def flush(self):
+        """同步导出队列里剩余的 span（测试和进程退出时用）。"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._export(batch)
+
+    def snapshot(self) -> dict:
+        return {
+            "exporter": TRACE_EXPORTER,
+            "sample_rate": TRACE_SAMPLE_RATE,
+            "slow_ms": TRACE_SLOW_MS,
+            "queued": self._queue.qsize(),
+            "exported_spans": self.exported,
+            "dropped_spans": self.dropped,
+        }
+
+
+def _build_exporter():
+    if TRACE_EXPORTER == "jsonl":
+        return JsonlExporter(TRACE_JSONL_PATH, TRACE_JSONL_MAX_BYTES, TRACE_JSONL_BACKUPS)
+    if TRACE_EXPORTER == "otlp":
+        return OtlpHttpExporter(TRACE_OTLP_ENDPOINT)
+    return None
+
+
+_processor = BatchProcessor(_build_exporter())
+
+
+def tracing_stats() -> dict:
+    return _processor.snapshot()
+
+
+def flush():
+    _processor.flush()
+
+
+# ---------------------------------------------------------------- ASGI / SQLAlchemy integration
+
+class TracingMiddleware:
+    """
+    纯 ASGI 中间件（StreamingResponse / SSE 要等流结束才算请求结束）：
+    为每个请求开根 span，单独记录请求体上传耗时，响应头带 traceparent。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not enabled():
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        root = start_trace(
+            f"HTTP {scope['method']}",
+            headers.get("traceparent"),
+            {"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        upload = {"start": None, "bytes": 0}
+
+        async def traced_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                if upload["start"] is None:
+                    upload["start"] = time.time_ns()
+                upload["bytes"] += len(message.get("body", b""))
+                if not message.get("more_body") and upload["bytes"]:
+                    Span(root.trace, "http.receive_body", root.span_id, {"http.request_content_length": upload["bytes"]},
+                         start_ns=upload["start"]).end()
+            return message
+
+        async def traced_send(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"traceparent", root.traceparent().encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, traced_receive, traced_send)
+        except BaseException as e:
+            root.record_error(e)
+            raise
+        finally:
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"HTTP {scope['method']} {route.path}"
+                root.set_attribute("http.route", route.path)
+            end_trace(root)
+
+
+def instrument_engine(engine):
+    """每条 SQL 一个 db.query span，挂在执行它的 span 下面。语句截断到 500 字符，不记录参数。"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and _current.get() is not None:
+            context._trace_span = start_span("db.query", {
+                "db.system": conn.dialect.name,
+                "db.statement": statement[:500],
+                "db.executemany": executemany,
+            })
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        s = getattr(context, "_trace_span", None)
+        if s is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                s.set_attribute("db.rowcount", cursor.rowcount)
+            s.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        s = getattr(exception_context.execution_context, "_trace_span", None)
+        if s is not None:
+            s.record_error(exception_context.original_exception)
+            s.end()
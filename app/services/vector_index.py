@@ -0,0 +1,193 @@
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# 特征哈希维度：新词不需要扩表，职位可以增量加入。向量是稀疏存储的，维度只影响 df 数组（4 字节 / 维）
+JOB_VECTOR_DIM = int(os.getenv("JOB_VECTOR_DIM", str(1 << 18)))
+# 其他 worker 新建的职位最多延迟这么久出现在本进程的索引里（按 id 增量加载）
+JOB_INDEX_TTL_SECONDS = int(os.getenv("JOB_INDEX_TTL_SECONDS", "30"))
+# 修改 / 下线的职位靠整体重建发现，在后台线程里做
+JOB_INDEX_REBUILD_SECONDS = int(os.getenv("JOB_INDEX_REBUILD_SECONDS", "600"))
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on",
+    "or", "our", "that", "the", "to", "we", "will", "with", "you", "your", "this", "have", "has",
+}
+
+
+def tokenize(text: str | None) -> list[str]:
+    if not text:
+        return []
+    return [t.rstrip(".") for t in TOKEN_RE.findall(text.lower()) if t.rstrip(".") not in STOPWORDS]
+
+
+def job_text(job) -> str:
+    return " ".join(filter(None, [job.title, job.title, job.skill_tags, job.description]))
+
+
+class JobVectorIndex:
+    """
+    职位描述的 TF-IDF 索引。每个职位存成稀疏向量（哈希桶下标 + log(1+tf)），
+    内存只和非零项个数有关，不再是 职位数 × 维度 的稠密矩阵。
+    IDF 在查询时根据当前文档频率计算，所以增量加入职位后不需要重建。
+    """
+
+    def __init__(self, dim: int = JOB_VECTOR_DIM):
+        self.dim = dim
+        # job_id -> (桶下标 int32, log(1+tf) float16)
+        self.rows: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        self.df = np.zeros(dim, dtype=np.float32)
+        self.max_id = 0
+        self.loaded = False
+        self.refreshed_at = 0.0
+        self.rebuilt_at = 0.0
+        self._rebuilding = False
+        self._lock = threading.Lock()
+        # 查询用的倒排数组，写入后置为 None，下次查询时重算
+        self._packed = None
+
+    def vectorize(self, text: str | None) -> tuple[np.ndarray, np.ndarray]:
+        buckets = np.fromiter((zlib.crc32(t.encode()) % self.dim for t in tokenize(text)), dtype=np.int64)
+        indices, counts = np.unique(buckets, return_counts=True)
+        # log(1+tf) 用 float16 存，精度足够，内存减半
+        return indices.astype(np.int32), np.log1p(counts).astype(np.float16)
+
+    # ------------------------------------------------------------ 写入
+
+    def _add(self, job_id: int, text: str):
+        self._remove(job_id)
+        indices, weights = self.vectorize(text)
+        self.rows[job_id] = (indices, weights)
+        self.df[indices] += 1
+        self.max_id = max(self.max_id, job_id)
+        self._packed = None
+
+    def _remove(self, job_id: int):
+        row = self.rows.pop(job_id, None)
+        if row is not None:
+            self.df[row[0]] -= 1
+            self._packed = None
+
+    def add(self, job_id: int, text: str):
+        with self._lock:
+            self._add(job_id, text)
+
+    def remove(self, job_id: int):
+        with self._lock:
+            self._remove(job_id)
+
+    def _load_rows(self, db: Session, after_id: int = 0):
+        return db.execute(
+            select(models.Job.id, models.Job.title, models.Job.skill_tags, models.Job.description)
+            .where(models.Job.status == "active", models.Job.id > after_id)
+            .order_by(models.Job.id)
+        ).all()
+
+    def build(self, db: Session):
+        """整体重建：在锁外构建新索引，再一次性替换。"""
+        fresh = JobVectorIndex(self.dim)
+        for row in self._load_rows(db):
+            fresh._add(row.id, job_text(row))
+        with self._lock:
+            self.rows, self.df, self.max_id = fresh.rows, fresh.df, fresh.max_id
+            self._packed = None
+            self.loaded = True
+            self.refreshed_at = self.rebuilt_at = time.monotonic()
+
+    def refresh(self, db: Session):
+        """按 id 增量加载其他 worker 新建的职位。"""
+        rows = self._load_rows(db, self.max_id)
+        if rows:
+            with self._lock:
+                for row in rows:
+                    self._add(row.id, job_text(row))
+        self.refreshed_at = time.monotonic()
+
+    def ensure_fresh(self, db: Session):
+        if not self.loaded:
+            with _build_lock:
+                if not self.loaded:
+                    self.build(db)
+            return
+        now = time.monotonic()
+        if now - self.refreshed_at > JOB_INDEX_TTL_SECONDS:
+            self.refresh(db)
+        if now - self.rebuilt_at > JOB_INDEX_REBUILD_SECONDS and not self._rebuilding:
+            self._rebuilding = True
+            threading.Thread(target=self._rebuild_in_background, name="job-index-rebuild", daemon=True).start()
+
+    def _rebuild_in_background(self):
+        db = SessionLocal()
+        try:
+            self.build(db)
+        except Exception as e:
+            logger.warning("job vector index rebuild failed: %s", e)
+        finally:
+            self._rebuilding = False
+            db.close()
+
+    # ------------------------------------------------------------ 查询
+
+    def _pack(self):
+        """
+        把所有职位的非零项按桶排序拼成倒排表（CSC）：offsets[b]:offsets[b+1] 是含第 b 个桶的职位和权重。
+        权重已乘 idf 并按行归一化，查询只需要读查询词所在的桶。
+        """
+        job_ids = list(self.rows)
+        n = len(job_ids)
+        idf = (np.log((1 + n) / (1 + self.df)) + 1).astype(np.float32)
+        indices = np.concatenate([self.rows[j][0] for j in job_ids])
+        lengths = np.fromiter((len(self.rows[j][0]) for j in job_ids), dtype=np.int64, count=n)
+        owners = np.repeat(np.arange(n, dtype=np.int32), lengths)
+        weights = np.concatenate([self.rows[j][1] for j in job_ids]).astype(np.float32) * idf[indices]
+        norms = np.sqrt(np.bincount(owners, weights=weights * weights, minlength=n)).astype(np.float32)
+        weights /= norms[owners] + 1e-9
+        order = np.argsort(indices, kind="stable")
+        offsets = np.zeros(self.dim + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=self.dim), out=offsets[1:])
+        self._packed = (job_ids, owners[order], weights[order], offsets, idf)
+
+    def query(self, text: str, k: int = 10) -> list[tuple[int, float]]:
+        """返回与 text 余弦相似度最高的 k 个 (job_id, score)。"""
+        with self._lock:
+            n = len(self.rows)
+            if n == 0:
+                return []
+            if self._packed is None:
+                self._pack()
+            job_ids, owners, weights, offsets, idf = self._packed
+            q_indices, q_weights = self.vectorize(text)
+            q_weights = q_weights * idf[q_indices]
+            q_norm = np.linalg.norm(q_weights)
+            if q_norm == 0:
+                return []
+            # 只取查询词所在桶的倒排项
+            starts, lengths = offsets[q_indices], offsets[q_indices + 1] - offsets[q_indices]
+            total = int(lengths.sum())
+            if total == 0:
+                return []
+            shift = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+            selected = np.arange(total) + shift
+            contributions = weights[selected] * np.repeat(q_weights / q_norm, lengths)
+            scores = np.bincount(owners[selected], weights=contributions, minlength=n)
+            k = min(k, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(job_ids[i], round(float(scores[i]), 4)) for i in top if scores[i] > 0]
+
+
+_build_lock = threading.Lock()
+job_vector_index = JobVectorIndex()
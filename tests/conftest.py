@@ -0,0 +1,116 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# app.db 在导入时按 DATABASE_URL 建 engine，必须在导入 app 之前设置
+_DB_DIR = tempfile.mkdtemp(prefix="recruitment-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ.setdefault("TRACE_EXPORTER", "none")
+# 测试里按需构建搜索索引，不让启动时的后台预热和测试数据写入赛跑
+os.environ.setdefault("SEARCH_INDEX_WARMUP", "0")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+
+
+@compiles(BigInteger, "sqlite")
+def _bigint_as_integer(type_, compiler, **kw):
+    # SQLite 只有 INTEGER PRIMARY KEY 会自增
+    return "INTEGER"
+
+
+from app import models  # noqa: E402
+from app.db import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import cache, skills  # noqa: E402
+from app.services.admission import assess_admission  # noqa: E402
+from app.services.scheduling import schedule_index  # noqa: E402
+from app.services.search_index import search_index  # noqa: E402
+from app.services.vector_index import job_vector_index  # noqa: E402
+
+
+def _reset_singletons():
+    for entity_cache in (cache.job_cache, cache.company_cache, cache.applicant_cache):
+        entity_cache.backend = cache.LocalLRUBackend(entity_cache.capacity)
+        entity_cache.hits = entity_cache.misses = 0
+    schedule_index.clear()
+    job_vector_index.__init__()
+    search_index.__init__()
+    skills.reset_synonyms()
+    assess_admission.__init__(assess_admission.name, assess_admission.max_concurrency, assess_admission.max_queue,
+                              assess_admission.queue_timeout, assess_admission.per_client_limit)
+
+
+@pytest.fixture(autouse=True)
+def _database():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    _reset_singletons()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def seed(db):
+    """3 家公司、6 个职位、4 个申请人。"""
+    companies = [models.Company(name=name, industry=industry) for name, industry in
+                 [("Xero", "Software"), ("Fonterra", "Dairy"), ("Air New Zealand", "Aviation")]]
+    db.add_all(companies)
+    db.flush()
+    jobs = [
+        models.Job(title="Backend Engineer", role="dev", location="Auckland", company_id=companies[0].id,
+                   company_name="Xero", skill_tags="Python, SQL, Docker",
+                   description="Build Python APIs on PostgreSQL and Docker."),
+        models.Job(title="Frontend Engineer", role="dev", location="Wellington", company_id=companies[0].id,
+                   company_name="Xero", skill_tags="React, TypeScript",
+                   description="Build React user interfaces with TypeScript."),
+        models.Job(title="Data Analyst", role="data", location="Auckland", company_id=companies[1].id,
+                   company_name="Fonterra", skill_tags="SQL, Excel, Power BI",
+                   description="Analyse dairy supply data with SQL and Power BI dashboards."),
+        models.Job(title="Machine Learning Intern", role="data", location="Auckland", company_id=companies[1].id,
+                   company_name="Fonterra", skill_tags="Python, Machine Learning",
+                   description="Train forecasting models in Python with scikit-learn."),
+        models.Job(title="Network Engineer", role="ops", location="Auckland", company_id=companies[2].id,
+                   company_name="Air New Zealand", skill_tags="Networking, Linux",
+                   description="Operate airport networks on Linux."),
+        models.Job(title="Graduate Accountant", role="finance", location="Christchurch", company_id=companies[2].id,
+                   company_name="Air New Zealand", skill_tags=None,
+                   description="Prepare monthly accounts, reconciliations and Xero ledgers. IFRS reporting and budgeting."),
+    ]
+    db.add_all(jobs)
+    applicants = [
+        models.Applicant(name="José Garcia", email="jose.garcia@example.com", desired_role="dev",
+                         desired_location="Auckland", skill_tags="Python, SQL",
+                         university="University of Auckland", major="Computer Science"),
+        models.Applicant(name="Olivia Walker", email="olivia.walker@example.com", desired_role="dev",
+                         desired_location="Wellington", skill_tags="React, JavaScript",
+                         university="Victoria University of Wellington", major="Software Engineering"),
+        models.Applicant(name="Aroha Ngata", email="aroha@example.com", desired_role="data",
+                         desired_location="Auckland", skill_tags="SQL, Excel",
+                         university="University of Otago", major="Statistics"),
+        models.Applicant(name="Priya Singh", email="priya.singh@example.com", desired_role="finance",
+                         desired_location="Christchurch", skill_tags="Accounting",
+                         university="University of Canterbury", major="Finance"),
+    ]
+    db.add_all(applicants)
+    db.commit()
+    return {"companies": companies, "jobs": jobs, "applicants": applicants}
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.services import admission
+from app.services.admission import AdmissionController, client_key
+
+
+def _controller(**overrides):
+    options = dict(max_concurrency=1, max_queue=4, queue_timeout=1.0, per_client_limit=3)
+    options.update(overrides)
+    return AdmissionController("test", **options)
+
+
+def _settle():
+    # 让排队的 acquire 协程跑到 await future
+    return asyncio.sleep(0)
+
+
+def test_waiters_are_served_round_robin_by_client():
+    async def scenario():
+        controller = _controller()
+        order = []
+        await controller.acquire("a")
+
+        async def request(client):
+            await controller.acquire(client)
+            order.append(client)
+            controller.release(client, 0.1)
+
+        tasks = [asyncio.create_task(request(c)) for c in ("a", "a", "b")]
+        await _settle()
+        assert controller.snapshot()["queue_depth"] == 3
+
+        controller.release("a", 0.1)
+        await asyncio.gather(*tasks)
+        return controller, order
+
+    controller, order = asyncio.run(scenario())
+    assert order == ["a", "b", "a"]
+    snapshot = controller.snapshot()
+    assert (snapshot["in_flight"], snapshot["queue_depth"], snapshot["admitted"]) == (0, 0, 4)
+    assert controller._client_load == {}
+
+
+def test_per_client_limit_and_full_queue_return_429():
+    async def scenario():
+        controller = _controller(max_queue=1, per_client_limit=1)
+        await controller.acquire("a")
+        with pytest.raises(HTTPException) as per_client:
+            await controller.acquire("a")
+
+        waiter = asyncio.create_task(controller.acquire("b"))
+        await _settle()
+        with pytest.raises(HTTPException) as queue_full:
+            await controller.acquire("c")
+
+        controller.release("a", 2.0)
+        await waiter
+        return controller, per_client.value, queue_full.value
+
+    controller, per_client, queue_full = asyncio.run(scenario())
+    assert per_client.status_code == queue_full.status_code == 429
+    assert 1 <= int(queue_full.headers["Retry-After"]) <= 120
+    assert (controller.rejected_client_limit, controller.rejected_queue_full) == (1, 1)
+
+
+def test_queue_timeout_and_cancel_leave_no_state():
+    async def scenario():
+        controller = _controller(queue_timeout=0.05)
+        await controller.acquire("a")
+        with pytest.raises(HTTPException) as timed_out:
+            await controller.acquire("b")
+
+        cancelled = asyncio.create_task(controller.acquire("c"))
+        await _settle()
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        controller.release("a", 0.1)
+        return controller, timed_out.value
+
+    controller, timed_out = asyncio.run(scenario())
+    assert timed_out.status_code == 429
+    assert controller.timed_out == 1
+    assert (controller.in_flight, controller.queued) == (0, 0)
+    assert controller._client_load == {} and controller._waiters == {}
+
+
+def test_admission_metrics_endpoint(client):
+    body = client.get("/metrics/admission").json()
+    assert body["routes"][0]["name"] == "assessment"
+    assert {"in_flight", "queue_depth", "admitted", "avg_wait_ms"} <= set(body["routes"][0])
+
+
+def _request(peer, forwarded=None, client_id=None):
+    headers = []
+    if forwarded:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    if client_id:
+        headers.append((b"x-client-id", client_id.encode()))
+    return Request({"type": "http", "headers": headers, "client": (peer, 50000)})
+
+
+def test_client_key_only_trusts_forwarded_for_from_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(admission, "TRUSTED_PROXIES", admission._parse_networks("127.0.0.1, 10.0.0.0/8"))
+    # 直连的客户端自己填的请求头一律忽略
+    assert client_key(_request("203.0.113.9", forwarded="198.51.100.1", client_id="fresh")) == "203.0.113.9"
+    # 经过代理：取代理追加的最后一跳，客户端伪造的更左边的地址不算
+    assert client_key(_request("127.0.0.1", forwarded="1.2.3.4, 203.0.113.9")) == "203.0.113.9"
+    assert client_key(_request("127.0.0.1", forwarded="203.0.113.9, 10.1.2.3")) == "203.0.113.9"
+    assert client_key(_request("127.0.0.1")) == "127.0.0.1"
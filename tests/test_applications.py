@@ -0,0 +1,43 @@
+from app import models
+
+
+def test_create_application_links_company_and_latest_assessment(client, db, seed):
+    applicant, job = seed["applicants"][0], seed["jobs"][0]
+    db.add(models.JobAssessmentLatest(applicant_id=applicant.id, job_id=job.id, job_assessment_id=77, version="v1"))
+    db.commit()
+
+    resp = client.post("/applications", json={"applicant_id": applicant.id, "job_id": job.id})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["company_id"] == job.company_id
+    assert body["job_assessment_id"] == 77
+    assert body["status"] == "pending"
+
+
+def test_duplicate_application_is_rejected(client, seed):
+    payload = {"applicant_id": seed["applicants"][0].id, "job_id": seed["jobs"][0].id}
+    assert client.post("/applications", json=payload).status_code == 200
+    resp = client.post("/applications", json=payload)
+    assert resp.status_code == 400
+    assert "already applied" in resp.json()["detail"]
+
+
+def test_application_for_unknown_job_is_404(client, seed):
+    resp = client.post("/applications", json={"applicant_id": seed["applicants"][0].id, "job_id": 424242})
+    assert resp.status_code == 404
+
+
+def test_bulk_apply_skips_existing_and_reports_missing(client, db, seed):
+    applicant = seed["applicants"][1]
+    job_ids = [j.id for j in seed["jobs"][:3]]
+    client.post("/applications", json={"applicant_id": applicant.id, "job_id": job_ids[1]})
+
+    resp = client.post("/applications/bulk", json={
+        "applicant_id": applicant.id, "job_ids": [job_ids[0], job_ids[1], 424242, job_ids[2], job_ids[0]],
+    })
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [a["job_id"] for a in body["created"]] == [job_ids[0], job_ids[2]]
+    assert body["already_applied"] == [job_ids[1]]
+    assert body["missing_job_ids"] == [424242]
+    assert db.query(models.Application).filter_by(applicant_id=applicant.id).count() == 3
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from app import models
+from app.services import assessment_stream
+from app.services.admission import AdmittedStreamingResponse, assess_admission
+from app.services.json_stream import IncrementalJSONParser
+
+MODEL_OUTPUT = (
+    '```json\n{"summary": "Solid backend fit", "score": {"overall": 82, "skills_match": 90}, '
+    '"assessment_highlights": ["Python APIs", "Docker in production"], '
+    '"recommendations_for_candidate": ["Mention \\"SQL\\" tuning"]}\n```'
+)
+
+
+def _chunks(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_parser_emits_fields_and_items_as_they_complete():
+    parser = IncrementalJSONParser()
+    events = []
+    for chunk in _chunks(MODEL_OUTPUT):
+        events += parser.feed(chunk)
+        if parser.complete:
+            break
+
+    assert events[0] == ("field", "summary", "Solid backend fit")
+    assert ("item", "assessment_highlights", 1, "Docker in production") in events
+    assert events.index(("item", "assessment_highlights", 0, "Python APIs")) < events.index(
+        ("field", "assessment_highlights", ["Python APIs", "Docker in production"]))
+    assert parser.result()["recommendations_for_candidate"] == ['Mention "SQL" tuning']
+    assert parser.feed("trailing") == []
+
+
+def test_parser_rejects_incomplete_object():
+    parser = IncrementalJSONParser()
+    parser.feed('{"summary": "cut o')
+    assert not parser.complete
+    with pytest.raises(ValueError):
+        parser.result()
+
+
+def test_stream_endpoint_pushes_events_and_releases_slot(client, db, seed, monkeypatch):
+    def fake_stream(jd_text, resume_text):
+        yield from _chunks(MODEL_OUTPUT)
+
+    monkeypatch.setattr(assessment_stream, "stream_assessment", fake_stream)
+    job, jose = seed["jobs"][0], seed["applicants"][0]
+
+    resp = client.post(f"/jobs/{job.id}/assess/stream", params={"force_llm": True, "applicant_id": jose.id},
+                       files={"file": ("cv.txt", b"Python, SQL and Docker engineer", "text/plain")})
+    assert resp.status_code == 200
+    events = _events(resp.text)
+    names = [name for name, _ in events]
+    assert names == ["prescore", "summary", "score", "highlight", "highlight", "recommendation", "done"]
+    assert events[3][1] == {"index": 0, "text": "Python APIs"}
+
+    done = events[-1][1]
+    assert done["provisional"] is False and done["data"]["score"]["overall"] == 82
+    assert db.get(models.JobAssessment, done["assessment_id"]).applicant_id == jose.id
+    assert (assess_admission.in_flight, assess_admission.completed) == (0, 1)
+
+
+def test_slot_released_when_client_leaves_before_streaming():
+    started = []
+
+    async def events():
+        started.append(True)
+        yield "event: prescore\n\n"
+
+    async def send(message):
+        raise OSError("connection reset")
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def scenario():
+        await assess_admission.acquire("client-a")
+        response = AdmittedStreamingResponse(events(), assess_admission, "client-a", media_type="text/event-stream")
+        with pytest.raises(ClientDisconnect):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+
+    asyncio.run(scenario())
+    assert started == []
+    assert assess_admission.in_flight == 0 and assess_admission._client_load == {}
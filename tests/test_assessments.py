@@ -0,0 +1,87 @@
+import datetime
+
+from sqlalchemy import select
+
+from app import models
+from app.services.assessments import _point_latest, backfill_latest, compact, record_assessment
+
+
+def _result(overall):
+    return {"summary": f"overall {overall}", "score": {"overall": overall}, "assessment_highlights": [],
+            "recommendations_for_candidate": []}
+
+
+def _pointer(db, applicant_id=1, job_id=1):
+    db.expire_all()
+    return db.get(models.JobAssessmentLatest, (applicant_id, job_id))
+
+
+def test_stale_writer_does_not_move_pointer_back(db):
+    older = record_assessment(db, 1, 1, _result(40))
+    newer = record_assessment(db, 1, 1, _result(80))
+    assert _pointer(db).job_assessment_id == newer.id
+
+    # 先写入 older 的请求最后才更新指针
+    _point_latest(db, 1, 1, older.id, older.version)
+    db.commit()
+    assert _pointer(db).job_assessment_id == newer.id
+
+
+def test_pointer_created_concurrently_is_updated_conditionally(db):
+    db.add(models.JobAssessmentLatest(applicant_id=1, job_id=1, job_assessment_id=5, version="20300101000000"))
+    db.commit()
+
+    _point_latest(db, 1, 1, 3, "20300101000001")
+    db.commit()
+    assert _pointer(db).job_assessment_id == 5
+
+    _point_latest(db, 1, 1, 9, "20300101000002-provisional")
+    db.commit()
+    assert _pointer(db).job_assessment_id == 5
+
+    _point_latest(db, 1, 1, 9, "20300101000002")
+    db.commit()
+    assert (_pointer(db).job_assessment_id, _pointer(db).version) == (9, "20300101000002")
+
+
+def test_latest_endpoint(client, db):
+    record_assessment(db, 2, 3, _result(40))
+    record_assessment(db, 2, 3, _result(75))
+    body = client.get("/job-assessments/latest", params={"applicant_id": 2, "job_id": 3}).json()
+    assert body["summary"] == "overall 75" and body["provisional"] is False
+    assert client.get("/job-assessments/latest", params={"applicant_id": 2, "job_id": 4}).status_code == 404
+
+
+def test_compact_keeps_latest_and_referenced_versions(db, seed):
+    jose, job = seed["applicants"][0], seed["jobs"][0]
+    rows = [record_assessment(db, jose.id, job.id, _result(score)).id for score in range(10, 70, 10)]
+    old = datetime.datetime.utcnow() - datetime.timedelta(days=60)
+    db.query(models.JobAssessment).update({models.JobAssessment.created_at: old})
+    db.add(models.Application(applicant_id=jose.id, job_id=job.id, company_id=job.company_id,
+                              job_assessment_id=rows[0]))
+    db.commit()
+
+    assert compact(db, keep_versions=2, retention_days=30)["removed"] == 3
+    remaining = set(db.execute(select(models.JobAssessment.id)).scalars())
+    assert remaining == {rows[0], rows[4], rows[5]}
+    archived = set(db.execute(select(models.JobAssessmentArchive.id)).scalars())
+    assert archived == {rows[1], rows[2], rows[3]}
+    assert _pointer(db, jose.id, job.id).job_assessment_id == rows[5]
+
+
+def test_backfill_prefers_the_newest_llm_assessment(db):
+    llm = models.JobAssessment(applicant_id=1, job_id=1, version="20300101000000", data_json=_result(70))
+    newer_llm = models.JobAssessment(applicant_id=1, job_id=1, version="20300102000000", data_json=_result(75))
+    provisional = models.JobAssessment(applicant_id=1, job_id=1, version="20300103000000-provisional",
+                                       data_json={**_result(30), "provisional": True})
+    only_provisional = [
+        models.JobAssessment(applicant_id=2, job_id=1, version=f"2030010{day}000000-provisional",
+                             data_json={**_result(20), "provisional": True})
+        for day in (1, 2)
+    ]
+    db.add_all([llm, newer_llm, provisional, *only_provisional])
+    db.commit()
+
+    assert backfill_latest(db) == 2
+    assert (_pointer(db).job_assessment_id, _pointer(db).version) == (newer_llm.id, "20300102000000")
+    assert _pointer(db, applicant_id=2).job_assessment_id == only_provisional[1].id
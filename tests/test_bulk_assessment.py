@@ -0,0 +1,161 @@
+import asyncio
+import datetime
+
+from sqlalchemy.exc import OperationalError
+
+from app import models
+from app.services import bulk_assessment
+from app.services.admission import assess_admission
+
+LLM_RESULT = {"summary": "LLM", "score": {"overall": 80}, "assessment_highlights": [], "recommendations_for_candidate": []}
+
+
+def _job(seed):
+    job = seed["jobs"][0]
+    return {"id": job.id, "description": job.description, "skill_tags": job.skill_tags}
+
+
+def _applications(db, seed):
+    job = seed["jobs"][0]
+    apps = []
+    for applicant in seed["applicants"][:3]:
+        apps.append(models.Application(applicant_id=applicant.id, job_id=job.id, company_id=job.company_id))
+        db.add(models.ApplicantResume(applicant_id=applicant.id, file_name="cv.txt",
+                                      resume_text=f"{applicant.name}: Python, SQL and Docker"))
+    db.add_all(apps)
+    db.commit()
+    return apps
+
+
+def _run(db, run_id):
+    db.expire_all()
+    return db.get(models.BulkAssessmentRun, run_id)
+
+
+def test_resume_recomputes_counters(db, seed):
+    job = seed["jobs"][0]
+    apps = _applications(db, seed)
+    started = datetime.datetime(2030, 1, 1)
+    run = models.BulkAssessmentRun(job_id=job.id, status="failed", total=3, done=7, failed=4, started_at=started)
+    db.add(run)
+    assessment = models.JobAssessment(applicant_id=apps[0].applicant_id, job_id=job.id, version="20300101000100",
+                                      data_json=LLM_RESULT, created_at=started + datetime.timedelta(minutes=1))
+    db.add(assessment)
+    db.flush()
+    db.add(models.JobAssessmentLatest(applicant_id=apps[0].applicant_id, job_id=job.id,
+                                      job_assessment_id=assessment.id, version=assessment.version))
+    # apps[1] 在 run 之前有 LLM 评估（latest 指向它），run 里只拿到预评分，指针不动，但也算已经评估过
+    older = models.JobAssessment(applicant_id=apps[1].applicant_id, job_id=job.id, version="20291201000000",
+                                 data_json=LLM_RESULT, created_at=started - datetime.timedelta(days=30))
+    provisional = models.JobAssessment(applicant_id=apps[1].applicant_id, job_id=job.id,
+                                       version="20300101000200-provisional", data_json={"provisional": True},
+                                       created_at=started + datetime.timedelta(minutes=2))
+    db.add_all([older, provisional])
+    db.flush()
+    db.add(models.JobAssessmentLatest(applicant_id=apps[1].applicant_id, job_id=job.id,
+                                      job_assessment_id=older.id, version=older.version))
+    db.commit()
+
+    run_id, todo, no_resume = bulk_assessment._prepare_run(job.id, run.id)
+    assert [applicant_id for _, applicant_id, _ in todo] == [apps[2].applicant_id]
+    assert no_resume == []
+    run = _run(db, run_id)
+    assert (run.status, run.total, run.done, run.failed) == ("running", 3, 2, 0)
+
+
+def test_admission_slot_is_taken_only_for_llm_calls(seed, monkeypatch):
+    seen = []
+
+    def fake_llm(jd_text, resume_text):
+        seen.append(assess_admission.in_flight)
+        return LLM_RESULT
+
+    monkeypatch.setattr(bulk_assessment, "request_assessment", fake_llm)
+    job = _job(seed)
+
+    data, provisional = asyncio.run(bulk_assessment._evaluate(job, "Barista", False, "client-a"))
+    assert provisional is True and data["provisional"] is True
+    assert seen == [] and assess_admission.admitted == 0
+
+    data, provisional = asyncio.run(bulk_assessment._evaluate(job, "Barista", True, "client-a"))
+    assert (data, provisional) == (LLM_RESULT, False)
+    assert seen == [1]
+    assert (assess_admission.admitted, assess_admission.in_flight) == (1, 0)
+
+
+def test_save_error_counts_as_failure(db, seed, monkeypatch):
+    apps = _applications(db, seed)
+    run_id, _, _ = bulk_assessment._prepare_run(seed["jobs"][0].id, None)
+
+    def broken(*args, **kwargs):
+        raise OperationalError("INSERT INTO job_assessment", {}, Exception("lost connection"))
+
+    monkeypatch.setattr(bulk_assessment, "record_assessment", broken)
+    error = asyncio.run(bulk_assessment._save(run_id, seed["jobs"][0].id, apps[0].id, apps[0].applicant_id, LLM_RESULT))
+    assert "lost connection" in error
+    run = _run(db, run_id)
+    assert (run.done, run.failed) == (0, 1)
+
+
+def test_fail_run_only_touches_running_runs(db, seed):
+    running = models.BulkAssessmentRun(job_id=seed["jobs"][0].id, status="running")
+    completed = models.BulkAssessmentRun(job_id=seed["jobs"][0].id, status="completed")
+    db.add_all([running, completed])
+    db.commit()
+
+    bulk_assessment._fail_run(running.id)
+    bulk_assessment._fail_run(completed.id)
+    assert _run(db, running.id).status == "failed"
+    assert _run(db, running.id).finished_at is not None
+    assert _run(db, completed.id).status == "completed"
+
+
+def _sse(body: str) -> list[tuple[str, dict]]:
+    import json
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_assess_all_end_to_end(client, db, seed, monkeypatch):
+    apps = _applications(db, seed)
+    job = seed["jobs"][0]
+    priya = seed["applicants"][3]
+    db.add(models.Application(applicant_id=priya.id, job_id=job.id, company_id=job.company_id))
+    db.commit()
+
+    def fake_llm(jd_text, resume_text):
+        if resume_text.startswith("Aroha"):
+            raise RuntimeError("model timed out")
+        return {**LLM_RESULT, "summary": resume_text.split(":")[0]}
+
+    monkeypatch.setattr(bulk_assessment, "request_assessment", fake_llm)
+    resp = client.post(f"/jobs/{job.id}/assess-all", params={"force_llm": True, "concurrency": 4})
+    assert resp.status_code == 200
+    events = _sse(resp.text)
+
+    start = events[0][1]
+    assert events[0][0] == "start" and start["pending"] == 3 and start["skipped_no_resume"] == [priya.id]
+    # 请求的 4 被单客户端配额截到 2
+    assert start["concurrency"] == assess_admission.per_client_limit == 2
+    results = [data for name, data in events if name == "result"]
+    errors = [data for name, data in events if name == "error"]
+    assert sorted(r["data"]["summary"] for r in results) == ["José Garcia", "Olivia Walker"]
+    assert errors == [{"applicant_id": seed["applicants"][2].id, "error": "model timed out"}]
+    assert events[-1] == ("done", {"run_id": start["run_id"], "total": 4, "done": 2, "failed": 1})
+
+    run = _run(db, start["run_id"])
+    assert run.status == "completed"
+    assessed = {a.applicant_id: a.job_assessment_id for a in db.query(models.Application).filter_by(job_id=job.id)}
+    assert assessed[apps[0].applicant_id] and assessed[apps[1].applicant_id] and not assessed[apps[2].applicant_id]
+    assert (assess_admission.admitted, assess_admission.in_flight) == (3, 0)
+
+    # 续跑只重新评估失败的那个
+    monkeypatch.setattr(bulk_assessment, "request_assessment", lambda jd, resume: LLM_RESULT)
+    events = _sse(client.post(f"/jobs/{job.id}/assess-all",
+                              params={"force_llm": True, "run_id": start["run_id"]}).text)
+    assert events[0][1]["pending"] == 1
+    assert events[-1][1] == {"run_id": start["run_id"], "total": 4, "done": 3, "failed": 0}
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from app import models
+from app.services.cache import LocalLRUBackend, job_cache
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LocalLRUBackend(capacity=2)
+    lru.set("a", 1, ttl=60)
+    lru.set("b", 2, ttl=60)
+    assert lru.get("a") == 1  # a 变成最近使用
+    lru.set("c", 3, ttl=60)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1 and lru.get("c") == 3
+    assert len(lru) == 2
+
+
+def test_lru_entries_expire(monkeypatch):
+    lru = LocalLRUBackend(capacity=4)
+    lru.set("a", 1, ttl=10)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert lru.get("a") is None
+    assert len(lru) == 0
+
+
+def test_entity_cache_reads_through_and_counts_hits(db, seed):
+    job_id = seed["jobs"][0].id
+    assert job_cache.get(db, job_id)["title"] == "Backend Engineer"
+    assert job_cache.get(db, job_id)["title"] == "Backend Engineer"
+    assert (job_cache.hits, job_cache.misses) == (1, 1)
+    assert job_cache.get(db, 424242) is None
+
+
+def test_create_job_writes_through_cache(client, seed):
+    resp = client.post("/jobs", json={
+        "title": "Site Reliability Engineer", "role": "ops", "company_id": seed["companies"][0].id,
+        "company_name": "Xero", "skill_tags": "Linux, Kubernetes", "description": "Run Kubernetes clusters.",
+    })
+    assert resp.status_code == 200
+    job_id = resp.json()["id"]
+    assert client.get(f"/jobs/{job_id}").json()["title"] == "Site Reliability Engineer"
+    stats = {c["name"]: c for c in client.get("/metrics/cache").json()["caches"]}
+    assert stats["job"]["hits"] == 1 and stats["job"]["misses"] == 0
+
+
+def test_get_unknown_company_is_404(client):
+    assert client.get("/companies/424242").status_code == 404
+
+
+def test_committed_updates_and_deletes_invalidate_cached_entities(client, db, seed):
+    applicant_id = seed["applicants"][2].id
+    company_id = seed["companies"][2].id
+    assert client.get(f"/applicants/{applicant_id}").json()["major"] == "Statistics"
+    assert client.get(f"/companies/{company_id}").status_code == 200
+
+    applicant = db.get(models.Applicant, applicant_id)
+    applicant.major = "Data Science"
+    db.flush()
+    db.rollback()
+    assert client.get(f"/applicants/{applicant_id}").json()["major"] == "Statistics"
+
+    applicant = db.get(models.Applicant, applicant_id)
+    applicant.major = "Data Science"
+    db.commit()
+    assert client.get(f"/applicants/{applicant_id}").json()["major"] == "Data Science"
+
+    for job in db.query(models.Job).filter(models.Job.company_id == company_id):
+        db.delete(job)
+    db.delete(db.get(models.Company, company_id))
+    db.commit()
+    assert client.get(f"/companies/{company_id}").status_code == 404
+
+
+def test_hit_and_miss_counters_are_thread_safe(db, seed):
+    job_id = seed["jobs"][0].id
+    job_cache.get(db, job_id)
+
+    def read():
+        for _ in range(2000):
+            job_cache.get(None, job_id)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert job_cache.stats()["hits"] == 16000 and job_cache.stats()["misses"] == 1
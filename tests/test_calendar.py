@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from app import models
+from app.services.calendar import _fold
+
+
+def _add_interviews(db, seed, count=3):
+    for k in range(count):
+        db.add(models.Interview(
+            application_id=k + 1, job_id=seed["jobs"][0].id, applicant_id=seed["applicants"][k].id,
+            company_id=seed["companies"][0].id, interviewer_id=7,
+            scheduled_time=datetime(2026, 11, 2 + k, 10), duration_minutes=45, type="Online",
+            location_url="https://meet.example.com/a,b", notes="Bring portfolio; arrive early",
+        ))
+    db.commit()
+
+
+def test_fold_wraps_long_lines():
+    folded = _fold("DESCRIPTION:" + "x" * 200)
+    assert all(len(line) <= 75 for line in folded.split("\r\n"))
+    assert folded.replace("\r\n ", "").rstrip("\r\n") == "DESCRIPTION:" + "x" * 200
+
+
+def test_time_range_query_orders_by_scheduled_time(client, db, seed):
+    _add_interviews(db, seed)
+    resp = client.get("/interviews", params={"interviewer_id": 7, "from": "2026-11-03T00:00:00",
+                                             "to": "2026-11-05T00:00:00"})
+    assert [i["scheduled_time"][:10] for i in resp.json()] == ["2026-11-03", "2026-11-04"]
+
+
+def test_calendar_feed_renders_events(client, db, seed):
+    _add_interviews(db, seed, count=2)
+    resp = client.get("/interviews/calendar.ics", params={"company_id": seed["companies"][0].id})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/calendar")
+    body = resp.text
+    assert body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n")
+    assert body.count("BEGIN:VEVENT") == 2
+    assert "DTSTART:20261102T100000\r\nDTEND:20261102T104500" in body
+    assert r"LOCATION:https://meet.example.com/a\,b" in body
+    assert r"DESCRIPTION:Bring portfolio\; arrive early" in body
+
+
+def test_calendar_feed_conditional_requests(client, db, seed):
+    _add_interviews(db, seed, count=1)
+    params = {"interviewer_id": 7}
+    first = client.get("/interviews/calendar.ics", params=params)
+    etag = first.headers["etag"]
+    assert client.get("/interviews/calendar.ics", params=params, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/interviews/calendar.ics", params=params,
+                      headers={"If-Modified-Since": first.headers["last-modified"]}).status_code == 304
+
+    _add_interviews(db, seed, count=1)
+    changed = client.get("/interviews/calendar.ics", params=params, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_calendar_feed_requires_exactly_one_owner(client):
+    assert client.get("/interviews/calendar.ics").status_code == 400
+    assert client.get("/interviews/calendar.ics", params={"company_id": 1, "interviewer_id": 2}).status_code == 400
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import text
+
+from app.services import deadline
+from app.services.deadline import QueryCancelled, QueryDeadlineExceeded, QueryScope
+
+# 足够慢的 SQLite 查询，progress handler 会在它执行中途检查截止时间
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 50000000) SELECT count(*) FROM n"
+)
+
+
+@pytest.fixture
+def scope():
+    def enter(seconds):
+        current = QueryScope("/test", seconds)
+        tokens.append(deadline._current_scope.set(current))
+        return current
+
+    tokens = []
+    yield enter
+    for token in reversed(tokens):
+        deadline._current_scope.reset(token)
+
+
+def test_running_statement_is_interrupted_at_deadline(db, scope):
+    scope(0.05)
+    with pytest.raises(QueryDeadlineExceeded) as exc:
+        db.execute(SLOW_QUERY)
+    assert exc.value.seconds == 0.05
+    assert deadline.query_stats.snapshot()["timeouts"]["/test"] >= 1
+
+
+def test_expired_scope_rejects_new_statements(db, scope):
+    current = scope(5)
+    current.cancelled = True
+    with pytest.raises(QueryCancelled):
+        db.execute(text("SELECT 1"))
+
+
+def test_statements_without_scope_run_normally(db, scope):
+    scope(5)
+    assert db.execute(text("SELECT 1")).scalar() == 1
+    deadline._current_scope.set(None)
+    assert db.execute(text("SELECT 2")).scalar() == 2
+
+
+def test_route_returns_504_when_deadline_passes(client, seed, monkeypatch):
+    monkeypatch.setattr(QueryScope, "expired", lambda self: True)
+    resp = client.get("/jobs")
+    assert resp.status_code == 504
+    assert resp.json()["timeout_seconds"] == deadline.SEARCH_QUERY_TIMEOUT
+    assert client.get("/metrics/queries").json()["timeouts"]["/jobs"] >= 1
@@ -0,0 +1,78 @@
+import io
+import os
+import stat
+
+import pytest
+
+from app.services.extractors import (
+    ExtractionFailed, ExtractorUnavailable, UnsupportedFormat, extract_text, find_extractor,
+)
+
+FAKE_ANTIWORD = """#!/bin/sh
+# 像 antiword 一样：认得的文件输出正文，否则写 stderr 并返回非 0
+last=""
+for arg in "$@"; do last="$arg"; done
+if grep -q WORDDOC "$last"; then
+  echo "Jane Doe - Python developer"
+else
+  echo "$last is not a Word Document." >&2
+  exit 1
+fi
+"""
+
+
+@pytest.fixture
+def antiword(tmp_path, monkeypatch):
+    tool = tmp_path / "antiword"
+    tool.write_text(FAKE_ANTIWORD)
+    tool.chmod(tool.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}/usr/bin:/bin")
+    return tool
+
+
+def test_lookup_prefers_extension_then_mime():
+    assert find_extractor("CV.PDF", "application/octet-stream").name == "pdf"
+    assert find_extractor("resume", "text/rtf; charset=utf-8").name == "rtf"
+    assert find_extractor("resume.xyz", None) is None
+    with pytest.raises(UnsupportedFormat):
+        extract_text(io.BytesIO(b""), "resume.xyz")
+
+
+def test_text_and_rtf():
+    assert extract_text(io.BytesIO("Kia ora, I'm Aroha".encode()), "cv.txt") == "Kia ora, I'm Aroha"
+    rtf = rb"{\rtf1\ansi{\fonttbl{\f0 Arial;}}\f0 Python\par SQL\tab Docker}"
+    assert extract_text(io.BytesIO(rtf), "cv.rtf").split() == ["Python", "SQL", "Docker"]
+
+
+def test_doc_uses_command_line_tool(antiword):
+    assert extract_text(io.BytesIO(b"WORDDOC binary"), "cv.doc").strip() == "Jane Doe - Python developer"
+
+
+def test_corrupt_doc_raises_extraction_failed(antiword):
+    with pytest.raises(ExtractionFailed, match="not a Word Document"):
+        extract_text(io.BytesIO(b"garbage"), "cv.doc")
+
+
+def test_doc_without_tools_is_unavailable(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    with pytest.raises(ExtractorUnavailable):
+        extract_text(io.BytesIO(b"WORDDOC"), "cv.doc")
+
+
+def test_corrupt_docx_raises_extraction_failed():
+    with pytest.raises(ExtractionFailed, match="docx"):
+        extract_text(io.BytesIO(b"not a zip"), "cv.docx")
+
+
+def test_assess_maps_extraction_errors(client, seed, antiword, monkeypatch):
+    job = seed["jobs"][0]
+    resp = client.post(f"/jobs/{job.id}/assess", files={"file": ("cv.doc", b"garbage", "application/msword")})
+    assert resp.status_code == 422
+    assert "not a Word Document" in resp.json()["detail"]
+
+    resp = client.post(f"/jobs/{job.id}/assess", files={"file": ("cv.odt", b"...", "application/octet-stream")})
+    assert resp.status_code == 400 and resp.json()["detail"] == "Unsupported file format: cv.odt"
+
+    monkeypatch.setenv("PATH", "/nonexistent")
+    resp = client.post(f"/jobs/{job.id}/assess", files={"file": ("cv.doc", b"WORDDOC", "application/msword")})
+    assert resp.status_code == 501
@@ -0,0 +1,38 @@
+from app import models
+from app.services import multiget
+from app.services.multiget import fetch_by_ids
+
+
+def test_fetch_by_ids_keeps_request_order_and_reports_missing(seed):
+    ids = [a.id for a in seed["applicants"]]
+    items, missing = fetch_by_ids(models.Applicant, [ids[2], 999, ids[0], ids[2]])
+    assert [a.id for a in items] == [ids[2], ids[0]]
+    assert missing == [999]
+
+
+def test_fetch_by_ids_splits_into_parallel_chunks(seed, monkeypatch):
+    ids = [j.id for j in seed["jobs"]]
+    calls = []
+    original = multiget._fetch_chunk
+    monkeypatch.setattr(multiget, "_fetch_chunk", lambda model, chunk: calls.append(chunk) or original(model, chunk))
+
+    items, missing = fetch_by_ids(models.Job, list(reversed(ids)), chunk_size=2)
+    assert [j.id for j in items] == list(reversed(ids))
+    assert missing == []
+    assert sorted(len(c) for c in calls) == [2, 2, 2]
+
+
+def test_multi_get_endpoints(client, seed):
+    company_ids = [c.id for c in seed["companies"]]
+    resp = client.post("/companies/by_ids", json={"ids": [company_ids[1], 424242]})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [c["name"] for c in body["items"]] == ["Fonterra"]
+    assert body["missing_ids"] == [424242]
+
+    resp = client.post("/jobs/by_ids", json={"ids": [seed["jobs"][0].id]})
+    assert [j["title"] for j in resp.json()["items"]] == ["Backend Engineer"]
+
+
+def test_multi_get_rejects_empty_id_list(client):
+    assert client.post("/applicants/by_ids", json={"ids": []}).status_code == 422
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app import models
+from app.db import engine
+from app.services.assessments import record_assessment
+
+SCORE = {"overall": 72, "skills_match": 80, "experience_depth": 60, "education_match": 70, "potential_fit": 75}
+
+
+def _apply(client, applicant_id, job_ids):
+    client.post("/applications/bulk", json={"applicant_id": applicant_id, "job_ids": job_ids})
+
+
+def test_overview_returns_every_section(client, db, seed):
+    applicant = seed["applicants"][0]
+    jobs = seed["jobs"][:3]
+    record_assessment(db, applicant.id, jobs[0].id, {"summary": "Strong backend fit", "score": SCORE,
+                                                     "assessment_highlights": [], "recommendations_for_candidate": []})
+    _apply(client, applicant.id, [j.id for j in jobs])
+
+    body = client.get(f"/applicants/{applicant.id}/overview").json()
+    assert body["applicant"]["name"] == "José Garcia"
+    assert {a["job_id"] for a in body["applications"]} == {j.id for j in jobs}
+    assert {j["title"] for j in body["jobs"]} == {"Backend Engineer", "Frontend Engineer", "Data Analyst"}
+    assert {c["name"] for c in body["companies"]} == {"Xero", "Fonterra"}
+    assert [(a["jobId"], a["summary"]) for a in body["assessments"]] == [(jobs[0].id, "Strong backend fit")]
+    assert body["interviews"] == []
+
+
+def test_overview_query_count_does_not_grow_with_applications(client, seed):
+    applicant = seed["applicants"][1]
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    url = f"/applicants/{applicant.id}/overview"
+    client.get(url)  # applicant 进缓存
+    _apply(client, applicant.id, [seed["jobs"][0].id])
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        client.get(url)
+        few = len(statements)
+        _apply(client, applicant.id, [j.id for j in seed["jobs"]])
+        statements.clear()
+        client.get(url)
+        assert len(statements) == few
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+def test_overview_sections_limit_the_response(client, seed):
+    applicant = seed["applicants"][0]
+    _apply(client, applicant.id, [seed["jobs"][0].id])
+    body = client.get(f"/applicants/{applicant.id}/overview", params={"sections": "jobs"}).json()
+    assert set(body) == {"applicant", "jobs"}
+    assert client.get(f"/applicants/{applicant.id}/overview", params={"sections": "salary"}).status_code == 400
+
+
+def test_overview_field_selector(client, db, seed):
+    applicant = seed["applicants"][0]
+    _apply(client, applicant.id, [seed["jobs"][0].id, seed["jobs"][2].id])
+    db.add(models.Interview(application_id=1, job_id=seed["jobs"][0].id, applicant_id=applicant.id,
+                            company_id=seed["companies"][0].id, scheduled_time=datetime(2026, 11, 2, 10),
+                            type="Online"))
+    db.commit()
+
+    resp = client.get(f"/applicants/{applicant.id}/overview",
+                      params={"fields": "applicant.name,jobs.title,interviews.scheduled_time"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert set(body) == {"applicant", "jobs", "interviews"}
+    assert body["applicant"] == {"id": applicant.id, "name": "José Garcia"}
+    assert sorted(body["jobs"], key=lambda j: j["id"]) == [
+        {"id": seed["jobs"][0].id, "title": "Backend Engineer"},
+        {"id": seed["jobs"][2].id, "title": "Data Analyst"},
+    ]
+    assert body["interviews"][0]["scheduled_time"].startswith("2026-11-02T10:00")
+    assert set(body["interviews"][0]) == {"id", "scheduled_time"}
+
+
+def test_overview_field_selector_rejects_unknown_fields(client, seed):
+    resp = client.get(f"/applicants/{seed['applicants'][0].id}/overview", params={"fields": "jobs.salary_band,foo"})
+    assert resp.status_code == 400
+    assert "jobs.salary_band" in resp.json()["detail"] and "foo" in resp.json()["detail"]
@@ -0,0 +1,97 @@
+from app import models
+from app.services import prescore
+from app.services.assessments import build_assessment_result, latest_assessment_query, record_assessment
+
+BACKEND = {"id": 1, "skill_tags": "Python, SQL, Docker", "description": "Build Python APIs on PostgreSQL and Docker."}
+UNTAGGED = {"id": 2, "skill_tags": None,
+            "description": "We use Python and React daily. Python services run on Kubernetes; React dashboards on AWS."}
+NO_SKILLS = {"id": 3, "skill_tags": None,
+             "description": "Prepare monthly accounts, reconciliations and ledgers. IFRS reporting and budgeting."}
+
+LLM_RESULT = {
+    "summary": "Solid match",
+    "score": {"overall": 81, "skills_match": 85, "experience_depth": 70, "education_match": 75, "potential_fit": 80},
+    "assessment_highlights": ["Python APIs"],
+    "recommendations_for_candidate": [],
+}
+
+
+def test_prescore_matches_tagged_skills_and_leaves_other_subscores_empty():
+    data = prescore.prescore(BACKEND, "Backend developer: Python 3, Postgres and SQL.")
+    score = data["score"]
+    assert score["skills_match"] == 67
+    assert score["experience_depth"] is None and score["education_match"] is None and score["potential_fit"] is None
+    assert "Skills not found in the resume: docker" in data["assessment_highlights"]
+    assert data["provisional"] is True
+
+
+def test_untagged_job_scores_against_skills_found_in_the_description():
+    assert prescore.required_skills(UNTAGGED) == ["python", "react", "kubernetes", "amazon web services"]
+    data = prescore.prescore(UNTAGGED, "Python and React engineer")
+    assert data["score"]["skills_match"] == 50
+
+
+def test_gate_skips_llm_only_when_skills_were_compared(monkeypatch):
+    monkeypatch.setattr(prescore, "ASSESS_LLM_THRESHOLD", 40)
+    _, provisional = prescore.triage(BACKEND, "Barista with latte art experience")
+    assert provisional is True
+
+    # 没有任何可比较的技能：关键词重合度不可靠，交给 LLM
+    data, provisional = prescore.triage(NO_SKILLS, "Barista with latte art experience")
+    assert data["score"]["skills_match"] is None
+    assert provisional is False
+
+    _, provisional = prescore.triage(BACKEND, "Barista", force_llm=True)
+    assert provisional is False
+
+
+def test_evaluate_resume_calls_llm_above_threshold(monkeypatch):
+    calls = []
+    monkeypatch.setattr(prescore, "request_assessment", lambda jd, text: calls.append(jd) or LLM_RESULT)
+    data, provisional = prescore.evaluate_resume(BACKEND, "Python, SQL and Docker engineer")
+    assert (data, provisional) == (LLM_RESULT, False)
+    assert calls == [BACKEND["description"]]
+
+
+def _latest(db, applicant_id, job_id):
+    return (latest_assessment_query(db)
+            .filter(models.JobAssessmentLatest.applicant_id == applicant_id,
+                    models.JobAssessmentLatest.job_id == job_id)
+            .one())
+
+
+def test_provisional_result_does_not_replace_llm_assessment(db):
+    provisional = prescore.prescore(BACKEND, "Barista")
+    first = record_assessment(db, 1, 1, provisional)
+    assert _latest(db, 1, 1).id == first.id
+
+    real = record_assessment(db, 1, 1, LLM_RESULT)
+    assert _latest(db, 1, 1).id == real.id
+
+    record_assessment(db, 1, 1, provisional)
+    latest = _latest(db, 1, 1)
+    assert latest.id == real.id
+    result = build_assessment_result(latest)
+    assert result.provisional is False and result.score.experience_depth == 70
+
+
+def test_provisional_assessment_serializes_null_subscores(db):
+    record_assessment(db, 1, 2, prescore.prescore(BACKEND, "Python"))
+    result = build_assessment_result(_latest(db, 1, 2))
+    assert result.provisional is True
+    assert result.score.experience_depth is None
+
+
+def test_assess_endpoint_returns_provisional_result_without_llm(client, seed, monkeypatch):
+    monkeypatch.setattr(prescore, "request_assessment", lambda jd, text: (_ for _ in ()).throw(AssertionError("LLM called")))
+    job, applicant = seed["jobs"][0], seed["applicants"][0]
+    resp = client.post(f"/jobs/{job.id}/assess", params={"applicant_id": applicant.id},
+                       files={"file": ("cv.txt", b"Barista with latte art experience", "text/plain")})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["provisional"] is True
+    assert body["data"]["score"]["experience_depth"] is None
+
+    latest = client.get("/job-assessments/latest", params={"applicant_id": applicant.id, "job_id": job.id}).json()
+    assert latest["provisional"] is True
+    assert latest["score"]["skills_match"] == 0
@@ -0,0 +1,57 @@
+import warnings
+from datetime import datetime
+
+import pytest
+
+from app import models, schemas
+
+
+@pytest.fixture
+def applications(db, seed):
+    jose = seed["applicants"][0]
+    db.add_all([models.Application(applicant_id=jose.id, job_id=job.id, company_id=job.company_id)
+                for job in seed["jobs"][:3]])
+    db.commit()
+    return jose
+
+
+@pytest.mark.parametrize("url,schema,count", [
+    ("/jobs", schemas.JobOut, 6),
+    ("/applicants", schemas.ApplicantOut, 4),
+    ("/companies", schemas.CompanyOut, 3),
+])
+def test_list_default_shape_matches_schema(client, seed, url, schema, count):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        resp = client.get(url)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    rows = resp.json()
+    assert len(rows) == count
+    assert all(set(row) == set(schema.model_fields) for row in rows)
+
+
+def test_sparse_fieldset_always_includes_id(client, seed):
+    rows = client.get("/jobs", params={"fields": "title,location", "location": "Wellington"}).json()
+    assert rows == [{"id": seed["jobs"][1].id, "title": "Frontend Engineer", "location": "Wellington"}]
+
+
+def test_unknown_field_is_400(client, seed):
+    resp = client.get("/companies", params={"fields": "name,secret"})
+    assert resp.status_code == 400
+    assert "secret" in resp.json()["detail"]
+
+
+def test_jobs_by_company(client, seed):
+    xero = seed["companies"][0]
+    rows = client.get("/jobs/by_company", params={"company_id": xero.id, "fields": "title"}).json()
+    assert sorted(row["title"] for row in rows) == ["Backend Engineer", "Frontend Engineer"]
+
+
+def test_list_applications_serializes_datetimes(client, applications):
+    rows = client.get("/applications", params={"applicant_id": applications.id}).json()
+    assert len(rows) == 3
+    assert set(rows[0]) == set(schemas.ApplicationOut.model_fields)
+    datetime.fromisoformat(rows[0]["created_at"])
+
+    assert client.get("/applications", params={"applicant_id": 999}).status_code == 404
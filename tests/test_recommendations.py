@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app import models
+from app.services import recommendations
+from app.services.recommendations import live_recommendations, on_job_created, read_feed, refresh_applicant
+
+
+def _feed_rows(db, applicant_id):
+    db.expire_all()
+    return dict(db.execute(
+        select(models.ApplicantRecommendation.job_id, models.ApplicantRecommendation.score)
+        .where(models.ApplicantRecommendation.applicant_id == applicant_id)
+    ).all())
+
+
+def _add_jobs(db, company, specs):
+    """specs: (title, skill_tags)；created_at 跟着已有职位数递增，方便断言同分时的顺序。"""
+    base = datetime(2030, 1, 1) + timedelta(minutes=db.query(models.Job).count())
+    jobs = [models.Job(title=title, role="qa", location="Auckland", company_id=company.id, company_name=company.name,
+                       skill_tags=tags, created_at=base + timedelta(minutes=i)) for i, (title, tags) in enumerate(specs)]
+    db.add_all(jobs)
+    db.commit()
+    return jobs
+
+
+def test_refresh_is_an_upsert(db, seed):
+    jose = seed["applicants"][0]
+    backend = seed["jobs"][0]
+    stale_job = seed["jobs"][2]
+    # 另一个请求刚写入的行：分数过时，还有一个已经不在结果里的职位
+    db.add_all([
+        models.ApplicantRecommendation(applicant_id=jose.id, job_id=backend.id, score=1, computed_at=datetime(2020, 1, 1)),
+        models.ApplicantRecommendation(applicant_id=jose.id, job_id=stale_job.id, score=99, computed_at=datetime(2020, 1, 1)),
+    ])
+    db.commit()
+
+    result = refresh_applicant(db, jose)
+    assert _feed_rows(db, jose.id) == {item["id"]: item["matchScore"] for item in result}
+    assert stale_job.id not in _feed_rows(db, jose.id)
+
+    refresh_applicant(db, jose)
+    assert [item["id"] for item in read_feed(db, jose.id)] == [item["id"] for item in result]
+
+
+def test_recommend_endpoint_serves_feed(client, db, seed):
+    jose = seed["applicants"][0]
+    first = client.get(f"/jobs/recommend/{jose.id}").json()
+    assert first[0]["title"] == "Backend Engineer"
+    assert _feed_rows(db, jose.id)
+    assert client.get(f"/jobs/recommend/{jose.id}").json() == first
+
+
+def test_eviction_matches_live_order(db, seed, monkeypatch):
+    monkeypatch.setattr(recommendations, "FEED_SIZE", 3)
+    tester = models.Applicant(name="Mere Tipene", email="mere@example.com", desired_role="qa",
+                              desired_location="Auckland", skill_tags="Python, SQL")
+    db.add(tester)
+    db.commit()
+    # 全部同分，只靠 created_at / id 区分先后
+    _add_jobs(db, seed["companies"][0], [(f"Python dev {i}", "Python, Go") for i in range(3)])
+    refresh_applicant(db, tester)
+
+    newer = _add_jobs(db, seed["companies"][0], [("Python dev late", "Python, Go")])[0]
+    better = _add_jobs(db, seed["companies"][0], [("Python SQL dev", "Python, SQL")])[0]
+    on_job_created(newer.id)   # 同分但发布更晚，排不进 top-3
+    on_job_created(better.id)  # 更高分，挤掉按 rank_key 排最后的一条
+
+    feed_ids = [item["id"] for item in read_feed(db, tester.id)]
+    assert newer.id not in feed_ids
+    assert feed_ids[0] == better.id
+    assert feed_ids == [item["id"] for item in live_recommendations(db, tester)]
+
+
+def test_skill_change_drops_the_feed_until_next_read(client, db, seed):
+    jose = seed["applicants"][0]
+    before = {item["id"]: item["matchScore"] for item in client.get(f"/jobs/recommend/{jose.id}").json()}
+    backend = seed["jobs"][0].id
+    assert _feed_rows(db, jose.id)
+
+    applicant = db.get(models.Applicant, jose.id)
+    applicant.skill_tags = "Python, SQL, Docker"
+    db.commit()
+    assert _feed_rows(db, jose.id) == {}
+
+    after = {item["id"]: item["matchScore"] for item in client.get(f"/jobs/recommend/{jose.id}").json()}
+    assert after[backend] > before[backend]
+    assert _feed_rows(db, jose.id) == after
+
+    # 和 feed 无关的字段不影响 feed
+    applicant = db.get(models.Applicant, jose.id)
+    applicant.major = "Software Engineering"
+    db.commit()
+    assert _feed_rows(db, jose.id) == after
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+from app.services.scheduling import IntervalIndex, ScheduleIndex
+
+
+def at(hour, minute=0):
+    return datetime(2026, 11, 2, hour, minute)
+
+
+def brute_force(items, start, end):
+    return sorted(item for item in items if item[0] < end and item[1] > start)
+
+
+def test_overlapping_finds_enclosing_interval():
+    index = IntervalIndex([(at(9), at(12), 1), (at(10), at(10, 30), 2)])
+    assert index.overlapping(at(11), at(11, 30)) == [(at(9), at(12), 1)]
+    assert index.overlapping(at(10, 15), at(10, 20)) == [(at(9), at(12), 1), (at(10), at(10, 30), 2)]
+
+
+def test_overlapping_with_partially_overlapping_intervals():
+    index = IntervalIndex()
+    index.add(at(9), at(11), 1)
+    index.add(at(10), at(13), 2)
+    index.add(at(12), at(12, 30), 3)
+    index.add(at(14), at(15), 4)
+    assert [i[2] for i in index.overlapping(at(12, 45), at(13, 30))] == [2]
+    assert [i[2] for i in index.overlapping(at(10, 30), at(12, 15))] == [1, 2, 3]
+    assert index.overlapping(at(13), at(14)) == []
+    # 相邻不算重叠
+    assert [i[2] for i in index.overlapping(at(15), at(16))] == []
+
+
+def test_overlapping_matches_brute_force_after_adds_and_removes():
+    items = [(at(8) + timedelta(minutes=17 * k), at(8) + timedelta(minutes=17 * k + 25 + (k % 5) * 40), k)
+             for k in range(40)]
+    index = IntervalIndex(items[:20])
+    for item in items[20:]:
+        index.add(*item)
+    index.remove_many({3, 11, 27})
+    index.remove(30)
+    remaining = [i for i in items if i[2] not in {3, 11, 27, 30}]
+    for minutes in range(0, 16 * 60, 7):
+        start = at(7) + timedelta(minutes=minutes)
+        end = start + timedelta(minutes=20)
+        assert index.overlapping(start, end) == brute_force(remaining, start, end)
+
+
+def test_schedule_index_evicts_least_recently_used_keys(monkeypatch):
+    schedule = ScheduleIndex(max_keys=2)
+    loads = []
+    monkeypatch.setattr(schedule, "_load", lambda db, kind, key_id: loads.append(key_id) or IntervalIndex())
+    schedule.get(None, "interviewer", 1)
+    schedule.get(None, "interviewer", 2)
+    schedule.get(None, "interviewer", 1)
+    schedule.get(None, "interviewer", 3)  # 淘汰 2
+    schedule.get(None, "interviewer", 1)
+    schedule.get(None, "interviewer", 2)
+    assert loads == [1, 2, 3, 2]
+    assert len(schedule._indexes) == 2
+
+
+def _interview(client, seed, hour, minutes=60, interviewer_id=7, applicant=0, status=None):
+    payload = {
+        "application_id": 1, "job_id": seed["jobs"][0].id, "applicant_id": seed["applicants"][applicant].id,
+        "company_id": seed["companies"][0].id, "interviewer_id": interviewer_id,
+        "scheduled_time": at(hour).isoformat(), "duration_minutes": minutes, "type": "Online",
+    }
+    if status:
+        payload["status"] = status
+    return client.post("/interviews", json=payload)
+
+
+def test_create_interview_rejects_conflicts(client, seed):
+    assert _interview(client, seed, 9, minutes=180).status_code == 200
+    resp = _interview(client, seed, 11, applicant=1)
+    assert resp.status_code == 409
+    assert resp.json()["detail"]["conflicts"][0]["kind"] == "interviewer"
+    assert _interview(client, seed, 12, applicant=1).status_code == 200
+
+
+def test_availability_skips_busy_time(client, seed):
+    _interview(client, seed, 10, minutes=90)
+    resp = client.get("/interviews/availability", params={
+        "date_from": at(0).isoformat(), "date_to": (at(0) + timedelta(days=1)).isoformat(),
+        "interviewer_id": 7, "duration_minutes": 60,
+    })
+    slots = [(s["start"][11:16], s["end"][11:16]) for s in resp.json()["slots"]]
+    assert slots == [("09:00", "10:00"), ("11:30", "18:00")]
+
+
+def test_timezone_aware_times_are_compared_as_utc(client, seed):
+    assert _interview(client, seed, 9, minutes=180).status_code == 200
+    payload = {
+        "application_id": 1, "job_id": seed["jobs"][0].id, "applicant_id": seed["applicants"][1].id,
+        "company_id": seed["companies"][0].id, "interviewer_id": 7, "duration_minutes": 60, "type": "Online",
+    }
+    # 19:00+08:00 = 11:00Z，落在 9:00-12:00 里
+    resp = client.post("/interviews", json={**payload, "scheduled_time": "2026-11-02T19:00:00+08:00"})
+    assert resp.status_code == 409
+    resp = client.post("/interviews", json={**payload, "scheduled_time": "2026-11-02T13:00:00Z"})
+    assert resp.status_code == 200
+    assert resp.json()["scheduled_time"].startswith("2026-11-02T13:00:00")
+
+    resp = client.get("/interviews/availability", params={
+        "date_from": "2026-11-02T08:00:00+08:00", "date_to": "2026-11-03T00:00:00Z",
+        "interviewer_id": 7, "duration_minutes": 60,
+    })
+    assert resp.status_code == 200
+    slots = [(s["start"][11:16], s["end"][11:16]) for s in resp.json()["slots"]]
+    assert slots == [("12:00", "13:00"), ("14:00", "18:00")]
+
+    resp = client.get("/interviews", params={"from": "2026-11-02T20:30:00+08:00", "interviewer_id": 7})
+    assert [item["scheduled_time"][11:16] for item in resp.json()] == ["13:00"]
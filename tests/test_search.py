@@ -0,0 +1,102 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app import main, models
+from app.services.search_index import SearchIndex, _within_one_edit, normalize, search_index, words
+
+
+def _index():
+    index = SearchIndex()
+    for values in [
+        {"id": 1, "name": "José Garcia", "email": "jose.garcia99@example.com", "university": "University of Auckland", "major": "Computer Science"},
+        {"id": 2, "name": "Josephine Li", "email": "jli@example.com", "university": "University of Otago", "major": "Statistics"},
+        {"id": 3, "name": "Olivia Walker", "email": "olivia@example.com", "university": "Victoria University", "major": "Software Engineering"},
+    ]:
+        index.upsert("applicant", values)
+    index.upsert("company", {"id": 1, "name": "Xero", "industry": "Software"})
+    index.upsert("company", {"id": 2, "name": "Fonterra", "industry": "Dairy"})
+    return index
+
+
+def _ids(items):
+    return [(item["type"], item["id"]) for item in items]
+
+
+def test_text_helpers():
+    assert normalize("José ÅNGSTRÖM") == "jose angstrom"
+    assert words("jose.li123@example") == ["jose", "li", "123", "example"]
+    assert _within_one_edit("walker", "wlaker")
+    assert _within_one_edit("walker", "walkr")
+    assert not _within_one_edit("walker", "talkers")
+
+
+def test_prefix_accent_and_typo_matching():
+    index = _index()
+    assert _ids(index.suggest("jos", ["applicant"]))[:2] == [("applicant", 1), ("applicant", 2)]
+    assert _ids(index.suggest("Jose", ["applicant"]))[0] == ("applicant", 1)
+    assert _ids(index.suggest("olivia wlaker", ["applicant"])) == [("applicant", 3)]
+    assert _ids(index.suggest("fontera", ["company"])) == [("company", 2)]
+    assert index.suggest("zzzz", ["applicant", "company"]) == []
+
+
+def test_all_query_words_rank_first_and_report_field():
+    index = _index()
+    items = index.suggest("jose garcia", ["applicant"])
+    assert items[0]["id"] == 1 and items[0]["matched_field"] == "name"
+    assert items[0]["score"] >= items[-1]["score"]
+
+    software = index.suggest("software", ["applicant", "company"])
+    assert {("company", 1), ("applicant", 3)} <= set(_ids(software))
+    assert next(i for i in software if i["type"] == "company")["matched_field"] == "industry"
+
+
+def test_upsert_replaces_and_remove_deletes():
+    index = _index()
+    index.upsert("company", {"id": 2, "name": "Fonterra Co-operative", "industry": "Food"})
+    assert index.suggest("dairy", ["company"]) == []
+    assert index.suggest("food", ["company"])[0]["label"] == "Fonterra Co-operative"
+    index.remove("company", 2)
+    assert index.suggest("fonterra", ["company"]) == []
+    assert index.stats()["documents"] == 4
+
+
+def _wait_until_loaded(timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not search_index.loaded:
+        assert time.monotonic() < deadline, "search index did not finish warming"
+        time.sleep(0.01)
+
+
+def test_suggest_does_not_build_inside_the_request(client, seed):
+    resp = client.get("/search/suggest", params={"q": "arooha", "types": "applicant"}).json()
+    assert resp["warming"] is True and resp["items"] == []
+    _wait_until_loaded()
+    resp = client.get("/search/suggest", params={"q": "arooha", "types": "applicant"}).json()
+    assert resp["warming"] is False
+    assert [item["label"] for item in resp["items"]] == ["Aroha Ngata"]
+
+
+def test_startup_warms_the_index(seed, monkeypatch):
+    monkeypatch.setattr(main, "SEARCH_INDEX_WARMUP", True)
+    with TestClient(main.app):
+        _wait_until_loaded()
+    assert search_index.stats()["documents"] == 7
+
+
+def test_suggest_endpoint_follows_commits(client, db, seed):
+    search_index.build(db)
+    resp = client.get("/search/suggest", params={"q": "arooha", "types": "applicant"})
+    assert [item["label"] for item in resp.json()["items"]] == ["Aroha Ngata"]
+
+    db.add(models.Company(name="Auckland Transport", industry="Transport"))
+    db.commit()
+    names = [item["label"] for item in client.get("/search/suggest", params={"q": "auckland"}).json()["items"]]
+    assert "Auckland Transport" in names
+
+    db.add(models.Company(name="Rolled Back Ltd", industry="Finance"))
+    db.flush()
+    db.rollback()
+    assert client.get("/search/suggest", params={"q": "rolled", "types": "company"}).json()["items"] == []
+
+    assert client.get("/search/suggest", params={"q": "x", "types": "jobs"}).status_code == 400
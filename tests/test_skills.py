@@ -0,0 +1,99 @@
+from sqlalchemy import select
+
+from app import models
+from app.services import skills
+from app.services.prescore import extract_skills, jd_skills
+from app.services.skills import find_skills, skill_key
+
+
+def _applicant_skills(db, applicant_id):
+    return set(db.execute(
+        select(models.Skill.name)
+        .join(models.ApplicantSkill, models.ApplicantSkill.skill_id == models.Skill.id)
+        .where(models.ApplicantSkill.applicant_id == applicant_id)
+    ).scalars())
+
+
+def test_skill_key_keeps_dots():
+    assert skill_key("Java Script") == skill_key("java-script") == "javascript"
+    assert skill_key(".NET") == ".net"
+    assert skill_key("net") == "net"
+    assert "net" not in find_skills("Our net revenue grew")
+    assert find_skills("Built APIs on .NET and ASP.NET")[".net"] == 2
+
+
+def test_ambiguous_aliases_need_case_or_context():
+    prose = "Ready to go the extra mile. Node failures were rare, and ts values were logged in ml units."
+    assert not set(find_skills(prose)) & {"go", "node.js", "typescript", "machine learning"}
+
+    assert {"go", "typescript", "machine learning"} <= set(find_skills("Languages: Go, Rust, TS. Built ML pipelines."))
+    assert "go" in find_skills("I write go services daily")
+    assert "node.js" in find_skills("Backend work in Node and Python")
+
+
+def test_extract_skills_ignores_ordinary_words():
+    resume = "Happy to go anywhere. Strong Python and SQL."
+    assert extract_skills(resume, "Go, Python, SQL") == ["python", "sql"]
+    assert extract_skills("Python / Go / SQL", "Go, Python") == ["go", "python"]
+    assert jd_skills("Go to market with Python. Python, AWS and Kubernetes.") == ["python", "amazon web services", "kubernetes"]
+
+
+def test_synonyms_refresh_from_database(db, monkeypatch):
+    skill = models.Skill(name="scikit-learn")
+    db.add(skill)
+    db.flush()
+    db.add(models.SkillSynonym(alias="sklearn", skill_id=skill.id))
+    db.commit()
+    assert "scikit-learn" not in find_skills("Models in sklearn")
+
+    skills.ensure_synonyms(db)
+    assert find_skills("Models in sklearn") == {"scikit-learn": 1}
+
+    db.query(models.SkillSynonym).delete()
+    db.commit()
+    skills.ensure_synonyms(db)
+    assert find_skills("Models in sklearn") == {"scikit-learn": 1}  # TTL 内不重新加载
+
+    monkeypatch.setattr(skills, "SKILL_SYNONYMS_TTL_SECONDS", 0)
+    skills.ensure_synonyms(db)
+    assert find_skills("Models in sklearn") == {}
+
+
+def test_seed_removes_dotless_legacy_keys(db):
+    dotnet = models.Skill(name=".net")
+    db.add(dotnet)
+    db.flush()
+    db.add(models.SkillSynonym(alias="net", skill_id=dotnet.id))
+    db.commit()
+
+    skills.seed_synonyms(db)
+    aliases = set(db.execute(select(models.SkillSynonym.alias)).scalars())
+    assert "net" not in aliases
+    assert {".net", "dotnet", "asp.net", "node.js"} <= aliases
+
+
+def test_applicant_skill_written_with_applicant(db, seed):
+    jose = seed["applicants"][0]
+    assert _applicant_skills(db, jose.id) == {"python", "sql"}
+
+    jose.skill_tags = "Python, JS, Docker"
+    db.commit()
+    assert _applicant_skills(db, jose.id) == {"python", "javascript", "docker"}
+
+    jose.desired_location = "Wellington"
+    db.commit()
+    assert _applicant_skills(db, jose.id) == {"python", "javascript", "docker"}
+
+
+def test_overlong_tags_are_skipped(db, seed):
+    jose = seed["applicants"][0]
+    sentence = "experienced in building and operating large distributed systems across many teams and regions"
+    assert len(sentence) > skills.SKILL_NAME_MAX_LENGTH
+    assert skills.parse_skills(f"Python, {sentence}, SQL") == ["python", "sql"]
+
+    jose.skill_tags = f"Rust, {sentence}"
+    db.commit()
+    assert _applicant_skills(db, jose.id) == {"rust"}
+    names = db.execute(select(models.Skill.name)).scalars().all()
+    assert max(map(len, names)) <= skills.SKILL_NAME_MAX_LENGTH
+    assert skills.resolve_skill_ids(db, [sentence]) == {}
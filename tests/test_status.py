@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pytest
+
+from app import models
+from app.services.status import APPLICATION_TRANSITIONS, batch_transition
+
+
+@pytest.fixture
+def applications(db, seed):
+    jose = seed["applicants"][0]
+    rows = [models.Application(applicant_id=jose.id, job_id=job.id, company_id=job.company_id)
+            for job in seed["jobs"][:4]]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def _create_interview(client, application, interviewer_id, hour, status="Pending"):
+    return client.post("/interviews", json={
+        "application_id": application.id, "job_id": application.job_id, "applicant_id": application.applicant_id,
+        "company_id": application.company_id, "interviewer_id": interviewer_id,
+        "scheduled_time": datetime(2030, 3, 4, hour).isoformat(), "duration_minutes": 60,
+        "type": "Video", "status": status,
+    })
+
+
+def test_batch_transition_sorts_ids_into_updated_rejected_missing(db, applications):
+    first, second, third, _ = applications
+    db.get(models.Application, third.id).status = "withdrawn"
+    db.commit()
+
+    result = batch_transition(db, models.Application, APPLICATION_TRANSITIONS,
+                              [first.id, second.id, third.id, first.id, 999], "reviewing")
+    assert [row.id for row in result["updated"]] == [first.id, second.id]
+    assert all(row.status == "reviewing" for row in result["updated"])
+    assert result["previous"] == {first.id: "pending", second.id: "pending"}
+    assert result["rejected"] == [{"id": third.id, "status": "withdrawn",
+                                   "reason": "Cannot change status from withdrawn to reviewing"}]
+    assert result["missing_ids"] == [999]
+
+    with pytest.raises(ValueError):
+        batch_transition(db, models.Application, APPLICATION_TRANSITIONS, [first.id], "hired")
+
+
+def test_batch_transition_check_blocks_before_update(db, applications):
+    first, second = applications[:2]
+    result = batch_transition(db, models.Application, APPLICATION_TRANSITIONS, [first.id, second.id], "reviewing",
+                              check=lambda session, previous: {second.id: "On hold"})
+    assert [row.id for row in result["updated"]] == [first.id]
+    assert result["rejected"] == [{"id": second.id, "status": "pending", "reason": "On hold"}]
+    db.expire_all()
+    assert db.get(models.Application, second.id).status == "pending"
+
+
+def test_application_batch_endpoint(client, applications):
+    body = client.patch("/applications/status", json={"ids": [a.id for a in applications], "status": "rejected"}).json()
+    assert len(body["updated"]) == 4
+    again = client.patch("/applications/status", json={"ids": [applications[0].id], "status": "rejected"}).json()
+    assert again["rejected"][0]["reason"] == "Already rejected"
+
+
+def test_reactivating_interviews_checks_conflicts(client, applications):
+    a, b, c, d = applications
+    cancelled_1 = _create_interview(client, a, 7, 10, status="Cancelled").json()
+    cancelled_2 = _create_interview(client, b, 7, 10, status="Cancelled").json()
+    cancelled_3 = _create_interview(client, c, 8, 14, status="Cancelled").json()
+    blocker = _create_interview(client, d, 8, 14).json()
+
+    body = client.patch("/interviews/status", json={
+        "ids": [cancelled_1["id"], cancelled_2["id"], cancelled_3["id"]], "status": "Pending",
+    }).json()
+    # 1 和 2 是同一个面试官的同一时段，只有先检查的那个能恢复；3 和已有的面试冲突
+    assert [row["id"] for row in body["updated"]] == [cancelled_1["id"]]
+    reasons = {row["id"]: row["reason"] for row in body["rejected"]}
+    assert reasons[cancelled_2["id"]] == f"Time conflicts with interviews {cancelled_1['id']}"
+    assert reasons[cancelled_3["id"]] == f"Time conflicts with interviews {blocker['id']}"
+
+    # 恢复的面试已经进入日程索引
+    assert _create_interview(client, d, 7, 10).status_code == 409
+
+
+def test_single_patch_keeps_legacy_rules(client, applications):
+    interview = _create_interview(client, applications[0], 7, 9).json()
+    url = f"/interviews/{interview['id']}/status"
+
+    # 改成当前状态是幂等的 200，批量接口才把它算作 rejected
+    resp = client.patch(url, params={"new_status": "Pending"})
+    assert resp.status_code == 200 and resp.json()["status"] == "Pending"
+    assert client.patch(url, params={"new_status": "Completed"}).json()["status"] == "Completed"
+    assert client.patch(url, params={"new_status": "Pending"}).json()["status"] == "Pending"
+
+    assert client.patch(url, params={"new_status": "Cancelled"}).json()["status"] == "Cancelled"
+    assert _create_interview(client, applications[1], 7, 9).status_code == 200
+    resp = client.patch(url, params={"new_status": "Confirmed"})
+    assert resp.status_code == 409 and "Time conflicts" in resp.json()["detail"]
+
+    assert client.patch(url, params={"new_status": "Archived"}).status_code == 400
+    assert client.patch("/interviews/999/status", params={"new_status": "Pending"}).status_code == 404
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from app.services import tracing
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    exporter = ListExporter()
+    monkeypatch.setattr(tracing, "_processor", tracing.BatchProcessor(exporter, interval=0.01))
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+
+    def wait_for(name):
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline:
+            tracing.flush()
+            if any(s.name == name for s in exporter.spans):
+                return exporter.spans
+            time.sleep(0.01)
+        raise AssertionError(f"span {name!r} was not exported")
+
+    return wait_for
+
+
+def test_span_nesting_and_errors(exported):
+    root = tracing.start_trace("job")
+    with tracing.span("outer", step=1) as outer:
+        with pytest.raises(KeyError):
+            with tracing.span("inner"):
+                raise KeyError("missing")
+    tracing.end_trace(root)
+
+    spans = {s.name: s for s in exported("job")}
+    assert spans["outer"].parent_id == root.span_id and spans["outer"].attributes == {"step": 1}
+    assert spans["inner"].parent_id == outer.span_id
+    assert spans["inner"].error == "KeyError: 'missing'"
+    assert tracing.current_span() is root
+
+
+def test_unsampled_fast_traces_are_dropped(monkeypatch, exported):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+    root = tracing.start_trace("quick")
+    tracing.end_trace(root)
+    assert root.trace.exported is False
+
+    monkeypatch.setattr(tracing, "TRACE_SLOW_MS", 0.0)
+    slow = tracing.start_trace("slow")
+    tracing.end_trace(slow)
+    assert exported("slow")[-1].attributes["trace.sampled_by"] == "slow"
+
+
+def test_middleware_traces_requests_and_propagates_traceparent(client, seed, exported):
+    parent = "00-" + "ab" * 16 + "-" + "cd" * 8 + "-01"
+    resp = client.get("/jobs", params={"fields": "title"}, headers={"traceparent": parent})
+    assert resp.status_code == 200
+    assert resp.headers["traceparent"].startswith("00-" + "ab" * 16 + "-")
+
+    spans = exported("HTTP GET /jobs")
+    root = next(s for s in spans if s.name == "HTTP GET /jobs")
+    assert root.parent_id == "cd" * 8
+    assert root.attributes["http.status_code"] == 200
+    queries = [s for s in spans if s.name == "db.query" and s.trace is root.trace]
+    assert queries and all(q.attributes["db.system"] == "sqlite" for q in queries)
@@ -0,0 +1,111 @@
+import asyncio
+import math
+from collections import Counter
+
+import pytest
+
+from app import models
+from app.services.vector_index import JobVectorIndex, job_vector_index, tokenize
+
+DOCS = {
+    1: "python django postgresql backend api",
+    2: "react typescript frontend css",
+    3: "python pandas sql data analysis",
+    4: "kubernetes docker linux operations",
+}
+
+
+def exact_cosine(docs: dict[int, str], text: str) -> dict[int, float]:
+    """不做哈希的 TF-IDF 余弦相似度，作为对照。"""
+    n = len(docs)
+    tfs = {i: Counter(tokenize(t)) for i, t in docs.items()}
+    df = Counter(term for tf in tfs.values() for term in tf)
+
+    def vec(tf):
+        return {t: math.log1p(c) * (math.log((1 + n) / (1 + df[t])) + 1) for t, c in tf.items()}
+
+    q = vec(Counter(tokenize(text)))
+    qn = math.sqrt(sum(v * v for v in q.values()))
+    scores = {}
+    for i, tf in tfs.items():
+        d = vec(tf)
+        dn = math.sqrt(sum(v * v for v in d.values()))
+        scores[i] = sum(q.get(t, 0) * v for t, v in d.items()) / (qn * dn)
+    return scores
+
+
+def test_query_ranks_by_cosine_similarity():
+    index = JobVectorIndex()
+    for job_id, text in DOCS.items():
+        index.add(job_id, text)
+    query = "senior python backend developer with sql"
+    expected = exact_cosine(DOCS, query)
+    hits = index.query(query, k=4)
+    assert [job_id for job_id, _ in hits] == [1, 3]
+    for job_id, score in hits:
+        assert score == pytest.approx(expected[job_id], abs=2e-3)
+
+
+def test_add_replaces_and_remove_drops_jobs():
+    index = JobVectorIndex()
+    for job_id, text in DOCS.items():
+        index.add(job_id, text)
+    index.add(2, "python machine learning research")
+    assert index.query("react frontend", k=4) == []
+    index.remove(1)
+    assert {j for j, _ in index.query("python", k=4)} == {2, 3}
+    assert 1 not in index.rows
+    assert index.df.sum() == sum(len(r[0]) for r in index.rows.values())
+
+
+def test_unknown_terms_return_nothing():
+    index = JobVectorIndex()
+    index.add(1, DOCS[1])
+    assert index.query("zzz qqq", k=3) == []
+    assert JobVectorIndex().query("python", k=3) == []
+
+
+def test_refresh_picks_up_jobs_written_by_other_workers(db, seed, monkeypatch):
+    job_vector_index.ensure_fresh(db)
+    assert len(job_vector_index.rows) == len(seed["jobs"])
+
+    db.add(models.Job(title="Rust Engineer", role="dev", status="active", description="Write Rust services."))
+    db.commit()
+    job_vector_index.ensure_fresh(db)  # TTL 未过期
+    assert not any(j for j, _ in job_vector_index.query("rust", k=3))
+
+    monkeypatch.setattr(job_vector_index, "refreshed_at", 0.0)
+    job_vector_index.ensure_fresh(db)
+    assert [j for j, _ in job_vector_index.query("rust", k=3)] == [job_vector_index.max_id]
+
+
+def test_similar_endpoint_drops_closed_jobs(client, db, seed):
+    resume = b"Python developer, SQL, Docker, REST APIs"
+    resp = client.post("/jobs/similar", files={"file": ("cv.txt", resume, "text/plain")})
+    assert resp.status_code == 200
+    assert resp.json()[0]["title"] == "Backend Engineer"
+
+    backend = db.get(models.Job, seed["jobs"][0].id)
+    backend.status = "closed"
+    db.commit()
+    titles = [j["title"] for j in client.post("/jobs/similar", files={"file": ("cv.txt", resume, "text/plain")}).json()]
+    assert "Backend Engineer" not in titles
+    assert seed["jobs"][0].id not in job_vector_index.rows
+
+
+def test_similar_endpoint_refreshes_the_index_off_the_event_loop(client, seed, monkeypatch):
+    ensure_fresh = job_vector_index.ensure_fresh
+    on_loop = []
+
+    def recording(db):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return ensure_fresh(db)
+
+    monkeypatch.setattr(job_vector_index, "ensure_fresh", recording)
+    resp = client.post("/jobs/similar", files={"file": ("cv.txt", b"Python SQL Docker", "text/plain")})
+    assert resp.status_code == 200
+    assert on_loop == [False]